@@ -2,24 +2,41 @@ from __future__ import annotations
 
 import argparse
 import hashlib
+import io
 import json
 import logging
 import os
 import re
 import sys
-from dataclasses import asdict, dataclass, field
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from dataclasses import dataclass, field, fields
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable, Iterator, TextIO
 
 import httpx
 import yaml
-from dateutil import parser as date_parser
 from zoneinfo import ZoneInfo
 
+from cast_event_cal import date_resolution
+from cast_event_cal.documents import compact_file, write_events_document
+from cast_event_cal.ics import Component, expand_components, iter_unfolded_lines, iter_vevents
+from cast_event_cal.profiling import TIMINGS_PATH, enable_profiling, profile_stage
+from cast_event_cal.sessions import session
+from cast_event_cal.timestamps import format_instant, parse_instant
+
 JST = ZoneInfo("Asia/Tokyo")
 USER_AGENT = "cast-event-cal/2.0 (+https://github.com/KAFKA2306/cast_event_cal)"
 DEFAULT_TIMEOUT = 25.0
+DEFAULT_CONCURRENCY = 8
+DEFAULT_SOURCE_DEADLINE = 90.0
+VALIDATOR_CACHE_VERSION = "2.0"
+ICS_EXPANSION_PAST_DAYS = 31
+ICS_EXPANSION_FUTURE_DAYS = 366
+EPOCH = "1970-01-01T00:00:00Z"
 
 
 class SourceError(RuntimeError):
@@ -45,6 +62,9 @@ class Event:
     tags: list[str] = field(default_factory=list)
     confidence: float = 1.0
     review_required: bool = False
+    start_utc: datetime | None = field(default=None, init=False, repr=False, compare=False)
+    end_utc: datetime | None = field(default=None, init=False, repr=False, compare=False)
+    fetched_utc: datetime | None = field(default=None, init=False, repr=False, compare=False)
 
     def normalized(self) -> "Event":
         self.title = clean_text(self.title)
@@ -55,16 +75,36 @@ class Event:
         self.image_url = clean_optional(self.image_url)
         self.category = clean_optional(self.category)
         self.tags = sorted({clean_text(tag) for tag in self.tags if clean_text(tag)})
-        self.starts_at = normalize_datetime(self.starts_at)
-        self.ends_at = normalize_datetime(self.ends_at) if self.ends_at else None
-        if self.ends_at and parse_datetime(self.ends_at) < parse_datetime(self.starts_at):
+        self.start_utc = parse_datetime(self.starts_at)
+        self.starts_at = format_datetime(self.start_utc)
+        self.end_utc = parse_datetime(self.ends_at) if self.ends_at else None
+        self.ends_at = format_datetime(self.end_utc) if self.end_utc else None
+        self.fetched_utc = parse_datetime(self.fetched_at) if self.fetched_at else None
+        if self.end_utc and self.end_utc < self.start_utc:
             self.review_required = True
             self.confidence = min(self.confidence, 0.3)
         return self
 
     @property
     def start(self) -> datetime:
-        return parse_datetime(self.starts_at)
+        if self.start_utc is None:
+            self.start_utc = parse_datetime(self.starts_at)
+        return self.start_utc
+
+    @property
+    def end(self) -> datetime | None:
+        if self.end_utc is None and self.ends_at:
+            self.end_utc = parse_datetime(self.ends_at)
+        return self.end_utc
+
+    @property
+    def fetched(self) -> datetime:
+        if self.fetched_utc is None:
+            self.fetched_utc = parse_datetime(self.fetched_at or EPOCH)
+        return self.fetched_utc
+
+    def as_dict(self) -> dict[str, Any]:
+        return {item.name: list(value) if isinstance(value := getattr(self, item.name), list) else value for item in fields(self) if item.init}
 
 
 def utc_now() -> datetime:
@@ -81,20 +121,18 @@ def clean_optional(value: Any) -> str | None:
 
 
 def parse_datetime(value: str | datetime) -> datetime:
-    if isinstance(value, datetime):
-        dt = value
-    else:
-        dt = date_parser.isoparse(value)
-    if dt.tzinfo is None:
-        dt = dt.replace(tzinfo=JST)
-    return dt.astimezone(UTC)
+    return parse_instant(value)
+
+
+def format_datetime(value: datetime) -> str:
+    return format_instant(value)
 
 
 def normalize_datetime(value: str | datetime) -> str:
-    return parse_datetime(value).isoformat().replace("+00:00", "Z")
+    return format_datetime(parse_datetime(value))
 
 
-def event_identity(*, source: str, source_id: str | None, title: str, starts_at: str, organizer: str | None, location: str | None) -> str:
+def event_identity(*, source: str, source_id: str | None, title: str, starts_at: str | datetime, organizer: str | None, location: str | None) -> str:
     if source_id:
         payload = f"{source}:{source_id}"
     else:
@@ -122,14 +160,7 @@ def build_event(raw: dict[str, Any], source: str, fetched_at: str) -> Event:
     location_value = raw.get("location") or raw.get("venue") or raw.get("world")
     location = location_value.get("name") if isinstance(location_value, dict) else location_value
     event = Event(
-        id=event_identity(
-            source=source,
-            source_id=source_id,
-            title=title,
-            starts_at=str(starts_at),
-            organizer=clean_optional(organizer),
-            location=clean_optional(location),
-        ),
+        id="",
         title=title,
         starts_at=str(starts_at),
         ends_at=raw.get("ends_at") or raw.get("end") or raw.get("end_time") or raw.get("endsAt"),
@@ -146,8 +177,16 @@ def build_event(raw: dict[str, Any], source: str, fetched_at: str) -> Event:
         tags=list(raw.get("tags") or []),
         confidence=float(raw.get("confidence", 1.0)),
         review_required=bool(raw.get("review_required", False)),
+    ).normalized()
+    event.id = event_identity(
+        source=source,
+        source_id=source_id,
+        title=event.title,
+        starts_at=event.start,
+        organizer=event.organizer,
+        location=event.location,
     )
-    return event.normalized()
+    return event
 
 
 def load_config(path: Path) -> dict[str, Any]:
@@ -164,8 +203,142 @@ def fetch_json(client: httpx.Client, url: str, *, headers: dict[str, str] | None
     return response.json()
 
 
-def collect_json_source(client: httpx.Client, source: dict[str, Any], fetched_at: str) -> list[Event]:
-    data = fetch_json(client, str(source["url"]), headers=source.get("headers"))
+class ValidatorCache:
+    """Conditional-GET validators plus the parsed payload each one can replay.
+
+    Validators are small and stable, so they live in ``path``; the parsed
+    payloads change with every feed edit and live beside it in ``parsed_path``,
+    which is kept out of the repository. A validator without its payload is not
+    offered to the server, because a 304 would have nothing to replay.
+    """
+
+    def __init__(self, path: Path | None = None, parsed_path: Path | None = None) -> None:
+        self.path = path
+        self.parsed_path = parsed_path or (path.with_suffix(".parsed.json") if path else None)
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.touched: set[str] = set()
+        self.outcomes: dict[str, str] = {}
+        self.lock = threading.Lock()
+        if path and path.exists():
+            payload = json.loads(path.read_text(encoding="utf-8"))
+            if payload.get("schema_version") == VALIDATOR_CACHE_VERSION:
+                self.entries = dict(payload.get("entries", {}))
+        parsed: dict[str, Any] = {}
+        if self.parsed_path and self.parsed_path.exists():
+            try:
+                payload = json.loads(self.parsed_path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                payload = {}
+            if isinstance(payload, dict) and payload.get("schema_version") == VALIDATOR_CACHE_VERSION:
+                parsed = dict(payload.get("entries", {}))
+        self.entries = {url: {**entry, "parsed": parsed[url]} for url, entry in self.entries.items() if url in parsed}
+
+    def lookup(self, url: str, fingerprint: str) -> dict[str, Any] | None:
+        with self.lock:
+            entry = self.entries.get(url)
+        return entry if entry and entry.get("fingerprint") == fingerprint else None
+
+    def store(self, url: str, entry: dict[str, Any]) -> None:
+        with self.lock:
+            self.entries[url] = entry
+            self.touched.add(url)
+
+    def record(self, name: str, outcome: str) -> None:
+        with self.lock:
+            self.outcomes[name] = outcome
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        # Sources past their deadline may still be storing from their threads.
+        with self.lock:
+            entries = {url: self.entries[url] for url in sorted(self.touched)}
+        validators = {url: {key: value for key, value in entry.items() if key != "parsed"} for url, entry in entries.items()}
+        write_cache_file(self.path, {"schema_version": VALIDATOR_CACHE_VERSION, "entries": validators}, indent=2)
+        if self.parsed_path:
+            parsed = {url: entry["parsed"] for url, entry in entries.items()}
+            write_cache_file(self.parsed_path, {"schema_version": VALIDATOR_CACHE_VERSION, "entries": parsed})
+
+
+def write_cache_file(path: Path, payload: dict[str, Any], *, indent: int | None = None) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    separators = None if indent else (",", ":")
+    temporary.write_text(json.dumps(payload, ensure_ascii=False, indent=indent, separators=separators) + "\n", encoding="utf-8")
+    temporary.replace(path)
+
+
+def source_fingerprint(source: dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(source, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def hashed_chunks(chunks: Iterable[bytes], digest: Any) -> Iterator[bytes]:
+    for chunk in chunks:
+        digest.update(chunk)
+        yield chunk
+
+
+def fetch_source_events(
+    client: httpx.Client,
+    source: dict[str, Any],
+    fetched_at: str,
+    parse: Callable[[Iterable[bytes]], tuple[list[Event], Any]],
+    replay: Callable[[Any], list[Event]],
+    cache: ValidatorCache | None = None,
+) -> list[Event]:
+    """Fetch a source conditionally; ``parse`` returns the events and what to cache, ``replay`` rebuilds events from it."""
+    url = str(source["url"])
+    name = clean_text(source.get("name") or source.get("type") or "unnamed")
+    headers = dict(source.get("headers") or {})
+    fingerprint = source_fingerprint(source)
+    entry = cache.lookup(url, fingerprint) if cache else None
+    if entry:
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    with client.stream("GET", url, headers=headers) as response:
+        if cache and entry and response.status_code == 304:
+            cache.store(url, entry)
+            cache.record(name, "not_modified")
+            return replay(entry["parsed"])
+        response.raise_for_status()
+        digest = hashlib.sha256()
+        chunks: Iterable[bytes] = hashed_chunks(response.iter_bytes(), digest)
+        if entry and entry.get("body_sha256"):
+            # With a payload to replay, hash first: an unchanged body is then never parsed.
+            chunks = list(chunks)
+            unchanged = digest.hexdigest() == entry["body_sha256"]
+        else:
+            # Otherwise the body is hashed as the parser consumes it and never held whole in memory.
+            unchanged = False
+        if unchanged:
+            events, parsed = replay(entry["parsed"]), entry["parsed"]
+        else:
+            events, parsed = parse(chunks)
+            for _ in chunks:
+                pass
+        validators = {
+            "fingerprint": fingerprint,
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified"),
+            "body_sha256": digest.hexdigest(),
+        }
+    if cache:
+        cache.store(url, {**validators, "parsed": parsed})
+        cache.record(name, "unchanged" if unchanged else "miss")
+    return events
+
+
+def cached_events(events: list[Event]) -> tuple[list[Event], list[dict[str, Any]]]:
+    return events, [event.as_dict() for event in events]
+
+
+def replay_events(rows: list[dict[str, Any]], fetched_at: str) -> list[Event]:
+    return [Event(**{**row, "fetched_at": fetched_at}) for row in rows]
+
+
+def json_source_events(data: Any, source: dict[str, Any], fetched_at: str) -> list[Event]:
     path = source.get("items_path", "")
     for key in [piece for piece in str(path).split(".") if piece]:
         if not isinstance(data, dict) or key not in data:
@@ -176,73 +349,81 @@ def collect_json_source(client: httpx.Client, source: dict[str, Any], fetched_at
     return [build_event(item, source["name"], fetched_at) for item in data if isinstance(item, dict)]
 
 
-def unfold_ics(text: str) -> list[str]:
-    lines: list[str] = []
-    for raw in text.replace("\r\n", "\n").split("\n"):
-        if raw.startswith((" ", "\t")) and lines:
-            lines[-1] += raw[1:]
-        else:
-            lines.append(raw)
-    return lines
-
-
-def decode_ics_value(value: str) -> str:
-    return value.replace("\\n", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
-
-
-def parse_ics_datetime(key: str, value: str) -> str:
-    params = key.split(";")[1:]
-    tzid = next((p.split("=", 1)[1] for p in params if p.startswith("TZID=")), None)
-    date_only = any(p == "VALUE=DATE" for p in params)
-    if date_only or re.fullmatch(r"\d{8}", value):
-        dt = datetime.strptime(value[:8], "%Y%m%d").replace(tzinfo=ZoneInfo(tzid) if tzid else JST)
-    elif value.endswith("Z"):
-        dt = datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
-    else:
-        fmt = "%Y%m%dT%H%M%S" if len(value) >= 15 else "%Y%m%dT%H%M"
-        dt = datetime.strptime(value, fmt).replace(tzinfo=ZoneInfo(tzid) if tzid else JST)
-    return normalize_datetime(dt)
+def collect_json_source(client: httpx.Client, source: dict[str, Any], fetched_at: str, cache: ValidatorCache | None = None) -> list[Event]:
+    return fetch_source_events(
+        client,
+        source,
+        fetched_at,
+        lambda chunks: cached_events(json_source_events(json.loads(b"".join(chunks)), source, fetched_at)),
+        lambda rows: replay_events(rows, fetched_at),
+        cache,
+    )
 
 
-def parse_ics(text: str, source_name: str, fetched_at: str) -> list[Event]:
-    events: list[Event] = []
-    current: dict[str, str] | None = None
-    for line in unfold_ics(text):
-        if line == "BEGIN:VEVENT":
-            current = {}
-            continue
-        if line == "END:VEVENT" and current is not None:
-            try:
-                raw = {
-                    "source_id": current.get("UID"),
-                    "title": decode_ics_value(current.get("SUMMARY", "")),
-                    "starts_at": current["DTSTART"],
-                    "ends_at": current.get("DTEND"),
-                    "description": decode_ics_value(current.get("DESCRIPTION", "")),
-                    "location": decode_ics_value(current.get("LOCATION", "")),
-                    "url": current.get("URL"),
-                    "status": current.get("STATUS", "scheduled").lower(),
-                }
-                events.append(build_event(raw, source_name, fetched_at))
-            except (KeyError, ValueError):
-                pass
-            current = None
+def parse_ics(
+    text: str | Iterable[bytes | str],
+    source_name: str,
+    fetched_at: str,
+    *,
+    window_start: datetime | None = None,
+    window_end: datetime | None = None,
+) -> list[Event]:
+    return expand_ics(iter_vevents(iter_unfolded_lines(text)), source_name, fetched_at, window_start=window_start, window_end=window_end)
+
+
+def expand_ics(
+    components: Iterable[Component],
+    source_name: str,
+    fetched_at: str,
+    *,
+    window_start: datetime | None = None,
+    window_end: datetime | None = None,
+) -> list[Event]:
+    anchor = parse_datetime(fetched_at)
+    window_start = window_start or anchor - timedelta(days=ICS_EXPANSION_PAST_DAYS)
+    window_end = window_end or anchor + timedelta(days=ICS_EXPANSION_FUTURE_DAYS)
+    selected: dict[str, Event] = {}
+    overrides: set[str] = set()
+    for occurrence in expand_components(components, window_start=window_start, window_end=window_end):
+        uid = occurrence.first("UID")
+        source_id = uid[1] if uid else None
+        if source_id and occurrence.recurrence_id:
+            source_id = f"{source_id}:{normalize_datetime(occurrence.recurrence_id)}"
+        url = occurrence.first("URL")
+        status = occurrence.first("STATUS")
+        raw = {
+            "source_id": source_id,
+            "title": occurrence.text("SUMMARY") or "",
+            "starts_at": occurrence.start,
+            "ends_at": normalize_datetime(occurrence.end) if occurrence.end else None,
+            "description": occurrence.text("DESCRIPTION") or "",
+            "location": occurrence.text("LOCATION") or "",
+            "url": url[1] if url else None,
+            "status": status[1].lower() if status else "scheduled",
+        }
+        try:
+            event = build_event(raw, source_name, fetched_at)
+        except ValueError:
             continue
-        if current is None or ":" not in line:
+        if event.id in overrides and not occurrence.override:
             continue
-        key, value = line.split(":", 1)
-        base_key = key.split(";", 1)[0].upper()
-        if base_key in {"DTSTART", "DTEND"}:
-            current[base_key] = parse_ics_datetime(key, value)
-        elif base_key in {"UID", "SUMMARY", "DESCRIPTION", "LOCATION", "URL", "STATUS"}:
-            current[base_key] = value
-    return events
+        if occurrence.override:
+            overrides.add(event.id)
+        selected[event.id] = event
+    return list(selected.values())
 
 
-def collect_ics_source(client: httpx.Client, source: dict[str, Any], fetched_at: str) -> list[Event]:
-    response = client.get(str(source["url"]), headers=source.get("headers"))
-    response.raise_for_status()
-    return parse_ics(response.text, source["name"], fetched_at)
+def collect_ics_source(client: httpx.Client, source: dict[str, Any], fetched_at: str, cache: ValidatorCache | None = None) -> list[Event]:
+    # VEVENT components are cached rather than events, so a 304 re-expands RRULEs against this run's window.
+    def parse(chunks: Iterable[bytes]) -> tuple[list[Event], list[Component]]:
+        components = list(iter_vevents(iter_unfolded_lines(chunks)))
+        return expand_ics(components, source["name"], fetched_at), components
+
+    def replay(components: list[Component]) -> list[Event]:
+        restored = [{name: [(dict(params), value) for params, value in values] for name, values in component.items()} for component in components]
+        return expand_ics(restored, source["name"], fetched_at)
+
+    return fetch_source_events(client, source, fetched_at, parse, replay, cache)
 
 
 def collect_manual_source(source: dict[str, Any], config_dir: Path, fetched_at: str) -> list[Event]:
@@ -269,21 +450,9 @@ def x_post_to_event(post: dict[str, Any], users: dict[str, str], source_name: st
     if not text or not created_at:
         return None
     created = parse_datetime(str(created_at)).astimezone(JST)
-    date_match = re.search(r"(?:(\d{4})[./年-])?(\d{1,2})[./月-](\d{1,2})日?", text)
-    time_match = re.search(r"(?<!\d)([01]?\d|2[0-3])[:時](\d{2})?", text)
-    if not date_match or not time_match:
-        return None
-    year = int(date_match.group(1) or created.year)
-    month = int(date_match.group(2))
-    day = int(date_match.group(3))
-    hour = int(time_match.group(1))
-    minute = int(time_match.group(2) or 0)
-    try:
-        start = datetime(year, month, day, hour, minute, tzinfo=JST)
-    except ValueError:
+    start = date_resolution.loose_datetime(text, created)
+    if start is None:
         return None
-    if not date_match.group(1) and start < created - timedelta(days=45):
-        start = start.replace(year=start.year + 1)
     author_id = str(post.get("author_id") or "")
     username = users.get(author_id)
     post_id = str(post.get("id"))
@@ -355,14 +524,14 @@ def collect_vrchat_group_source(client: httpx.Client, source: dict[str, Any], fe
     return events
 
 
-def collect_source(client: httpx.Client, source: dict[str, Any], config_dir: Path, fetched_at: str) -> list[Event]:
+def collect_source(client: httpx.Client, source: dict[str, Any], config_dir: Path, fetched_at: str, cache: ValidatorCache | None = None) -> list[Event]:
     source_type = clean_text(source.get("type"))
     if source_type == "manual_json":
         return collect_manual_source(source, config_dir, fetched_at)
     if source_type == "json":
-        return collect_json_source(client, source, fetched_at)
+        return collect_json_source(client, source, fetched_at, cache)
     if source_type == "ics":
-        return collect_ics_source(client, source, fetched_at)
+        return collect_ics_source(client, source, fetched_at, cache)
     if source_type in {"x_recent_search", "x_list"}:
         return collect_x_source(client, source, fetched_at)
     if source_type == "vrchat_group":
@@ -377,9 +546,7 @@ def deduplicate(events: Iterable[Event]) -> list[Event]:
         if current is None:
             selected[event.id] = event
             continue
-        current_updated = parse_datetime(current.fetched_at or "1970-01-01T00:00:00Z")
-        candidate_updated = parse_datetime(event.fetched_at or "1970-01-01T00:00:00Z")
-        if candidate_updated >= current_updated:
+        if event.fetched >= current.fetched:
             selected[event.id] = event
     return sorted(selected.values(), key=lambda item: (item.start, item.title.casefold()))
 
@@ -408,76 +575,200 @@ def fold_ics(line: str) -> str:
     return "\r\n ".join(chunk.decode("utf-8") for chunk in chunks)
 
 
+ICS_HEADER = (
+    "BEGIN:VCALENDAR",
+    "VERSION:2.0",
+    "PRODID:-//KAFKA2306//cast_event_cal//JA",
+    "CALSCALE:GREGORIAN",
+    "METHOD:PUBLISH",
+    "X-WR-CALNAME:VRChat Event Calendar",
+    "X-WR-TIMEZONE:Asia/Tokyo",
+)
+
+
+@lru_cache(maxsize=16384)
+def render_vevent(
+    uid: str,
+    start: datetime,
+    end: datetime | None,
+    title: str,
+    description: str | None,
+    location: str | None,
+    url: str | None,
+    status: str,
+) -> tuple[str, str]:
+    lines = [f"DTSTART:{start.strftime('%Y%m%dT%H%M%SZ')}"]
+    if end:
+        lines.append(f"DTEND:{end.strftime('%Y%m%dT%H%M%SZ')}")
+    lines.append(f"SUMMARY:{ics_escape(title)}")
+    if description:
+        lines.append(f"DESCRIPTION:{ics_escape(description)}")
+    if location:
+        lines.append(f"LOCATION:{ics_escape(location)}")
+    if url:
+        lines.append(f"URL:{url}")
+    if status == "cancelled":
+        lines.append("STATUS:CANCELLED")
+    lines.append("END:VEVENT")
+    head = f"BEGIN:VEVENT\r\n{fold_ics(f'UID:{uid}@cast-event-cal')}\r\n"
+    return head, "".join(f"{fold_ics(line)}\r\n" for line in lines)
+
+
+class IcsWriter:
+    def __init__(self, handle: TextIO, generated_at: datetime) -> None:
+        self.handle = handle
+        self.stamp = f"DTSTAMP:{generated_at.astimezone(UTC).strftime('%Y%m%dT%H%M%SZ')}\r\n"
+        self.count = 0
+
+    def __enter__(self) -> "IcsWriter":
+        self.handle.write("".join(f"{line}\r\n" for line in ICS_HEADER))
+        return self
+
+    def write(self, event: Event) -> None:
+        head, body = render_vevent(event.id, event.start, event.end, event.title, event.description, event.location, event.url, event.status)
+        self.handle.write(head)
+        self.handle.write(self.stamp)
+        self.handle.write(body)
+        self.count += 1
+
+    def __exit__(self, *exc_info: object) -> None:
+        if exc_info[0] is None:
+            self.handle.write("END:VCALENDAR\r\n")
+
+
 def render_ics(events: Iterable[Event], generated_at: datetime) -> str:
-    stamp = generated_at.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
-    lines = [
-        "BEGIN:VCALENDAR",
-        "VERSION:2.0",
-        "PRODID:-//KAFKA2306//cast_event_cal//JA",
-        "CALSCALE:GREGORIAN",
-        "METHOD:PUBLISH",
-        "X-WR-CALNAME:VRChat Event Calendar",
-        "X-WR-TIMEZONE:Asia/Tokyo",
-    ]
-    for event in events:
-        lines.extend(["BEGIN:VEVENT", f"UID:{event.id}@cast-event-cal", f"DTSTAMP:{stamp}"])
-        lines.append(f"DTSTART:{event.start.strftime('%Y%m%dT%H%M%SZ')}")
-        if event.ends_at:
-            lines.append(f"DTEND:{parse_datetime(event.ends_at).strftime('%Y%m%dT%H%M%SZ')}")
-        lines.append(f"SUMMARY:{ics_escape(event.title)}")
-        if event.description:
-            lines.append(f"DESCRIPTION:{ics_escape(event.description)}")
-        if event.location:
-            lines.append(f"LOCATION:{ics_escape(event.location)}")
-        if event.url:
-            lines.append(f"URL:{event.url}")
-        if event.status == "cancelled":
-            lines.append("STATUS:CANCELLED")
-        lines.append("END:VEVENT")
-    lines.append("END:VCALENDAR")
-    return "\r\n".join(fold_ics(line) for line in lines) + "\r\n"
+    buffer = io.StringIO(newline="")
+    with IcsWriter(buffer, generated_at) as writer:
+        for event in events:
+            writer.write(event)
+    return buffer.getvalue()
 
 
-def write_outputs(events: list[Event], health: dict[str, Any], output_dir: Path, generated_at: datetime) -> None:
-    output_dir.mkdir(parents=True, exist_ok=True)
-    payload = {
+def write_ics(path: Path, events: Iterable[Event], generated_at: datetime) -> int:
+    with path.open("w", encoding="utf-8", newline="") as handle, IcsWriter(handle, generated_at) as writer:
+        for event in events:
+            writer.write(event)
+    return writer.count
+
+
+def events_header(events: list[Event], generated_at: datetime) -> dict[str, Any]:
+    return {
         "schema_version": "2.0",
         "generated_at": normalize_datetime(generated_at),
         "timezone": "Asia/Tokyo",
         "count": len(events),
-        "events": [asdict(event) for event in events],
     }
-    (output_dir / "events.json").write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    (output_dir / "calendar.ics").write_text(render_ics(events, generated_at), encoding="utf-8", newline="")
+
+
+def write_outputs(events: list[Event], health: dict[str, Any], output_dir: Path, generated_at: datetime) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    write_events_document(output_dir / "events.json", events_header(events, generated_at), (event.as_dict() for event in events))
+    write_ics(output_dir / "calendar.ics", events, generated_at)
     (output_dir / "health.json").write_text(json.dumps(health, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     (output_dir / ".nojekyll").write_text("", encoding="utf-8")
 
 
-def run(config_path: Path, output_dir: Path, *, strict: bool = False) -> int:
+def source_row(name: str, started: float, events: list[Event] | None = None, error: BaseException | str | None = None) -> dict[str, Any]:
+    duration_ms = int((time.monotonic() - started) * 1000)
+    if error is not None:
+        message = error if isinstance(error, str) else f"{type(error).__name__}: {error}"
+        return {"name": name, "status": "error", "count": 0, "error": message, "duration_ms": duration_ms}
+    return {"name": name, "status": "ok", "count": len(events or []), "duration_ms": duration_ms}
+
+
+def run_in_slot(function: Callable[[int], list[Event]], index: int, future: Future[list[Event]], slots: threading.Semaphore) -> None:
+    with slots:
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(function(index))
+        except BaseException as exc:
+            future.set_exception(exc)
+
+
+def collect_sources(
+    client: httpx.Client,
+    sources: list[dict[str, Any]],
+    config_dir: Path,
+    fetched_at: str,
+    *,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    deadline: float = DEFAULT_SOURCE_DEADLINE,
+    cache: ValidatorCache | None = None,
+) -> tuple[list[Event], list[dict[str, Any]]]:
+    names = [clean_text(source.get("name") or source.get("type") or "unnamed") for source in sources]
+    deadlines = [float(source.get("deadline_seconds", deadline)) for source in sources]
+    started: dict[int, float] = {}
+    lock = threading.Lock()
+
+    def collect(index: int) -> list[Event]:
+        with lock:
+            started[index] = time.monotonic()
+        return collect_source(client, sources[index], config_dir, fetched_at, cache)
+
+    collected: dict[int, list[Event]] = {}
+    rows: dict[int, dict[str, Any]] = {}
+    # Daemon threads rather than an executor: a source stuck past its deadline must not hold up interpreter exit.
+    slots = threading.Semaphore(max(1, min(concurrency, len(sources) or 1)))
+    pending: dict[Future[list[Event]], int] = {Future(): index for index in range(len(sources))}
+    for future, index in pending.items():
+        threading.Thread(target=run_in_slot, args=(collect, index, future, slots), name=f"source-{index}", daemon=True).start()
+    try:
+        while pending:
+            with lock:
+                running = {index: began for index, began in started.items() if index not in rows}
+            now = time.monotonic()
+            remaining = [began + deadlines[index] - now for index, began in running.items()]
+            done, _ = wait(pending, timeout=max(0.01, min(remaining, default=0.25)), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    collected[index] = future.result()
+                    rows[index] = source_row(names[index], started[index], collected[index])
+                except Exception as exc:
+                    logging.exception("source failed: %s", names[index])
+                    rows[index] = source_row(names[index], started[index], error=exc)
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                began = running.get(index)
+                if began is not None and now - began >= deadlines[index]:
+                    pending.pop(future)
+                    logging.error("source exceeded %.1fs deadline: %s", deadlines[index], names[index])
+                    rows[index] = source_row(names[index], began, error=f"TimeoutError: source deadline of {deadlines[index]:g}s exceeded")
+    finally:
+        for future in pending:
+            future.cancel()
+    if cache:
+        for index, row in rows.items():
+            if row["status"] == "ok" and (outcome := cache.outcomes.get(names[index])):
+                row["cache"] = outcome
+    events = [event for index in range(len(sources)) for event in collected.get(index, [])]
+    return events, [rows[index] for index in range(len(sources))]
+
+
+def build_calendar(config_path: Path, *, concurrency: int | None = None) -> tuple[list[Event], dict[str, Any], datetime]:
     generated_at = utc_now()
     fetched_at = normalize_datetime(generated_at)
     config = load_config(config_path)
     sources = config.get("sources", [])
     if not isinstance(sources, list):
         raise ValueError("sources must be a list")
-    timeout = float(config.get("http", {}).get("timeout_seconds", DEFAULT_TIMEOUT))
-    all_events: list[Event] = []
-    source_results: list[dict[str, Any]] = []
-    enabled_count = 0
-    with httpx.Client(timeout=timeout, follow_redirects=True, headers={"User-Agent": USER_AGENT}) as client:
-        for source in sources:
-            if not isinstance(source, dict) or not source.get("enabled", True):
-                continue
-            enabled_count += 1
-            name = clean_text(source.get("name") or source.get("type") or "unnamed")
-            started = utc_now()
-            try:
-                events = collect_source(client, source, config_path.parent, fetched_at)
-                all_events.extend(events)
-                source_results.append({"name": name, "status": "ok", "count": len(events), "duration_ms": int((utc_now() - started).total_seconds() * 1000)})
-            except Exception as exc:
-                logging.exception("source failed: %s", name)
-                source_results.append({"name": name, "status": "error", "count": 0, "error": f"{type(exc).__name__}: {exc}", "duration_ms": int((utc_now() - started).total_seconds() * 1000)})
+    http_config = config.get("http", {})
+    timeout = float(http_config.get("timeout_seconds", DEFAULT_TIMEOUT))
+    enabled = [source for source in sources if isinstance(source, dict) and source.get("enabled", True)]
+    enabled_count = len(enabled)
+    cache_path = http_config.get("validator_cache")
+    cache = ValidatorCache((config_path.parent.parent / cache_path).resolve() if cache_path else None)
+    all_events, source_results = collect_sources(
+        session(timeout=timeout, user_agent=USER_AGENT),
+        enabled,
+        config_path.parent,
+        fetched_at,
+        concurrency=int(concurrency or http_config.get("concurrency", DEFAULT_CONCURRENCY)),
+        deadline=float(http_config.get("source_deadline_seconds", DEFAULT_SOURCE_DEADLINE)),
+        cache=cache,
+    )
+    cache.save()
     events = deduplicate(all_events)
     window = config.get("window", {})
     events = filter_window(events, past_days=int(window.get("past_days", 1)), future_days=int(window.get("future_days", 120)), now=generated_at)
@@ -491,17 +782,27 @@ def run(config_path: Path, output_dir: Path, *, strict: bool = False) -> int:
         "enabled_sources": enabled_count,
         "successful_sources": succeeded,
         "failed_sources": failed,
+        "cache_hits": sum(item.get("cache") in {"not_modified", "unchanged"} for item in source_results),
         "event_count": len(events),
         "sources": source_results,
     }
-    write_outputs(events, health, output_dir, generated_at)
-    if strict and failed:
+    return events, health, generated_at
+
+
+def exit_status(health: dict[str, Any], *, strict: bool = False) -> int:
+    if strict and health["failed_sources"]:
         return 2
-    if enabled_count and succeeded == 0:
+    if health["enabled_sources"] and health["successful_sources"] == 0:
         return 1
     return 0
 
 
+def run(config_path: Path, output_dir: Path, *, strict: bool = False, concurrency: int | None = None) -> int:
+    events, health, generated_at = build_calendar(config_path, concurrency=concurrency)
+    write_outputs(events, health, output_dir, generated_at)
+    return exit_status(health, strict=strict)
+
+
 def validate(config_path: Path) -> int:
     config = load_config(config_path)
     errors: list[str] = []
@@ -532,17 +833,46 @@ def build_parser() -> argparse.ArgumentParser:
     run_parser.add_argument("--config", type=Path, default=Path("config/sources.yaml"))
     run_parser.add_argument("--output", type=Path, default=Path("public"))
     run_parser.add_argument("--strict", action="store_true")
+    run_parser.add_argument("--concurrency", type=int, help="maximum number of sources collected at once")
+    run_parser.add_argument("--profile", action="store_true", help=f"record timings and hot spots in {TIMINGS_PATH}")
     validate_parser = sub.add_parser("validate", help="validate source configuration")
     validate_parser.add_argument("--config", type=Path, default=Path("config/sources.yaml"))
+    pipeline_parser = sub.add_parser("pipeline", help="run the publish stages in one process, passing events.json between them in memory")
+    pipeline_parser.add_argument("--config", type=Path, default=Path("config/sources.yaml"))
+    pipeline_parser.add_argument("--strict", action="store_true")
+    pipeline_parser.add_argument("--concurrency", type=int, help="maximum number of sources collected at once")
+    pipeline_parser.add_argument("--from", dest="start", help="resume from this stage using the artifacts already in public/")
+    pipeline_parser.add_argument("--until", dest="stop", help="stop after this stage")
+    pipeline_parser.add_argument("--checkpoint", action="append", default=[], help="also write artifacts after this stage")
+    pipeline_parser.add_argument("--profile", action="store_true", help=f"record per-stage timings and hot spots in {TIMINGS_PATH}")
+    compact_parser = sub.add_parser("compact-json", help="rewrite published JSON documents without indentation")
+    compact_parser.add_argument("paths", type=Path, nargs="+")
     return parser
 
 
+def compact_json(paths: list[Path]) -> int:
+    for path in paths:
+        saved = compact_file(path)
+        print(f"{path}: {path.stat().st_size} bytes ({saved} saved)")
+    return 0
+
+
 def main(argv: list[str] | None = None) -> int:
     logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO"), format="%(asctime)s %(levelname)s %(message)s")
     args = build_parser().parse_args(argv)
+    if getattr(args, "profile", False):
+        enable_profiling()
     if args.command == "validate":
         return validate(args.config)
-    return run(args.config, args.output, strict=args.strict)
+    if args.command == "compact-json":
+        return compact_json(args.paths)
+    if args.command == "pipeline":
+        from cast_event_cal.pipeline import PipelineOptions, run_pipeline
+
+        options = PipelineOptions(config=args.config, strict=args.strict, concurrency=args.concurrency)
+        return run_pipeline(options, start=args.start, stop=args.stop, checkpoints=args.checkpoint)
+    with profile_stage("calendar"):
+        return run(args.config, args.output, strict=args.strict, concurrency=args.concurrency)
 
 
 if __name__ == "__main__":
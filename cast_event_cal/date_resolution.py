@@ -0,0 +1,305 @@
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from typing import Callable, Iterable, Literal
+from zoneinfo import ZoneInfo
+
+JST = ZoneInfo("Asia/Tokyo")
+MEMO_SIZE = 16384
+WEEKDAY_INDEX = {name: index for index, name in enumerate("月火水木金土日")}
+NORMALIZATION = str.maketrans({"：": ":", "／": "/", "．": ".", "－": "-", "〜": "~", "～": "~"})
+CLOCK = r"(?P<hour>[01]?\d|2[0-3])(?:[:時](?P<minute>\d{2})?)"
+POST_CLOCK = r"(?P<hour>[01]?\d|2[0-3])[:時](?P<minute>\d{2})?"
+POST_WEEKDAY = r"(?:\([月火水木金土日]\)|（[月火水木金土日]）)?"
+EXPLICIT_PATTERNS = (
+    re.compile(
+        rf"(?P<year>20\d{{2}})[./年-](?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?(?:\s*[（(]?[月火水木金土日][）)]?)?.{{0,40}}?{CLOCK}",
+        re.IGNORECASE | re.DOTALL,
+    ),
+    re.compile(
+        rf"(?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?(?:\s*[（(]?[月火水木金土日][）)]?)?.{{0,40}}?{CLOCK}",
+        re.IGNORECASE | re.DOTALL,
+    ),
+)
+RELATIVE_CLOCK_PATTERN = re.compile(rf"(?P<day>本日|今日|明日).{{0,30}}?{CLOCK}", re.IGNORECASE | re.DOTALL)
+WEEKDAY_PATTERN = re.compile(
+    rf"(?P<prefix>次(?:の)?|来週(?:の)?|今週(?:の)?)?\s*(?P<weekday>[月火水木金土日])曜日?.{{0,100}}?{CLOCK}",
+    re.IGNORECASE | re.DOTALL,
+)
+RELATIVE_DAY_PATTERN = re.compile(r"本日|今日|明日")
+EXPLICIT_DATE_PATTERN = re.compile(r"(?:20\d{2}[./年-])?\d{1,2}[./月-]\d{1,2}日?")
+POST_PATTERNS = (
+    re.compile(
+        rf"(?P<year>20\d{{2}})[./年-](?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?{POST_WEEKDAY}.*?{POST_CLOCK}",
+        re.IGNORECASE | re.DOTALL,
+    ),
+    re.compile(rf"(?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?{POST_WEEKDAY}.*?{POST_CLOCK}", re.IGNORECASE | re.DOTALL),
+)
+LOOSE_DATE_PATTERN = re.compile(r"(?:(?P<year>\d{4})[./年-])?(?P<month>\d{1,2})[./月-](?P<day>\d{1,2})日?")
+LOOSE_TIME_PATTERN = re.compile(r"(?<!\d)(?P<hour>[01]?\d|2[0-3])[:時](?P<minute>\d{2})?")
+
+WeekdayPolicy = Literal["calendar_week", "next_occurrence"]
+
+
+@dataclass(frozen=True)
+class DateResolution:
+    event_at: datetime
+    method: str
+    anchor: datetime
+    matched_text: str
+
+    def evidence(self, utc_text: Callable[[datetime], str]) -> dict[str, str]:
+        return {
+            "method": self.method,
+            "anchor": utc_text(self.anchor),
+            "resolved_at": utc_text(self.event_at),
+            "timezone": "Asia/Tokyo",
+            "week_start": "monday",
+            "matched_text": self.matched_text,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class ParsedText:
+    explicit: tuple[int | None, int, int, int, int] | None
+    relative: tuple[int, int, int] | None
+    weekday: tuple[str, int, int, int, str] | None
+    explicit_method: str
+
+
+@dataclass(frozen=True, slots=True)
+class Pending:
+    event_at: datetime
+    method: str
+    matched_text: str
+    rule: str = "fixed"
+    alternative: datetime | None = None
+
+
+def normalize(text: str) -> str:
+    return text.translate(NORMALIZATION)
+
+
+def jst(value: datetime) -> datetime:
+    return value.replace(tzinfo=JST) if value.tzinfo is None else value.astimezone(JST)
+
+
+def minute(match: re.Match[str]) -> int:
+    return int(match.group("minute") or 0)
+
+
+def needs_weekday(explicit: tuple[int | None, int, int, int, int] | None, relative: tuple[int, int, int] | None) -> bool:
+    # Weekday phrases are only consulted when the explicit date cannot resolve for some anchor.
+    if relative is not None:
+        return False
+    if explicit is None:
+        return True
+    year, month, day, hour, minute_value = explicit
+    if not year and (month, day) == (2, 29):
+        return True
+    try:
+        datetime(year or 2000, month, day, hour, minute_value)
+    except ValueError:
+        return True
+    return False
+
+
+def scan_text(text: str) -> ParsedText:
+    normalized = normalize(text)
+    explicit = relative = weekday = None
+    for pattern in EXPLICIT_PATTERNS:
+        if match := pattern.search(normalized):
+            year = match.groupdict().get("year")
+            explicit = (int(year) if year else None, int(match.group("month")), int(match.group("day")), int(match.group("hour")), minute(match))
+            break
+    else:
+        if match := RELATIVE_CLOCK_PATTERN.search(normalized):
+            relative = (1 if match.group("day") == "明日" else 0, int(match.group("hour")), minute(match))
+    if needs_weekday(explicit, relative) and (match := WEEKDAY_PATTERN.search(normalized)):
+        weekday = ((match.group("prefix") or "").strip(), WEEKDAY_INDEX[match.group("weekday")], int(match.group("hour")), minute(match), match.group(0)[:160])
+    if explicit is None and relative is None:
+        method = ""
+    elif RELATIVE_DAY_PATTERN.search(text):
+        method = "relative_day_from_source_timestamp"
+    elif EXPLICIT_DATE_PATTERN.search(text):
+        method = "explicit_calendar_date"
+    else:
+        method = "explicit_datetime"
+    return ParsedText(explicit, relative, weekday, method)
+
+
+parse_text = lru_cache(maxsize=MEMO_SIZE)(scan_text)
+
+
+def at(day: date, hour: int, minute_value: int) -> datetime:
+    return datetime(day.year, day.month, day.day, hour, minute_value, tzinfo=JST)
+
+
+def explicit_pending(parsed: ParsedText, anchor_date: date) -> Pending | None:
+    if parsed.explicit is not None:
+        year, month, day, hour, minute_value = parsed.explicit
+        try:
+            event_at = datetime(year or anchor_date.year, month, day, hour, minute_value, tzinfo=JST)
+        except ValueError:
+            return None
+        if year:
+            return Pending(event_at, parsed.explicit_method, "explicit")
+        try:
+            rolled = event_at.replace(year=event_at.year + 1)
+        except ValueError:
+            rolled = None
+        return Pending(event_at, parsed.explicit_method, "explicit", "roll_year", rolled)
+    if parsed.relative is not None:
+        offset, hour, minute_value = parsed.relative
+        return Pending(at(anchor_date + timedelta(days=offset), hour, minute_value), parsed.explicit_method, "explicit")
+    return None
+
+
+def weekday_pending(parsed: ParsedText, anchor_date: date, policy: WeekdayPolicy) -> Pending | None:
+    if parsed.weekday is None:
+        return None
+    prefix, target, hour, minute_value, matched = parsed.weekday
+    days_ahead = (target - anchor_date.weekday()) % 7
+    if policy == "next_occurrence":
+        if prefix.startswith("来週"):
+            days_ahead += 7
+        elif prefix.startswith("次") and days_ahead == 0:
+            days_ahead = 7
+        method = "next_occurrence_explicit" if prefix else "next_occurrence_unprefixed"
+        rule = "roll_week" if not prefix and days_ahead == 0 else "fixed"
+        return Pending(at(anchor_date + timedelta(days=days_ahead), hour, minute_value), method, matched, rule)
+    week_start = anchor_date - timedelta(days=anchor_date.weekday())
+    if prefix.startswith("来週"):
+        return Pending(at(week_start + timedelta(days=7 + target), hour, minute_value), "next_calendar_week_weekday", matched)
+    if prefix.startswith("今週"):
+        return Pending(at(week_start + timedelta(days=target), hour, minute_value), "current_calendar_week_weekday", matched, "not_past")
+    if prefix.startswith("次") and days_ahead == 0:
+        days_ahead = 7
+    method = "next_occurrence_explicit" if prefix.startswith("次") else "next_occurrence_unprefixed"
+    return Pending(at(anchor_date + timedelta(days=days_ahead), hour, minute_value), method, matched, "fixed" if prefix else "roll_week")
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def day_resolution(text: str, anchor_date: date, weekdays: WeekdayPolicy | None) -> tuple[Pending | None, Pending | None]:
+    """Everything that depends only on the text and the anchor's JST calendar date."""
+    parsed = parse_text(text)
+    return explicit_pending(parsed, anchor_date), weekday_pending(parsed, anchor_date, weekdays) if weekdays else None
+
+
+def finish(pending: Pending, anchor: datetime) -> datetime | None:
+    if pending.rule == "roll_year" and pending.event_at < anchor - timedelta(days=2):
+        return pending.alternative
+    if pending.rule == "not_past" and pending.event_at < anchor:
+        return None
+    if pending.rule == "roll_week" and pending.event_at < anchor - timedelta(hours=2):
+        return pending.event_at + timedelta(days=7)
+    return pending.event_at
+
+
+def settle(explicit: Pending | None, weekday: Pending | None, anchor_jst: datetime) -> DateResolution | None:
+    for pending in (explicit, weekday):
+        if pending is not None and (event_at := finish(pending, anchor_jst)) is not None:
+            return DateResolution(event_at=event_at, method=pending.method, anchor=anchor_jst, matched_text=pending.matched_text)
+    return None
+
+
+def resolve(
+    text: str,
+    anchor: datetime,
+    *,
+    weekdays: WeekdayPolicy | None = "calendar_week",
+    explicit_parser: Callable[[str, datetime], datetime | None] | None = None,
+) -> DateResolution | None:
+    anchor_jst = jst(anchor)
+    explicit, weekday = day_resolution(text, anchor_jst.date(), weekdays)
+    if explicit_parser is not None:
+        parsed = explicit_parser(text, anchor_jst)
+        explicit = Pending(jst(parsed), parse_text(text).explicit_method, "explicit") if parsed else None
+    return settle(explicit, weekday, anchor_jst)
+
+
+def resolve_many(
+    texts: Iterable[str], anchors: Iterable[datetime], *, weekdays: WeekdayPolicy | None = "calendar_week"
+) -> list[DateResolution | None]:
+    return [resolve(text, anchor, weekdays=weekdays) for text, anchor in zip(texts, anchors, strict=True)]
+
+
+@dataclass(slots=True)
+class TextResolutions:
+    """One text scanned once and resolved for any number of anchors and weekday policies."""
+
+    text: str
+    parsed: ParsedText = field(init=False)
+    resolved: dict[tuple[datetime, WeekdayPolicy | None], DateResolution | None] = field(default_factory=dict, init=False)
+
+    def __post_init__(self) -> None:
+        self.parsed = scan_text(self.text)
+
+    def resolve(self, anchor: datetime, weekdays: WeekdayPolicy | None = "calendar_week") -> DateResolution | None:
+        key = (anchor, weekdays)
+        if key not in self.resolved:
+            anchor_jst = jst(anchor)
+            weekday = weekday_pending(self.parsed, anchor_jst.date(), weekdays) if weekdays else None
+            self.resolved[key] = settle(explicit_pending(self.parsed, anchor_jst.date()), weekday, anchor_jst)
+        return self.resolved[key]
+
+
+def explicit_datetime(text: str, anchor: datetime) -> datetime | None:
+    resolution = resolve(text, anchor, weekdays=None)
+    return resolution.event_at if resolution else None
+
+
+def post_datetime(text: str, created_at: datetime) -> datetime | None:
+    normalized = normalize(text)
+    for pattern in POST_PATTERNS:
+        match = pattern.search(normalized)
+        if not match:
+            continue
+        year = match.groupdict().get("year")
+        try:
+            candidate = datetime(int(year or created_at.year), int(match.group("month")), int(match.group("day")), int(match.group("hour")), minute(match), tzinfo=JST)
+        except ValueError:
+            return None
+        if not year and candidate < created_at - timedelta(days=45):
+            try:
+                candidate = candidate.replace(year=candidate.year + 1)
+            except ValueError:
+                return None
+        return candidate
+    return None
+
+
+def loose_datetime(text: str, created_at: datetime) -> datetime | None:
+    normalized = normalize(text)
+    date_match = LOOSE_DATE_PATTERN.search(normalized)
+    time_match = LOOSE_TIME_PATTERN.search(normalized)
+    if not date_match or not time_match:
+        return None
+    year = date_match.group("year")
+    try:
+        start = datetime(int(year or created_at.year), int(date_match.group("month")), int(date_match.group("day")), int(time_match.group("hour")), minute(time_match), tzinfo=JST)
+    except ValueError:
+        return None
+    if not year and start < created_at - timedelta(days=45):
+        start = start.replace(year=start.year + 1)
+    return start
+
+
+def cache_info() -> dict[str, int]:
+    parsed, resolved = parse_text.cache_info(), day_resolution.cache_info()
+    return {
+        "text_hits": parsed.hits,
+        "text_misses": parsed.misses,
+        "hits": resolved.hits,
+        "misses": resolved.misses,
+        "size": resolved.currsize,
+        "max_size": MEMO_SIZE,
+    }
+
+
+def cache_clear() -> None:
+    parse_text.cache_clear()
+    day_resolution.cache_clear()
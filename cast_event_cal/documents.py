@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Iterable, TextIO
+
+JSON_STYLE_ENV = "CAST_EVENT_CAL_JSON_STYLE"
+COMPACT_SEPARATORS = (",", ":")
+
+
+def compact_default() -> bool:
+    return os.environ.get(JSON_STYLE_ENV, "").strip().casefold() == "compact"
+
+
+def dumps(value: Any, *, compact: bool = False) -> str:
+    if compact:
+        return json.dumps(value, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+    return json.dumps(value, ensure_ascii=False, indent=2)
+
+
+def stream_document(handle: TextIO, document: dict[str, Any], records: Iterable[Any], *, records_key: str = "events", compact: bool = False) -> int:
+    count = 0
+    handle.write("{")
+    keys = list(document) if records_key in document else [*document, records_key]
+    for position, key in enumerate(keys):
+        if position:
+            handle.write(",")
+        if not compact:
+            handle.write("\n  ")
+        handle.write(json.dumps(key, ensure_ascii=False))
+        handle.write(":" if compact else ": ")
+        if key != records_key:
+            text = dumps(document[key], compact=compact)
+            handle.write(text if compact else text.replace("\n", "\n  "))
+            continue
+        handle.write("[")
+        for record in records:
+            if count:
+                handle.write(",")
+            if compact:
+                handle.write(dumps(record, compact=True))
+            else:
+                handle.write("\n    ")
+                handle.write(dumps(record).replace("\n", "\n    "))
+            count += 1
+        if count and not compact:
+            handle.write("\n  ")
+        handle.write("]")
+    if keys and not compact:
+        handle.write("\n")
+    handle.write("}\n")
+    return count
+
+
+def write_events_document(
+    path: Path,
+    document: dict[str, Any],
+    records: Iterable[Any] | None = None,
+    *,
+    records_key: str = "events",
+    compact: bool | None = None,
+) -> int:
+    records = document.get(records_key, []) if records is None else records
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temporary = path.with_suffix(path.suffix + ".tmp")
+    with temporary.open("w", encoding="utf-8") as handle:
+        count = stream_document(handle, document, records, records_key=records_key, compact=compact_default() if compact is None else compact)
+    temporary.replace(path)
+    return count
+
+
+def compact_file(path: Path) -> int:
+    document = json.loads(path.read_text(encoding="utf-8"))
+    before = path.stat().st_size
+    if isinstance(document, dict) and isinstance(document.get("events"), list):
+        write_events_document(path, document, compact=True)
+    else:
+        path.write_text(dumps(document, compact=True) + "\n", encoding="utf-8")
+    return before - path.stat().st_size
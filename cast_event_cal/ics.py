@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import codecs
+import re
+from dataclasses import dataclass
+from datetime import UTC, datetime, time
+from typing import Iterable, Iterator
+from zoneinfo import ZoneInfo
+
+from dateutil.rrule import rrulestr
+
+from cast_event_cal.timestamps import safe_zoneinfo
+
+JST = ZoneInfo("Asia/Tokyo")
+LINE_BREAK = re.compile(r"\r\n|\r|\n")
+DATE_ONLY = re.compile(r"\d{8}")
+
+Property = tuple[dict[str, str], str]
+Component = dict[str, list[Property]]
+
+
+@dataclass(slots=True)
+class Occurrence:
+    component: Component
+    start: datetime
+    end: datetime | None
+    recurrence_id: datetime | None = None
+    recurring: bool = False
+    override: bool = False
+
+    def first(self, name: str) -> Property | None:
+        return first_property(self.component, name)
+
+    def text(self, name: str) -> str | None:
+        item = self.first(name)
+        return decode_value(item[1]) if item else None
+
+
+def iter_unfolded_lines(chunks: Iterable[bytes | str] | bytes | str) -> Iterator[str]:
+    if isinstance(chunks, (bytes, str)):
+        chunks = [chunks]
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    pending = ""
+    current: str | None = None
+    for chunk in chunks:
+        pending += decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        held = "\r" if pending.endswith("\r") else ""
+        pieces = LINE_BREAK.split(pending[: len(pending) - len(held)])
+        pending = pieces.pop() + held
+        for raw in pieces:
+            if raw[:1] in (" ", "\t") and current is not None:
+                current += raw[1:]
+            else:
+                if current is not None:
+                    yield current
+                current = raw
+    pending += decoder.decode(b"", final=True)
+    for raw in LINE_BREAK.split(pending):
+        if raw[:1] in (" ", "\t") and current is not None:
+            current += raw[1:]
+        else:
+            if current is not None:
+                yield current
+            current = raw
+    if current:
+        yield current
+
+
+def decode_value(value: str) -> str:
+    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+def parse_property(line: str) -> tuple[str, dict[str, str], str] | None:
+    if ":" not in line:
+        return None
+    left, value = line.split(":", 1)
+    pieces = left.split(";")
+    params: dict[str, str] = {}
+    for piece in pieces[1:]:
+        if "=" in piece:
+            key, param_value = piece.split("=", 1)
+            params[key.upper()] = param_value.strip('"')
+    return pieces[0].upper(), params, value
+
+
+def first_property(component: Component, name: str) -> Property | None:
+    values = component.get(name, [])
+    return values[0] if values else None
+
+
+def parse_datetime_value(value: str, params: dict[str, str], *, default_timezone: str = "Asia/Tokyo") -> datetime:
+    return parse_local_datetime(value, params, default_timezone=default_timezone).astimezone(UTC)
+
+
+def parse_local_datetime(value: str, params: dict[str, str], *, default_timezone: str = "Asia/Tokyo") -> datetime:
+    timezone = safe_zoneinfo(params.get("TZID") or default_timezone)
+    if params.get("VALUE") == "DATE" or DATE_ONLY.fullmatch(value):
+        return datetime.strptime(value[:8], "%Y%m%d").replace(tzinfo=timezone)
+    if value.endswith("Z"):
+        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
+    fmt = "%Y%m%dT%H%M%S" if len(value) >= 15 else "%Y%m%dT%H%M"
+    return datetime.strptime(value, fmt).replace(tzinfo=timezone)
+
+
+def iter_vevents(lines: Iterable[str]) -> Iterator[Component]:
+    current: Component | None = None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            current = {}
+        elif line == "END:VEVENT" and current is not None:
+            yield current
+            current = None
+        elif current is not None and (parsed := parse_property(line)):
+            name, params, value = parsed
+            current.setdefault(name, []).append((params, value))
+
+
+def iter_occurrences(
+    source: Iterable[bytes | str] | bytes | str,
+    *,
+    default_timezone: str = "Asia/Tokyo",
+    window_start: datetime | None = None,
+    window_end: datetime | None = None,
+) -> Iterator[Occurrence]:
+    return expand_components(
+        iter_vevents(iter_unfolded_lines(source)), default_timezone=default_timezone, window_start=window_start, window_end=window_end
+    )
+
+
+def expand_components(
+    components: Iterable[Component],
+    *,
+    default_timezone: str = "Asia/Tokyo",
+    window_start: datetime | None = None,
+    window_end: datetime | None = None,
+) -> Iterator[Occurrence]:
+    for component in components:
+        start_item = first_property(component, "DTSTART")
+        if not start_item:
+            continue
+        try:
+            local_start = parse_local_datetime(start_item[1], start_item[0], default_timezone=default_timezone)
+            start = local_start.astimezone(UTC)
+            end_item = first_property(component, "DTEND")
+            end = parse_datetime_value(end_item[1], end_item[0], default_timezone=default_timezone) if end_item else None
+            recurrence_id_item = first_property(component, "RECURRENCE-ID")
+            recurrence_id = (
+                parse_datetime_value(recurrence_id_item[1], recurrence_id_item[0], default_timezone=default_timezone) if recurrence_id_item else None
+            )
+            exdates = {
+                parse_datetime_value(value, params, default_timezone=default_timezone)
+                for params, values in component.get("EXDATE", [])
+                for value in values.split(",")
+            }
+        except ValueError:
+            continue
+        duration = end - start if end else None
+        rule_item = first_property(component, "RRULE")
+        recurring = bool(rule_item or recurrence_id)
+        if rule_item and recurrence_id is None:
+            instants = expand_rule(rule_item[1], local_start, window_start, window_end)
+        else:
+            instants = iter([start])
+        for instant in instants:
+            instant = instant.astimezone(UTC)
+            if instant in exdates:
+                continue
+            if window_start is not None and instant < window_start:
+                continue
+            if window_end is not None and instant > window_end:
+                continue
+            yield Occurrence(
+                component=component,
+                start=instant,
+                end=instant + duration if duration is not None else None,
+                recurrence_id=(recurrence_id or instant) if recurring else None,
+                recurring=recurring,
+                override=recurrence_id is not None,
+            )
+
+
+def expand_rule(rule: str, start: datetime, window_start: datetime | None, window_end: datetime | None) -> Iterator[datetime]:
+    """Expand in the DTSTART's own zone so instances keep their wall-clock time across DST changes."""
+    try:
+        instants = rrulestr(coerce_until(rule, start), dtstart=start)
+    except (TypeError, ValueError, OverflowError):
+        yield start
+        return
+    iterator = instants.xafter(window_start, inc=True) if window_start is not None else iter(instants)
+    while True:
+        try:
+            instant = next(iterator)
+        except StopIteration:
+            return
+        except (TypeError, ValueError, OverflowError):
+            yield start
+            return
+        if window_end is not None and instant > window_end:
+            return
+        yield instant
+
+
+def coerce_until(rule: str, start: datetime) -> str:
+    """Rewrite a floating or date-only UNTIL as UTC, which dateutil requires when DTSTART is aware."""
+    parts = []
+    for part in rule.split(";"):
+        key, _, value = part.partition("=")
+        if key.strip().upper() == "UNTIL" and value and not value.endswith("Z"):
+            try:
+                if DATE_ONLY.fullmatch(value):
+                    until = datetime.combine(datetime.strptime(value, "%Y%m%d").date(), time(23, 59, 59), tzinfo=start.tzinfo)
+                else:
+                    until = datetime.strptime(value, "%Y%m%dT%H%M%S" if len(value) >= 15 else "%Y%m%dT%H%M").replace(tzinfo=start.tzinfo)
+            except ValueError:
+                parts.append(part)
+                continue
+            part = f"{key}={until.astimezone(UTC):%Y%m%dT%H%M%SZ}"
+        parts.append(part)
+    return ";".join(parts)
@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
+from cast_event_cal.timestamps import jst_date, try_parse_instant
+
 ROOT = Path(__file__).resolve().parents[1]
 PUBLIC = ROOT / "public"
 JST = ZoneInfo("Asia/Tokyo")
@@ -25,15 +27,7 @@ def _events_payload() -> dict[str, Any]:
 
 
 def _parse_time(value: str | None) -> datetime | None:
-    if not value:
-        return None
-    try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=UTC)
-    return parsed
+    return try_parse_instant(value, default_timezone="UTC")
 
 
 def _validate_page(limit: int, offset: int) -> None:
@@ -187,7 +181,7 @@ def tonight_events(date_jst: str | None = None, limit: int = 100, offset: int =
         if not isinstance(row, dict):
             continue
         starts = _parse_time(row.get("starts_at"))
-        if starts is not None and starts.astimezone(JST).date() == target:
+        if starts is not None and jst_date(starts) == target:
             rows.append(row)
     rows.sort(key=lambda row: row.get("starts_at") or "")
     total = len(rows)
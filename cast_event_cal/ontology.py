@@ -7,6 +7,8 @@ from pathlib import Path
 from typing import Any
 
 from cast_event_cal.categories import classify_events, load_category_ontology
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.profiling import run_profiled
 
 ONTOLOGY_PATH = Path("config/event_ontology.json")
 EVENTS_PATH = Path("public/events.json")
@@ -282,12 +284,11 @@ def compact_category_summary(summary: dict[str, Any]) -> dict[str, Any]:
     return {key: value for key, value in summary.items() if key != "organizer_profiles"}
 
 
-def main() -> int:
+def update_document(payload: dict[str, Any], health: dict[str, Any] | None = None) -> None:
     ontology = read_json(ONTOLOGY_PATH)
     validate_ontology(ontology)
     category_ontology = load_category_ontology()
     entries = [item for item in ontology.get("entries", []) if isinstance(item, dict)]
-    payload = read_json(EVENTS_PATH)
     events = [item for item in payload.get("events", []) if isinstance(item, dict)]
 
     enriched: list[dict[str, Any]] = []
@@ -328,7 +329,6 @@ def main() -> int:
     payload["count"] = len(classified)
     payload["event_ontology_schema_version"] = ontology.get("schema_version")
     payload["category_ontology_schema_version"] = category_ontology.get("schema_version")
-    write_json(EVENTS_PATH, payload)
     write_json(PUBLIC_ONTOLOGY_PATH, ontology)
     write_json(PUBLIC_CATEGORY_ONTOLOGY_PATH, category_ontology)
     write_json(
@@ -348,8 +348,7 @@ def main() -> int:
         },
     )
 
-    if HEALTH_PATH.exists():
-        health = read_json(HEALTH_PATH)
+    if health is not None:
         health["ontology"] = {
             "schema_version": ontology.get("schema_version"),
             "curation_mode": ontology.get("governance", {}).get("curation_mode"),
@@ -361,13 +360,21 @@ def main() -> int:
             "status": "ok" if ambiguous == 0 else "degraded",
         }
         health["category_classification"] = compact_category_summary(category_summary)
-        write_json(HEALTH_PATH, health)
     print(
         f"ontology: entries={len(entries)} matched={matched} ambiguous={ambiguous} "
         f"series={matched_series} categories={category_summary['category_breakdown']}"
     )
+
+
+def main() -> int:
+    payload = read_json(EVENTS_PATH)
+    health = read_json(HEALTH_PATH) if HEALTH_PATH.exists() else None
+    update_document(payload, health)
+    write_events_document(EVENTS_PATH, payload)
+    if health is not None:
+        write_json(HEALTH_PATH, health)
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("ontology", main))
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import importlib
+import json
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Iterable
+
+from cast_event_cal import ontology
+from cast_event_cal.core import Event, build_calendar, events_header, exit_status, parse_datetime, write_ics
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.profiling import profile_stage
+
+PUBLIC_DIR = Path("public")
+EVENTS_PATH = PUBLIC_DIR / "events.json"
+HEALTH_PATH = PUBLIC_DIR / "health.json"
+CALENDAR_PATH = PUBLIC_DIR / "calendar.ics"
+
+
+@dataclass(slots=True)
+class PipelineOptions:
+    config: Path = Path("config/sources.yaml")
+    strict: bool = False
+    concurrency: int | None = None
+
+
+@dataclass(slots=True)
+class PipelineState:
+    document: dict[str, Any] = field(default_factory=dict)
+    health: dict[str, Any] = field(default_factory=dict)
+    calendar: list[Event] | None = None
+    status: int = 0
+
+    @property
+    def generated_at(self) -> datetime:
+        return parse_datetime(str(self.document["generated_at"]))
+
+
+Stage = Callable[[PipelineState, PipelineOptions], None]
+
+
+def script(name: str) -> ModuleType:
+    root = str(Path.cwd())
+    if root not in sys.path:
+        sys.path.insert(0, root)
+    return importlib.import_module(f"scripts.{name}")
+
+
+def calendar_stage(state: PipelineState, options: PipelineOptions) -> None:
+    events, health, generated_at = build_calendar(options.config, concurrency=options.concurrency)
+    state.document = {**events_header(events, generated_at), "events": [event.as_dict() for event in events]}
+    state.health = health
+    state.calendar = events
+    state.status = exit_status(health, strict=options.strict)
+
+
+def official_assets_stage(state: PipelineState, options: PipelineOptions) -> None:
+    script("enrich_official_assets").update_document(state.document)
+
+
+def event_links_stage(state: PipelineState, options: PipelineOptions) -> None:
+    script("discover_event_links").update_document(state.document)
+
+
+def group_assets_stage(state: PipelineState, options: PipelineOptions) -> None:
+    script("enrich_vrchat_group_assets").update_document(state.document)
+
+
+def dedup_stage(state: PipelineState, options: PipelineOptions) -> None:
+    module = script("deduplicate_occurrences")
+    audit = module.update_document(state.document)
+    module.DEFAULT_AUDIT.write_text(json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    state.calendar = list(module.calendar_events(state.document))
+
+
+def ontology_stage(state: PipelineState, options: PipelineOptions) -> None:
+    ontology.update_document(state.document, state.health)
+
+
+def frontend_stage(state: PipelineState, options: PipelineOptions) -> None:
+    script("build_observed_ontology").main(state.document)
+    script("render_frontend").render(state.document)
+
+
+def distribution_stage(state: PipelineState, options: PipelineOptions) -> None:
+    script("render_distribution_assets").main()
+
+
+def registration_audit_stage(state: PipelineState, options: PipelineOptions) -> None:
+    state.health = script("build_registration_count_audit").update_health(state.health, state.document)
+
+
+STAGES: dict[str, Stage] = {
+    "calendar": calendar_stage,
+    "official-assets": official_assets_stage,
+    "event-links": event_links_stage,
+    "group-assets": group_assets_stage,
+    "dedup": dedup_stage,
+    "ontology": ontology_stage,
+    "frontend": frontend_stage,
+    "distribution": distribution_stage,
+    "registration-audit": registration_audit_stage,
+}
+
+
+def select_stages(start: str | None = None, stop: str | None = None) -> list[str]:
+    names = list(STAGES)
+    for name in (start, stop):
+        if name is not None and name not in STAGES:
+            raise ValueError(f"unknown pipeline stage: {name} (expected one of {', '.join(names)})")
+    first = names.index(start) if start else 0
+    last = names.index(stop) if stop else len(names) - 1
+    if first > last:
+        raise ValueError(f"pipeline stage {start} runs after {stop}")
+    return names[first : last + 1]
+
+
+def load_state() -> PipelineState:
+    health = json.loads(HEALTH_PATH.read_text(encoding="utf-8")) if HEALTH_PATH.exists() else {}
+    return PipelineState(document=json.loads(EVENTS_PATH.read_text(encoding="utf-8")), health=health)
+
+
+def write_state(state: PipelineState) -> None:
+    PUBLIC_DIR.mkdir(parents=True, exist_ok=True)
+    write_events_document(EVENTS_PATH, state.document)
+    if state.calendar is not None:
+        write_ics(CALENDAR_PATH, state.calendar, state.generated_at)
+    if state.health:
+        HEALTH_PATH.write_text(json.dumps(state.health, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    (PUBLIC_DIR / ".nojekyll").write_text("", encoding="utf-8")
+
+
+def run_pipeline(
+    options: PipelineOptions,
+    *,
+    start: str | None = None,
+    stop: str | None = None,
+    checkpoints: Iterable[str] = (),
+) -> int:
+    names = select_stages(start, stop)
+    checkpoints = set(checkpoints)
+    if unknown := checkpoints - set(STAGES):
+        raise ValueError(f"unknown checkpoint stage: {', '.join(sorted(unknown))}")
+    state = PipelineState() if names[0] == "calendar" else load_state()
+    # A failed stage may have edited the document in place, so nothing is written on failure;
+    # the artifacts on disk stay at the last checkpoint and the run resumes right after it.
+    resume = names[0]
+    for position, name in enumerate(names):
+        started = time.monotonic()
+        try:
+            with profile_stage(name) as timing:
+                STAGES[name](state, options)
+                timing["item_count"] = len(state.document.get("events", []))
+        except Exception:
+            logging.exception("pipeline stage failed: %s (resume with --from %s)", name, resume)
+            raise
+        logging.info("pipeline stage %s finished in %.2fs", name, time.monotonic() - started)
+        if state.status:
+            logging.error("pipeline stopped after %s with exit status %d", name, state.status)
+            break
+        if name in checkpoints:
+            write_state(state)
+            resume = names[min(position + 1, len(names) - 1)]
+            logging.info("pipeline checkpoint written after %s", name)
+    write_state(state)
+    return state.status
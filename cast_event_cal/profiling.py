@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+PROFILE_ENV = "CAST_EVENT_CAL_PROFILE"
+TIMINGS_PATH = Path("public/pipeline-timings.json")
+HISTORY_PATH = Path("public/pipeline-timings-history.jsonl")
+HISTORY_LIMIT = 2000
+TOP_FUNCTIONS = 15
+LOCATION_RE = re.compile(r"(?P<filename>.+):(?P<line>\d+)\((?P<name>.*)\)")
+
+_enabled: bool | None = None
+_active = False
+
+
+def profiling_enabled() -> bool:
+    if _enabled is not None:
+        return _enabled
+    return os.environ.get(PROFILE_ENV, "").strip().casefold() in {"1", "true", "yes", "on"}
+
+
+def enable_profiling(enabled: bool = True) -> None:
+    global _enabled
+    _enabled = enabled
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+def function_label(location: str) -> str:
+    match = LOCATION_RE.fullmatch(location)
+    if not match:
+        return location
+    path = Path(match["filename"])
+    try:
+        filename = path.resolve().relative_to(Path.cwd()).as_posix()
+    except ValueError:
+        filename = path.name
+    return f"{filename}:{match['line']}({match['name']})"
+
+
+def top_functions(profiler: cProfile.Profile, limit: int = TOP_FUNCTIONS) -> list[dict[str, Any]]:
+    buffer = io.StringIO()
+    pstats.Stats(profiler, stream=buffer).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    lines = buffer.getvalue().splitlines()
+    header = next((index for index, line in enumerate(lines) if line.split()[:1] == ["ncalls"]), len(lines))
+    rows = []
+    # Columns: ncalls tottime percall cumtime percall filename:lineno(function); seconds at millisecond precision.
+    for line in lines[header + 1 :]:
+        parts = line.split(maxsplit=5)
+        if len(parts) < 6:
+            continue
+        calls, own, _per_call, cumulative, _per_primitive, location = parts
+        rows.append(
+            {
+                "function": function_label(location),
+                "calls": int(calls.split("/")[0]),
+                "self_ms": round(float(own) * 1000, 3),
+                "cumulative_ms": round(float(cumulative) * 1000, 3),
+            }
+        )
+    return rows
+
+
+def now_iso() -> str:
+    return datetime.now(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+@contextmanager
+def profile_stage(name: str) -> Iterator[dict[str, Any]]:
+    global _active
+    row: dict[str, Any] = {"stage": name}
+    if not profiling_enabled() or _active:
+        yield row
+        return
+    profiler = cProfile.Profile()
+    rss_before = peak_rss_kb()
+    wall_started, cpu_started = time.perf_counter(), time.process_time()
+    _active = True
+    profiler.enable()
+    try:
+        yield row
+    finally:
+        profiler.disable()
+        _active = False
+        row.update(
+            {
+                "recorded_at": now_iso(),
+                "wall_ms": round((time.perf_counter() - wall_started) * 1000, 3),
+                "cpu_ms": round((time.process_time() - cpu_started) * 1000, 3),
+                "peak_rss_kb": peak_rss_kb(),
+                "peak_rss_growth_kb": peak_rss_kb() - rss_before,
+                "item_count": row.get("item_count"),
+                "top_functions": top_functions(profiler),
+            }
+        )
+        record_timing(row)
+
+
+def record_timing(row: dict[str, Any], path: Path = TIMINGS_PATH, history: Path = HISTORY_PATH) -> None:
+    document = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+    stages = document.get("stages") if isinstance(document.get("stages"), dict) else {}
+    stages[row["stage"]] = row
+    document = {"schema_version": "1.0", "generated_at": row["recorded_at"], "stages": stages}
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(document, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    append_history({key: value for key, value in row.items() if key != "top_functions"}, history)
+
+
+def append_history(row: dict[str, Any], path: Path = HISTORY_PATH) -> None:
+    lines = path.read_text(encoding="utf-8").splitlines() if path.exists() else []
+    lines.append(json.dumps(row, ensure_ascii=False, separators=(",", ":")))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines[-HISTORY_LIMIT:]) + "\n", encoding="utf-8", newline="\n")
+
+
+def run_profiled(name: str, main: Callable[[], int | None]) -> int | None:
+    with profile_stage(name):
+        return main()
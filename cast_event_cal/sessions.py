@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import atexit
+import importlib.util
+import os
+import threading
+from typing import Mapping
+
+import httpx
+
+HTTP2_ENV = "CAST_EVENT_CAL_HTTP2"
+DEFAULT_TIMEOUT = 20.0
+DEFAULT_USER_AGENT = "Mozilla/5.0 cast-event-cal/2"
+BROWSER_USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/124 Safari/537.36"
+POOL_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=30.0)
+
+_clients: dict[tuple[float, tuple[tuple[str, str], ...]], httpx.Client] = {}
+_lock = threading.Lock()
+
+
+def http2_enabled() -> bool:
+    if os.environ.get(HTTP2_ENV, "").strip().casefold() not in {"1", "true", "yes", "on"}:
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def session(
+    *,
+    timeout: float = DEFAULT_TIMEOUT,
+    user_agent: str = DEFAULT_USER_AGENT,
+    headers: Mapping[str, str] | None = None,
+) -> httpx.Client:
+    merged = {"User-Agent": user_agent, **(headers or {})}
+    key = (float(timeout), tuple(sorted(merged.items())))
+    with _lock:
+        client = _clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.Client(timeout=timeout, follow_redirects=True, headers=merged, limits=POOL_LIMITS, http2=http2_enabled())
+            _clients[key] = client
+    return client
+
+
+def close_sessions() -> None:
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        client.close()
+
+
+atexit.register(close_sessions)
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import re
+from datetime import UTC, date, datetime
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil import parser as date_parser
+
+JST = ZoneInfo("Asia/Tokyo")
+CANONICAL_INSTANT = re.compile(r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z")
+MEMO_SIZE = 16384
+
+
+def safe_zoneinfo(value: str | None) -> ZoneInfo:
+    try:
+        return ZoneInfo(value or "Asia/Tokyo")
+    except (ZoneInfoNotFoundError, ValueError):
+        return JST
+
+
+@lru_cache(maxsize=MEMO_SIZE)
+def _parse_text(value: str, default_timezone: str) -> datetime:
+    if match := CANONICAL_INSTANT.fullmatch(value):
+        return datetime(*map(int, match.groups()), tzinfo=UTC)
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        parsed = date_parser.isoparse(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC if default_timezone == "UTC" else safe_zoneinfo(default_timezone))
+    return parsed.astimezone(UTC)
+
+
+def parse_instant(value: str | datetime, *, default_timezone: str = "Asia/Tokyo") -> datetime:
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=UTC if default_timezone == "UTC" else safe_zoneinfo(default_timezone))
+        return value.astimezone(UTC)
+    return _parse_text(value.strip(), default_timezone)
+
+
+def try_parse_instant(value: object, *, default_timezone: str = "Asia/Tokyo") -> datetime | None:
+    if not value:
+        return None
+    try:
+        return parse_instant(value if isinstance(value, datetime) else str(value), default_timezone=default_timezone)
+    except (ValueError, TypeError, OverflowError):
+        return None
+
+
+def format_instant(value: datetime) -> str:
+    return value.astimezone(UTC).isoformat().replace("+00:00", "Z")
+
+
+def jst_date(value: str | datetime) -> date:
+    return parse_instant(value).astimezone(JST).date()
+
+
+def jst_date_key(value: str | datetime) -> str:
+    return jst_date(value).isoformat()
+
+
+def cache_info() -> dict[str, int]:
+    info = _parse_text.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": MEMO_SIZE}
+
+
+def cache_clear() -> None:
+    _parse_text.cache_clear()
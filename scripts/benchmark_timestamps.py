@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any, Callable
+
+from dateutil import parser as date_parser
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal import timestamps
+
+EVENTS_PATH = Path("public/events.json")
+
+
+def dateutil_instant(value: str) -> datetime:
+    parsed = date_parser.isoparse(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timestamps.JST)
+    return parsed.astimezone(UTC)
+
+
+def event_timestamps(path: Path) -> list[str]:
+    rows = json.loads(path.read_text(encoding="utf-8")).get("events", [])
+    return [str(row[key]) for row in rows for key in ("starts_at", "ends_at", "fetched_at") if row.get(key)]
+
+
+def measure(parse: Callable[[str], datetime], values: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for value in values:
+            parse(value)
+    return time.perf_counter() - started
+
+
+def run(values: list[str], rounds: int) -> dict[str, Any]:
+    mismatches = sum(dateutil_instant(value) != timestamps.parse_instant(value) for value in values)
+    timestamps.cache_clear()
+    baseline = measure(dateutil_instant, values, rounds)
+    shared = measure(timestamps.parse_instant, values, rounds)
+    return {
+        "timestamps": len(values),
+        "distinct_timestamps": len(set(values)),
+        "rounds": rounds,
+        "dateutil_seconds": round(baseline, 4),
+        "shared_seconds": round(shared, 4),
+        "speedup": round(baseline / shared, 2) if shared else None,
+        "mismatches": mismatches,
+        "memo": timestamps.cache_info(),
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the shared timestamp parser with the dateutil path")
+    parser.add_argument("--events", type=Path, default=EVENTS_PATH)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(run(event_timestamps(args.events), max(1, args.rounds)), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
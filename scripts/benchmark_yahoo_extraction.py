@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts import fetch_yahoo_realtime as yahoo
+from scripts import yahoo_snapshots as snapshots
+
+
+def stored_pages(root: Path) -> list[str]:
+    digests = sorted({str(entry["sha256"]): entry for entry in snapshots.entries(root)}.values(), key=lambda entry: str(entry["sha256"]))
+    return [snapshots.load_html(entry, root) for entry in digests]
+
+
+def measure(extract: Callable[[str], list[dict[str, Any]]], pages: list[str], rounds: int) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            extract(page)
+    return time.perf_counter() - started
+
+
+def run(pages: list[str], rounds: int) -> dict[str, Any]:
+    mismatches = sum(yahoo.extract_candidates_reference(page) != yahoo.extract_candidates(page) for page in pages)
+    baseline = measure(yahoo.extract_candidates_reference, pages, rounds)
+    targeted = measure(yahoo.extract_candidates, pages, rounds)
+    return {
+        "pages": len(pages),
+        "html_bytes": sum(len(page.encode()) for page in pages),
+        "rounds": rounds,
+        "reference_seconds": round(baseline, 4),
+        "targeted_seconds": round(targeted, 4),
+        "speedup": round(baseline / targeted, 2) if pages and targeted else None,
+        "mismatches": mismatches,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compare the targeted Yahoo extractor with the HTMLParser baseline on archived pages")
+    parser.add_argument("--snapshots", type=Path, default=snapshots.SNAPSHOT_ROOT)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    result = run(stored_pages(args.snapshots), max(1, args.rounds))
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 1 if result["mismatches"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
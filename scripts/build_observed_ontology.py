@@ -55,10 +55,10 @@ def dominant(distribution: dict[str, int], total: int) -> dict[str, Any] | None:
     }
 
 
-def build() -> dict[str, Any]:
+def build(event_doc: dict[str, Any] | None = None) -> dict[str, Any]:
     curated = read(CONFIG)
     category_ontology = read(CATEGORY_CONFIG)
-    event_doc = read(EVENTS)
+    event_doc = read(EVENTS) if event_doc is None else event_doc
     events = [row for row in event_doc.get("events", []) if isinstance(row, dict)]
     groups: dict[str, list[dict[str, Any]]] = defaultdict(list)
     for event in events:
@@ -153,9 +153,9 @@ def preserve_audit_schema_compatibility() -> None:
     AUDIT.write_text(json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
 
-def main() -> int:
+def main(event_doc: dict[str, Any] | None = None) -> int:
     build_yahoo_rejection_sample_audit()
-    payload = build()
+    payload = build(event_doc)
     OUTPUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     preserve_audit_schema_compatibility()
     print(
@@ -90,9 +90,9 @@ def delta(current: dict[str, Any], previous: dict[str, Any] | None) -> dict[str,
     }
 
 
-def build() -> dict[str, Any]:
-    calendar = read_json(CALENDAR_HEALTH, {})
-    events = read_json(EVENTS, {})
+def build(calendar: dict[str, Any] | None = None, events: dict[str, Any] | None = None) -> dict[str, Any]:
+    calendar = read_json(CALENDAR_HEALTH, {}) if calendar is None else calendar
+    events = read_json(EVENTS, {}) if events is None else events
     yahoo = read_json(YAHOO_HEALTH, {})
     if calendar.get("status") != "ok":
         raise ValueError("calendar health must be ok")
@@ -155,18 +155,21 @@ def append_kpi_log(latest: dict[str, Any], path: Path = KPI_LOG) -> dict[str, An
     return row
 
 
-def main() -> int:
-    payload = build()
-    events = read_json(EVENTS, {})
-    calendar = read_json(CALENDAR_HEALTH, {})
+def update_health(calendar: dict[str, Any], events: dict[str, Any]) -> dict[str, Any]:
+    payload = build(calendar, events)
     synchronized_health = synchronize_public_health(calendar, events)
+    OUTPUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    kpi = append_kpi_log(payload["latest"])
+    print(json.dumps({"latest": payload["latest"], "kpi": kpi}, ensure_ascii=False))
+    return synchronized_health
+
+
+def main() -> int:
+    synchronized_health = update_health(read_json(CALENDAR_HEALTH, {}), read_json(EVENTS, {}))
     CALENDAR_HEALTH.write_text(
         json.dumps(synchronized_health, ensure_ascii=False, indent=2) + "\n",
         encoding="utf-8",
     )
-    OUTPUT.write_text(json.dumps(payload, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
-    kpi = append_kpi_log(payload["latest"])
-    print(json.dumps({"latest": payload["latest"], "kpi": kpi}, ensure_ascii=False))
     return 0
 
 
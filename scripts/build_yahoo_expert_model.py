@@ -1,13 +1,20 @@
 from __future__ import annotations
 
 import argparse
+import heapq
 import json
 import math
+import sys
 from collections import Counter, defaultdict
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.yahoo_bitsets import union_of_others
+
 DEFAULT_HISTORY = Path("public/yahoo-candidate-history.json")
 DEFAULT_OUTPUT = Path("public/yahoo-query-expert-model.json")
 Z_95 = 1.959963984540054
@@ -51,6 +58,33 @@ def query_keys(row: dict[str, Any]) -> list[str]:
     return sorted({str(value).strip() for value in values if str(value).strip()})
 
 
+def greedy_ensemble(keys: list[str], masks: list[int], universe: int, target: float) -> list[dict[str, Any]]:
+    """Lazy greedy max-coverage: add the expert with the largest popcount of uncovered positives until ``target``."""
+    needed = math.ceil(target * universe)
+    heap = [(-mask.bit_count(), position) for position, mask in enumerate(masks)]
+    heapq.heapify(heap)
+    covered = 0
+    chosen: list[dict[str, Any]] = []
+    while heap and covered.bit_count() < needed:
+        _, position = heapq.heappop(heap)
+        gain = (masks[position] & ~covered).bit_count()
+        if gain == 0:
+            continue
+        # Coverage gains only shrink, so a refreshed gain that still tops the stale bounds is the true maximum.
+        if heap and gain < -heap[0][0]:
+            heapq.heappush(heap, (-gain, position))
+            continue
+        covered |= masks[position]
+        chosen.append(
+            {
+                "query_key": keys[position],
+                "marginal_accepted_count": gain,
+                "cumulative_positive_coverage": round(covered.bit_count() / universe, 6),
+            }
+        )
+    return chosen
+
+
 def build_model(
     rows: list[dict[str, Any]],
     *,
@@ -59,26 +93,34 @@ def build_model(
     minimum_wilson_precision: float = 0.05,
     minimum_ensemble_coverage: float = 0.90,
 ) -> dict[str, Any]:
-    observations: dict[str, list[dict[str, Any]]] = defaultdict(list)
-    accepted_ids: set[str] = set()
+    # Accepted status ids get one bit each, so an expert's positives are a single integer bitset.
+    accepted_ids = sorted({str(row["status_id"]) for row in rows if is_accepted(row) and row.get("status_id")})
+    bit_of = {status_id: bit for bit, status_id in enumerate(accepted_ids)}
+    universe = len(accepted_ids)
+    support: Counter[str] = Counter()
+    accepted_counts: Counter[str] = Counter()
+    reasons: dict[str, Counter[str]] = defaultdict(Counter)
+    positives: dict[str, int] = defaultdict(int)
     for row in rows:
-        status_id = str(row.get("status_id") or "")
-        if is_accepted(row) and status_id:
-            accepted_ids.add(status_id)
-        for key in query_keys(row):
-            observations[key].append(row)
+        keys = query_keys(row)
+        if not keys:
+            continue
+        accepted = is_accepted(row)
+        reason = str(row.get("last_reason") or row.get("reason") or "accepted")
+        bit = 1 << bit_of[str(row["status_id"])] if accepted and row.get("status_id") else 0
+        for key in keys:
+            support[key] += 1
+            reasons[key][reason] += 1
+            if accepted:
+                accepted_counts[key] += 1
+                positives[key] |= bit
 
     experts: list[dict[str, Any]] = []
-    expert_positive_ids: dict[str, set[str]] = {}
-    for key, seen in observations.items():
-        positives = [row for row in seen if is_accepted(row)]
-        positive_ids = {str(row.get("status_id")) for row in positives if row.get("status_id")}
-        support = len(seen)
-        accepted = len(positives)
-        precision = accepted / support if support else 0.0
-        lower = wilson_lower(accepted, support)
-        reasons = Counter(str(row.get("last_reason") or row.get("reason") or "accepted") for row in seen)
-        eligible = support >= minimum_support and accepted >= minimum_accepted and lower >= minimum_wilson_precision
+    for key, seen in support.items():
+        accepted = accepted_counts[key]
+        precision = accepted / seen if seen else 0.0
+        lower = wilson_lower(accepted, seen)
+        eligible = seen >= minimum_support and accepted >= minimum_accepted and lower >= minimum_wilson_precision
         if eligible:
             tier = "precision" if lower >= 0.15 else "balanced" if lower >= 0.08 else "recall"
         else:
@@ -86,18 +128,17 @@ def build_model(
         experts.append(
             {
                 "query_key": key,
-                "support": support,
+                "support": seen,
                 "accepted": accepted,
-                "rejected": support - accepted,
+                "rejected": seen - accepted,
                 "precision": round(precision, 6),
                 "wilson_precision_lower_95": round(lower, 6),
-                "positive_coverage": round(len(positive_ids) / len(accepted_ids), 6) if accepted_ids else 0.0,
+                "positive_coverage": round(positives[key].bit_count() / universe, 6) if universe else 0.0,
                 "tier": tier,
                 "eligible": eligible,
-                "top_rejection_reasons": dict(reasons.most_common(5)),
+                "top_rejection_reasons": dict(reasons[key].most_common(5)),
             }
         )
-        expert_positive_ids[key] = positive_ids
 
     experts.sort(
         key=lambda row: (
@@ -108,23 +149,24 @@ def build_model(
         )
     )
     promoted = [row for row in experts if row["eligible"]]
-    covered = set().union(*(expert_positive_ids[row["query_key"]] for row in promoted)) if promoted else set()
-    ensemble_coverage = len(covered) / len(accepted_ids) if accepted_ids else 0.0
+    masks = [positives[row["query_key"]] for row in promoted]
+    others = union_of_others(masks)
+    covered = others[0] | masks[0] if masks else 0
+    ensemble_coverage = covered.bit_count() / universe if universe else 0.0
 
     ablations: list[dict[str, Any]] = []
-    for expert in promoted:
-        remaining = [row for row in promoted if row["query_key"] != expert["query_key"]]
-        remaining_ids = set().union(*(expert_positive_ids[row["query_key"]] for row in remaining)) if remaining else set()
-        coverage = len(remaining_ids) / len(accepted_ids) if accepted_ids else 0.0
+    for expert, remaining in zip(promoted, others, strict=True):
+        coverage = remaining.bit_count() / universe if universe else 0.0
         ablations.append(
             {
                 "removed_query_key": expert["query_key"],
                 "coverage_without_expert": round(coverage, 6),
                 "marginal_positive_coverage": round(ensemble_coverage - coverage, 6),
-                "unique_accepted_count": len(covered - remaining_ids),
+                "unique_accepted_count": (covered & ~remaining).bit_count(),
             }
         )
     ablations.sort(key=lambda row: (-row["marginal_positive_coverage"], row["removed_query_key"]))
+    greedy = greedy_ensemble([row["query_key"] for row in promoted], masks, universe, minimum_ensemble_coverage)
 
     status = "ready" if promoted and ensemble_coverage >= minimum_ensemble_coverage else "insufficient_evidence"
     return {
@@ -146,6 +188,9 @@ def build_model(
         "recommended_query_keys": [row["query_key"] for row in promoted] if status == "ready" else [],
         "experts": experts,
         "leave_one_expert_out_ablation": ablations,
+        "greedy_ensemble": greedy,
+        "greedy_ensemble_size": len(greedy),
+        "greedy_ensemble_coverage": greedy[-1]["cumulative_positive_coverage"] if greedy else 0.0,
         "promotion_policy": "No production query plan change unless status is ready and regression tests verify all hard validity gates remain unchanged.",
     }
 
@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import zlib
+from collections import Counter
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 HISTORY_PATH = Path("public/yahoo-candidate-history.json")
 CLASSIFIER_AUDIT_PATH = Path("public/yahoo-classifier-audit.json")
-QUEUE_PATH = Path("data/yahoo_llm_review_queue.json")
+QUEUE_DIR = Path("data/yahoo_llm_review_queue")
+LEGACY_QUEUE_PATH = Path("data/yahoo_llm_review_queue.json")
 RESOLUTIONS_PATH = Path("data/yahoo_llm_review_resolutions.json")
 AUDIT_PATH = Path("public/yahoo-llm-review-queue-audit.json")
 
@@ -22,6 +26,9 @@ CONDITIONAL_REVIEW_REASONS = {
     "missing_datetime",
     "missing_event_marker",
 }
+SEGMENT_COUNT = 64
+QUEUE_STAMPS = ("first_queued_at", "last_queued_at")
+PRIORITY_ORDER = {"high": 0, "medium": 1, "normal": 2}
 
 
 def read_json(path: Path, default: Any) -> Any:
@@ -133,29 +140,30 @@ def make_item(
     }
 
 
-def build_queue(
+def pending_reviews(
     history: list[dict[str, Any]],
     suspicious_accepted: list[dict[str, Any]],
     *,
     resolved_ids: set[str],
-    previous_items: dict[str, dict[str, Any]],
-    now: datetime,
-) -> list[dict[str, Any]]:
-    pending: dict[str, dict[str, Any]] = {}
+) -> dict[str, tuple[dict[str, Any], dict[str, Any]]]:
+    """Source row and ``make_item`` options for every unresolved item that needs review."""
+    pending: dict[str, tuple[dict[str, Any], dict[str, Any]]] = {}
+    by_status = {
+        str(row["status_id"]): row
+        for row in history
+        if isinstance(row, dict) and row.get("status_id")
+    }
 
-    for row in history:
-        if not isinstance(row, dict) or not row.get("status_id"):
-            continue
-        status_id = str(row["status_id"])
+    for status_id, row in by_status.items():
         if status_id in resolved_ids or not needs_review(row):
             continue
-        pending[status_id] = make_item(
+        pending[status_id] = (
             row,
-            now=now,
-            previous=previous_items.get(status_id),
-            review_kind="ambiguous_rejection",
-            machine_decision=str(row.get("last_decision") or "rejected"),
-            machine_reason=str(row.get("last_reason") or "unknown"),
+            {
+                "review_kind": "ambiguous_rejection",
+                "machine_decision": str(row.get("last_decision") or "rejected"),
+                "machine_reason": str(row.get("last_reason") or "unknown"),
+            },
         )
 
     for row in suspicious_accepted:
@@ -164,36 +172,184 @@ def build_queue(
         status_id = str(row["status_id"])
         if status_id in resolved_ids:
             continue
-        source = next(
-            (
-                candidate
-                for candidate in history
-                if isinstance(candidate, dict)
-                and str(candidate.get("status_id") or "") == status_id
-            ),
-            row,
+        pending[status_id] = (
+            by_status.get(status_id, row),
+            {
+                "review_kind": "possible_false_positive",
+                "machine_decision": "accepted",
+                "machine_reason": "suspicious_accepted_commerce",
+                "accepted_suspicious": True,
+            },
         )
-        pending[status_id] = make_item(
-            source,
-            now=now,
-            previous=previous_items.get(status_id),
-            review_kind="possible_false_positive",
-            machine_decision="accepted",
-            machine_reason="suspicious_accepted_commerce",
-            accepted_suspicious=True,
+    return pending
+
+
+def build_queue(
+    history: list[dict[str, Any]],
+    suspicious_accepted: list[dict[str, Any]],
+    *,
+    resolved_ids: set[str],
+    now: datetime,
+) -> list[dict[str, Any]]:
+    pending = pending_reviews(history, suspicious_accepted, resolved_ids=resolved_ids)
+    return sorted((make_item(row, now=now, previous=None, **options) for row, options in pending.values()), key=queue_order)
+
+
+def decision_signature(row: dict[str, Any], options: dict[str, Any]) -> str:
+    # Only the review decision is tracked; text or engagement drift alone does not requeue an item.
+    return "|".join(
+        (
+            str(options["review_kind"]),
+            str(options["machine_decision"]),
+            str(options["machine_reason"]),
+            priority_for(row, accepted_suspicious=bool(options.get("accepted_suspicious"))),
         )
+    )
 
-    priority_order = {"high": 0, "medium": 1, "normal": 2}
-    return sorted(
-        pending.values(),
-        key=lambda item: (
-            priority_order.get(str(item.get("priority")), 9),
-            -int(item.get("retweet_count") or 0),
-            str(item.get("status_id")),
-        ),
+
+def queue_order(item: dict[str, Any]) -> tuple[int, int, str]:
+    return (
+        PRIORITY_ORDER.get(str(item.get("priority")), 9),
+        -int(item.get("retweet_count") or 0),
+        str(item.get("status_id")),
     )
 
 
+def segment_of(status_id: str) -> str:
+    # Snowflake ids end in mostly-zero sequence bits, so bucket by checksum rather than modulo.
+    return f"{zlib.crc32(status_id.encode('utf-8')) % SEGMENT_COUNT:02x}"
+
+
+def segment_path(root: Path, segment: str) -> Path:
+    return root / f"segment-{segment}.json"
+
+
+def content(item: dict[str, Any]) -> dict[str, Any]:
+    return {key: value for key, value in item.items() if key not in QUEUE_STAMPS}
+
+
+def segment_digest(items: list[dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for item in sorted(items, key=lambda row: str(row.get("status_id"))):
+        digest.update(json.dumps(content(item), ensure_ascii=False, sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def segment_counts(items: list[dict[str, Any]], digest: str) -> dict[str, Any]:
+    return {
+        "item_count": len(items),
+        "high_priority_count": sum(item["priority"] == "high" for item in items),
+        "possible_false_positive_count": sum(item["review_kind"] == "possible_false_positive" for item in items),
+        "ambiguous_rejection_count": sum(item["review_kind"] == "ambiguous_rejection" for item in items),
+        "content_sha256": digest,
+    }
+
+
+def read_manifest(root: Path) -> dict[str, Any]:
+    manifest = read_json(root / "manifest.json", {})
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def read_index(root: Path) -> dict[str, str] | None:
+    payload = read_json(root / "index.json", {})
+    if not isinstance(payload, dict) or payload.get("segment_count") != SEGMENT_COUNT or not isinstance(payload.get("signatures"), dict):
+        return None
+    return {str(status_id): str(signature) for status_id, signature in payload["signatures"].items()}
+
+
+def write_if_changed(path: Path, payload: dict[str, Any], *, stamp: str, now: datetime) -> bool:
+    """Write ``payload`` stamped with ``now`` only when it differs from the file apart from that stamp."""
+    previous = read_json(path, {})
+    if isinstance(previous, dict) and {key: value for key, value in previous.items() if key != stamp} == payload:
+        return False
+    write_json(path, {**payload, stamp: utc_text(now)})
+    return True
+
+
+def read_segment(root: Path, segment: str) -> list[dict[str, Any]]:
+    payload = read_json(segment_path(root, segment), {})
+    rows = payload.get("items", []) if isinstance(payload, dict) else []
+    return [row for row in rows if isinstance(row, dict) and row.get("status_id")]
+
+
+def load_queue(root: Path = QUEUE_DIR) -> list[dict[str, Any]]:
+    """All pending items across segments, in review priority order."""
+    segments = read_manifest(root).get("segments", {})
+    return sorted((item for segment in sorted(segments) for item in read_segment(root, segment)), key=queue_order)
+
+
+def update_segments(
+    pending: dict[str, tuple[dict[str, Any], dict[str, Any]]],
+    *,
+    root: Path,
+    manifest: dict[str, Any],
+    index: dict[str, str] | None,
+    legacy_items: dict[str, dict[str, Any]],
+    now: datetime,
+) -> tuple[dict[str, dict[str, Any]], dict[str, str], Counter[str]]:
+    """Rewrite only the segments holding items whose review decision changed since the last build.
+
+    ``index`` maps each pending status id to its decision signature, so added,
+    changed and resolved ids are found without reading or hashing untouched
+    segments. Without an index every segment is rebuilt.
+    """
+    signatures = {status_id: decision_signature(row, options) for status_id, (row, options) in pending.items()}
+    previous = manifest.get("segments", {}) if manifest.get("segment_count") == SEGMENT_COUNT else {}
+    if not previous:
+        index = None
+    if index is None:
+        index = {}
+        touched = {f"{number:02x}" for number in range(SEGMENT_COUNT)}
+    else:
+        touched = {
+            segment
+            for segment, stored in previous.items()
+            if stored.get("item_count") and not segment_path(root, segment).exists()
+        }
+    changed = {status_id for status_id, signature in signatures.items() if index.get(status_id) != signature}
+    touched |= {segment_of(status_id) for status_id in changed | (set(index) - set(signatures))}
+    fresh_by_segment: dict[str, list[str]] = {segment: [] for segment in touched}
+    for status_id in signatures:
+        segment = segment_of(status_id)
+        if segment in fresh_by_segment:
+            fresh_by_segment[segment].append(status_id)
+
+    segments = {segment: stored for segment, stored in previous.items() if segment not in touched}
+    changes: Counter[str] = Counter()
+    for segment in sorted(touched):
+        old = {str(row["status_id"]): row for row in read_segment(root, segment)}
+        kept: list[dict[str, Any]] = []
+        for status_id in fresh_by_segment[segment]:
+            before = old.get(status_id) or legacy_items.get(status_id)
+            if before is not None and status_id in old and status_id not in changed:
+                kept.append(before)
+                continue
+            row, options = pending[status_id]
+            item = make_item(row, now=now, previous=before, **options)
+            if before is not None and content(before) == content(item):
+                kept.append(before)
+                continue
+            changes["updated" if before is not None else "added"] += 1
+            kept.append(item)
+        changes["removed"] += len(set(old) - set(fresh_by_segment[segment]))
+        kept.sort(key=queue_order)
+        stored = previous.get(segment)
+        counts = segment_counts(kept, segment_digest(kept))
+        path = segment_path(root, segment)
+        if stored == counts and (path.exists() or not kept):
+            segments[segment] = stored
+            continue
+        if kept:
+            write_json(path, {"schema_version": "2.0", "segment": segment, "generated_at": utc_text(now), "items": kept})
+            changes["segments_written"] += 1
+        elif path.exists():
+            path.unlink()
+            changes["segments_written"] += 1
+        segments[segment] = counts
+    return dict(sorted(segments.items())), dict(sorted(signatures.items())), changes
+
+
 def main() -> int:
     now = datetime.now(UTC).replace(microsecond=0)
     history_payload = read_json(HISTORY_PATH, {})
@@ -202,7 +358,10 @@ def main() -> int:
         RESOLUTIONS_PATH,
         {"schema_version": "1.0", "resolutions": []},
     )
-    previous_queue = read_json(QUEUE_PATH, {})
+    manifest = read_manifest(QUEUE_DIR)
+    index = read_index(QUEUE_DIR)
+    # The single-file queue from schema 1.0 only seeds first_queued_at while segments are first written.
+    legacy_items = {} if manifest else previous_queue_index(read_json(LEGACY_QUEUE_PATH, {}))
 
     history = history_payload.get("candidates", []) if isinstance(history_payload, dict) else []
     suspicious = (
@@ -216,52 +375,62 @@ def main() -> int:
         suspicious = []
 
     resolved = resolution_ids(resolutions)
-    previous = previous_queue_index(previous_queue)
-    items = build_queue(
+    pending = pending_reviews(
         [row for row in history if isinstance(row, dict)],
         [row for row in suspicious if isinstance(row, dict)],
         resolved_ids=resolved,
-        previous_items=previous,
-        now=now,
     )
-
-    queue_payload = {
-        "schema_version": "1.0",
-        "generated_at": utc_text(now),
+    segments, signatures, changes = update_segments(
+        pending, root=QUEUE_DIR, manifest=manifest, index=index, legacy_items=legacy_items, now=now
+    )
+    if legacy_items or LEGACY_QUEUE_PATH.exists():
+        LEGACY_QUEUE_PATH.unlink(missing_ok=True)
+
+    # Both files are rewritten only when their content changes, so an idle day commits nothing.
+    if signatures != index:
+        write_json(QUEUE_DIR / "index.json", {"schema_version": "1.0", "segment_count": SEGMENT_COUNT, "signatures": signatures})
+    manifest = {
+        "schema_version": "2.0",
         "policy": {
             "purpose": "defer non-deterministic Yahoo event decisions to batched LLM review",
             "always_review_reasons": sorted(ALWAYS_REVIEW_REASONS),
             "conditional_review_reasons": sorted(CONDITIONAL_REVIEW_REASONS),
             "conditional_min_retweets": 3,
             "resolved_items_are_excluded": True,
+            "last_queued_at": "last time the item review decision changed",
         },
-        "pending_count": len(items),
-        "items": items,
+        "segment_count": SEGMENT_COUNT,
+        "pending_count": sum(segment["item_count"] for segment in segments.values()),
+        "resolved_count": len(resolved),
+        "segments": segments,
     }
-    write_json(QUEUE_PATH, queue_payload)
+    write_if_changed(QUEUE_DIR / "manifest.json", manifest, stamp="updated_at", now=now)
 
     audit = {
         "schema_version": "1.0",
         "generated_at": utc_text(now),
         "candidate_count": len(history),
-        "pending_count": len(items),
+        "pending_count": manifest["pending_count"],
         "resolved_count": len(resolved),
-        "high_priority_count": sum(item["priority"] == "high" for item in items),
+        "high_priority_count": sum(segment["high_priority_count"] for segment in segments.values()),
         "possible_false_positive_count": sum(
-            item["review_kind"] == "possible_false_positive" for item in items
+            segment["possible_false_positive_count"] for segment in segments.values()
         ),
         "ambiguous_rejection_count": sum(
-            item["review_kind"] == "ambiguous_rejection" for item in items
+            segment["ambiguous_rejection_count"] for segment in segments.values()
         ),
-        "duplicate_status_ids": len(items)
-        - len({str(item.get("status_id")) for item in items}),
+        "duplicate_status_ids": manifest["pending_count"] - len(signatures),
+        "items_added": changes["added"],
+        "items_updated": changes["updated"],
+        "items_removed": changes["removed"],
+        "segments_written": changes["segments_written"],
         "status": "ok",
     }
     write_json(AUDIT_PATH, audit)
     print(
         "Yahoo LLM review queue: "
         f"pending={audit['pending_count']} high={audit['high_priority_count']} "
-        f"resolved={audit['resolved_count']}"
+        f"resolved={audit['resolved_count']} segments_written={audit['segments_written']}"
     )
     return 0
 
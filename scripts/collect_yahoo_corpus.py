@@ -5,19 +5,30 @@ import json
 import os
 import re
 import sys
+import threading
 import time
 from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import UTC, datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
-from typing import Any
+from random import Random
+from typing import Any, Callable
 from urllib.parse import urlencode
 from zoneinfo import ZoneInfo
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.profiling import run_profiled
+from cast_event_cal.timestamps import jst_date
 from scripts import fetch_yahoo_realtime as implementation
 from scripts import run_yahoo_realtime as ledger
+from scripts import yahoo_decision_cache as decision_cache
+from scripts import yahoo_ledger_store as ledger_store
+from scripts import yahoo_snapshots as snapshots
 
 JST = ZoneInfo("Asia/Tokyo")
 CONFIG_PATH = Path("config/yahoo_query_terms.json")
@@ -26,6 +37,7 @@ AUDIT_PATH = Path("public/yahoo-classifier-audit.json")
 HISTORY_TARGET = 1000
 HISTORY_RETENTION_DAYS = 365
 HISTORY_MAX_COUNT = 5000
+DEFAULT_FETCH_WORKERS = 4
 
 PARTICIPATION_TERMS = {
     "参加方法", "参加条件", "join", "ジョイン", "リクイン", "reqin", "リクエストインバイト",
@@ -69,7 +81,20 @@ DEADLINE_TERMS = {"締切", "〆切", "応募期限", "までに", "応募完了
 SOCIAL_ENTRY_TERMS = {"フォロー", "リポスト", "rp", "rt", "いいね", "リプ", "コメント", "抽選応募"}
 WORLD_DESCRIPTION_TERMS = {"ワールド紹介", "ワールドを更新", "常設", "いつでも", "販売開始", "公開しました"}
 GENERIC_EVENT_TERMS = {"開催", "イベント", "キャンペーン", "募集", "応募"}
+STRUCTURED_EVENT_TERMS = frozenset(SPECIFIC_EVENT_TERMS | EVENT_ACTION_TERMS | PARTICIPATION_TERMS)
 AUDIT_GROUPS = {"commerce_noise", "temporal_audit"}
+AUDIT_QUOTA = 2
+EXPERT_MODEL_PATH = Path("public/yahoo-query-expert-model.json")
+SCHEDULER_WINDOW_DAYS = 28
+EXPLORATION_SHARE = 0.2
+PRIOR_REQUESTS = 2.0
+DEFAULT_NEW_PER_REQUEST = 1.0
+DEFAULT_PRECISION = 0.05
+MINIMUM_PRIOR_MEAN = 0.01
+NOVELTY_WINDOW_REQUESTS = 5
+NOVELTY_MIN_REQUESTS = 3
+NOVELTY_THRESHOLD = 0.05
+NOVELTY_MAX_BACKOFF_DAYS = 16
 QUERY_CONTEXT = "(開催 OR 告知 OR 日時 OR OPEN OR オープン OR 開場 OR 開始 OR 営業 OR 本日 OR 今日 OR 明日 OR 今夜 OR 参加 OR JOIN OR リクイン OR Group+)"
 NEXT_MONTH_CONFLICT_RE = re.compile(
     r"次回.{0,50}?(?P<label_month>1[0-2]|0?[1-9])月.{0,80}?"
@@ -78,7 +103,6 @@ NEXT_MONTH_CONFLICT_RE = re.compile(
     re.IGNORECASE | re.DOTALL,
 )
 _ORIGINAL_CANDIDATE_TO_EVENT = implementation.candidate_to_event
-_ORIGINAL_PARSE_EVENT_DATETIME = implementation.parse_event_datetime
 
 
 def read_json(path: Path, default: Any) -> Any:
@@ -99,56 +123,99 @@ def has_any(text: str, terms: set[str]) -> bool:
     return any(term.casefold() in folded for term in terms)
 
 
+# Set by the classifier registry so versions that share one rule set share one term scan per text.
+TERM_RULES: str | None = None
+
+
+@dataclass(slots=True)
+class TermMatcher:
+    pattern: re.Pattern[str] | None
+    groups_by_term: dict[str, frozenset[str]]
+
+    @classmethod
+    def build(cls, groups: dict[str, set[str]]) -> TermMatcher:
+        owners: dict[str, set[str]] = {}
+        for name, terms in groups.items():
+            for term in terms:
+                owners.setdefault(term.casefold(), set()).add(name)
+        # Longest alternative wins at each offset, so a hit also reports every group of the terms it contains.
+        groups_by_term = {
+            term: frozenset(name for other, names in owners.items() if other in term for name in names)
+            for term in owners
+        }
+        if not owners:
+            return cls(None, groups_by_term)
+        terms = sorted(owners, key=lambda term: (-len(term), term))
+        initials = "".join(sorted({re.escape(term[0]) for term in terms}))
+        alternatives = "|".join(re.escape(term) for term in terms)
+        return cls(re.compile(f"(?=[{initials}])(?=({alternatives}))"), groups_by_term)
+
+    def matches(self, text: str) -> frozenset[str]:
+        if self.pattern is None:
+            return frozenset()
+        found: set[str] = set()
+        for match in self.pattern.finditer(text.casefold()):
+            found.update(self.groups_by_term[match.group(1)])
+        return frozenset(found)
+
+
+def classifier_term_groups() -> dict[str, set[str]]:
+    return {
+        "participation": PARTICIPATION_TERMS,
+        "vr_access": VR_ACCESS_TERMS,
+        "generic_event_noun": GENERIC_EVENT_NOUN_TERMS,
+        "broadcast_only": BROADCAST_ONLY_TERMS,
+        "private_instance": PRIVATE_INSTANCE_TERMS,
+        "specific_event": SPECIFIC_EVENT_TERMS,
+        "event_action": EVENT_ACTION_TERMS,
+        "attendance": ATTENDANCE_TERMS,
+        "specific_recruitment": SPECIFIC_RECRUITMENT_TERMS,
+        "deadline": DEADLINE_TERMS,
+        "social_entry": SOCIAL_ENTRY_TERMS,
+        "world_description": WORLD_DESCRIPTION_TERMS,
+        "generic_event": GENERIC_EVENT_TERMS,
+        "product": implementation.PRODUCT_TERMS,
+        "giveaway": implementation.GIVEAWAY_TERMS,
+    }
+
+
+@lru_cache(maxsize=8)
+def classifier_matcher(version: str) -> TermMatcher:
+    return TermMatcher.build(classifier_term_groups())
+
+
+@lru_cache(maxsize=16384)
+def _term_groups(version: str, text: str) -> frozenset[str]:
+    return classifier_matcher(version).matches(text)
+
+
+def term_groups(text: str, rules: str | None = None) -> frozenset[str]:
+    return _term_groups(rules or TERM_RULES or implementation.PARSER_VERSION, text)
+
+
 def parse_event_datetime_v18(text: str, anchor: datetime) -> datetime | None:
-    parsed = _ORIGINAL_PARSE_EVENT_DATETIME(text, anchor)
-    if parsed is not None:
-        return parsed
-    normalized = implementation.normalize_text(text)
-    clock = r"(?P<hour>[01]?\d|2[0-3])(?:[:時](?P<minute>\d{2})?)"
-    match = re.search(
-        rf"(?P<prefix>次(?:の)?|来週(?:の)?|今週(?:の)?)?\s*(?P<weekday>[月火水木金土日])曜日?"
-        rf".{{0,100}}?{clock}",
-        normalized,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
-    if not match:
-        return None
-    target = {name: index for index, name in enumerate("月火水木金土日")}[match.group("weekday")]
-    days_ahead = (target - anchor.weekday()) % 7
-    prefix = match.group("prefix") or ""
-    if prefix.startswith("来週"):
-        days_ahead += 7
-    elif prefix.startswith("次") and days_ahead == 0:
-        days_ahead = 7
-    day = (anchor + timedelta(days=days_ahead)).date()
-    result = datetime(
-        day.year,
-        day.month,
-        day.day,
-        int(match.group("hour")),
-        int(match.group("minute") or 0),
-        tzinfo=JST,
-    )
-    if not prefix and days_ahead == 0 and result < anchor - timedelta(hours=2):
-        result += timedelta(days=7)
-    return result
+    resolution = dates.resolve(text, anchor, weekdays="next_occurrence")
+    return resolution.event_at if resolution else None
 
 
-def structured_classify(text: str) -> tuple[str | None, str | None]:
-    if not implementation.VRCHAT_RE.search(text):
+def structured_classify(
+    text: str, *, matched: frozenset[str] | None = None, vrchat_re: re.Pattern[str] | None = None
+) -> tuple[str | None, str | None]:
+    if not (vrchat_re or implementation.VRCHAT_RE).search(text):
         return None, "not_vrchat"
-    has_specific_event = has_any(text, SPECIFIC_EVENT_TERMS)
-    has_generic_event = has_any(text, GENERIC_EVENT_NOUN_TERMS)
-    has_action = has_any(text, EVENT_ACTION_TERMS)
-    has_access = has_any(text, VR_ACCESS_TERMS)
-    has_attendance = has_any(text, ATTENDANCE_TERMS)
-    has_recruitment = has_any(text, SPECIFIC_RECRUITMENT_TERMS)
-    has_deadline = has_any(text, DEADLINE_TERMS)
-    has_product = has_any(text, implementation.PRODUCT_TERMS)
-    has_giveaway = has_any(text, implementation.GIVEAWAY_TERMS)
-    has_broadcast = has_any(text, BROADCAST_ONLY_TERMS)
-    has_social_entry = has_any(text, SOCIAL_ENTRY_TERMS)
-    looks_like_world_description = has_any(text, WORLD_DESCRIPTION_TERMS)
+    matched = term_groups(text) if matched is None else matched
+    has_specific_event = "specific_event" in matched
+    has_generic_event = "generic_event_noun" in matched
+    has_action = "event_action" in matched
+    has_access = "vr_access" in matched
+    has_attendance = "attendance" in matched
+    has_recruitment = "specific_recruitment" in matched
+    has_deadline = "deadline" in matched
+    has_product = "product" in matched
+    has_giveaway = "giveaway" in matched
+    has_broadcast = "broadcast_only" in matched
+    has_social_entry = "social_entry" in matched
+    looks_like_world_description = "world_description" in matched
     event_structure = (
         has_specific_event
         or (has_generic_event and has_action)
@@ -185,31 +252,39 @@ def query_for_group(group: str, term: str) -> str:
 
 
 def refined_candidate_to_event(
-    candidate: dict[str, Any], *, now: datetime, min_retweets: int, x_ids: set[str]
+    candidate: dict[str, Any],
+    *,
+    now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    matched: frozenset[str] | None = None,
+    base: Callable[..., tuple[dict[str, Any] | None, str | None]] | None = None,
 ) -> tuple[dict[str, Any] | None, str | None]:
     text = str(candidate.get("text") or "").strip()
     conflict = NEXT_MONTH_CONFLICT_RE.search(text)
     if conflict and int(conflict.group("label_month")) != int(conflict.group("date_month")):
         return None, "conflicting_date_context"
 
-    has_participation = has_any(text, PARTICIPATION_TERMS)
-    has_specific_event = has_any(text, SPECIFIC_EVENT_TERMS)
-    has_product = has_any(text, implementation.PRODUCT_TERMS)
-    has_giveaway = has_any(text, implementation.GIVEAWAY_TERMS)
-    has_only_generic_event = has_any(text, GENERIC_EVENT_TERMS) and not has_specific_event
+    matched = term_groups(text) if matched is None else matched
+    has_participation = "participation" in matched
+    has_specific_event = "specific_event" in matched
+    has_product = "product" in matched
+    has_giveaway = "giveaway" in matched
+    has_only_generic_event = "generic_event" in matched and not has_specific_event
+    has_private_instance = "private_instance" in matched
 
     if has_giveaway and not has_participation and not has_specific_event:
         return None, "giveaway_only"
     if has_product and has_only_generic_event and not has_participation:
         return None, "product_only"
 
-    if has_any(text, PRIVATE_INSTANCE_TERMS) and not has_participation:
+    if has_private_instance and not has_participation:
         return None, "missing_participation_method"
 
-    event, reason = _ORIGINAL_CANDIDATE_TO_EVENT(
+    event, reason = (base or _ORIGINAL_CANDIDATE_TO_EVENT)(
         candidate, now=now, min_retweets=min_retweets, x_ids=x_ids
     )
-    if event and has_any(text, PRIVATE_INSTANCE_TERMS) and not has_participation:
+    if event and has_private_instance and not has_participation:
         return None, "missing_participation_method"
     return event, reason
 
@@ -219,7 +294,7 @@ def configure_classifier() -> None:
     implementation.PARSER_VERSION = "1.8"
     implementation.classify = structured_classify
     implementation.parse_event_datetime = parse_event_datetime_v18
-    implementation.EVENT_TERMS = SPECIFIC_EVENT_TERMS | EVENT_ACTION_TERMS | PARTICIPATION_TERMS
+    implementation.EVENT_TERMS = set(STRUCTURED_EVENT_TERMS)
     implementation.candidate_to_event = refined_candidate_to_event
 
 
@@ -259,19 +334,207 @@ def build_query_plan(config: dict[str, Any]) -> list[dict[str, str]]:
     return plan
 
 
-def select_daily_plan(plan: list[dict[str, str]], now: datetime, count: int) -> list[dict[str, str]]:
+def rotate(rows: list[dict[str, str]], ordinal: int, count: int) -> list[dict[str, str]]:
+    if not rows or count <= 0:
+        return []
+    offset = (ordinal * count) % len(rows)
+    return (rows[offset:] + rows[:offset])[:count]
+
+
+def partition_plan(plan: list[dict[str, str]]) -> tuple[list[dict[str, str]], list[dict[str, str]], list[dict[str, str]]]:
     base = [row for row in plan if row["group"] == "base"]
     production = [row for row in plan if row["group"] not in AUDIT_GROUPS | {"base"}]
     audit = [row for row in plan if row["group"] in AUDIT_GROUPS]
-    production_count = max(1, min(max(count - 2, 1), len(production)))
-    audit_count = min(2, len(audit))
-    ordinal = now.astimezone(JST).date().toordinal()
-    production_offset = (ordinal * production_count) % len(production)
-    selected = base + (production[production_offset:] + production[:production_offset])[:production_count]
-    if audit_count:
-        audit_offset = (ordinal * audit_count) % len(audit)
-        selected += (audit[audit_offset:] + audit[:audit_offset])[:audit_count]
-    return selected
+    return base, production, audit
+
+
+def select_daily_plan(plan: list[dict[str, str]], now: datetime, count: int) -> list[dict[str, str]]:
+    base, production, audit = partition_plan(plan)
+    production_count = max(1, min(max(count - AUDIT_QUOTA, 1), len(production)))
+    ordinal = jst_date(now).toordinal()
+    return base + rotate(production, ordinal, production_count) + rotate(audit, ordinal, min(AUDIT_QUOTA, len(audit)))
+
+
+@dataclass(slots=True)
+class ShardPosterior:
+    """Gamma posterior over new accepted candidates per request for one production shard."""
+
+    key: str
+    shape: float
+    rate: float
+    requests: int = 0
+    last_requested_at: str = ""
+
+    @property
+    def mean(self) -> float:
+        return self.shape / self.rate
+
+
+def expert_precisions(model: dict[str, Any]) -> dict[str, float]:
+    experts = model.get("experts", []) if isinstance(model, dict) else []
+    return {
+        str(row["query_key"]): float(row.get("wilson_precision_lower_95") or 0.0)
+        for row in experts
+        if isinstance(row, dict) and row.get("query_key")
+    }
+
+
+def shard_posteriors(
+    production: list[dict[str, str]], runs: list[dict[str, Any]], precisions: dict[str, float]
+) -> dict[str, ShardPosterior]:
+    # The prior is the expert model's precision times the pooled novelty, worth PRIOR_REQUESTS requests of evidence.
+    requests = len(runs)
+    novelty = sum(int(run["new_count"]) for run in runs) / requests if requests else DEFAULT_NEW_PER_REQUEST
+    fallback = sum(precisions.values()) / len(precisions) if precisions else DEFAULT_PRECISION
+    posteriors = {}
+    for row in production:
+        prior = max(MINIMUM_PRIOR_MEAN, precisions.get(row["key"], fallback) * max(novelty, MINIMUM_PRIOR_MEAN))
+        posteriors[row["key"]] = ShardPosterior(row["key"], prior * PRIOR_REQUESTS, PRIOR_REQUESTS)
+    for run in runs:
+        posterior = posteriors.get(str(run["query_key"]))
+        if posterior is None:
+            continue
+        posterior.shape += int(run["accepted_new_count"])
+        posterior.rate += 1
+        posterior.requests += 1
+        posterior.last_requested_at = max(posterior.last_requested_at, str(run["observed_at"]))
+    return posteriors
+
+
+def select_bandit_plan(
+    plan: list[dict[str, str]],
+    now: datetime,
+    count: int,
+    *,
+    runs: list[dict[str, Any]],
+    precisions: dict[str, float],
+) -> tuple[list[dict[str, str]], dict[str, Any]]:
+    """Thompson-sample production shards by expected new accepted candidates per request.
+
+    Base queries always run, the audit groups keep their rotating quota, and the
+    least recently requested shards take the exploration quota before sampling.
+    """
+    base, production, audit = partition_plan(plan)
+    production_count = max(1, min(max(count - AUDIT_QUOTA, 1), len(production)))
+    ordinal = jst_date(now).toordinal()
+    posteriors = shard_posteriors(production, runs, precisions)
+    exploration_count = min(production_count, max(1, round(production_count * EXPLORATION_SHARE)))
+    rotated = rotate(production, ordinal, len(production))
+    explored = sorted(rotated, key=lambda row: posteriors[row["key"]].last_requested_at)[:exploration_count]
+    explored_keys = {row["key"] for row in explored}
+    generator = Random(jst_date(now).isoformat())
+    samples = {
+        row["key"]: generator.gammavariate(posteriors[row["key"]].shape, 1 / posteriors[row["key"]].rate)
+        for row in production
+    }
+    exploited = sorted(
+        (row for row in production if row["key"] not in explored_keys),
+        key=lambda row: (-samples[row["key"]], row["key"]),
+    )[: production_count - len(explored)]
+    audited = rotate(audit, ordinal, min(AUDIT_QUOTA, len(audit)))
+    summary = {
+        "mode": "bandit",
+        "window_days": SCHEDULER_WINDOW_DAYS,
+        "recorded_requests": len(runs),
+        "exploitation": [
+            {
+                "key": row["key"],
+                "sample": round(samples[row["key"]], 6),
+                "posterior_mean": round(posteriors[row["key"]].mean, 6),
+                "requests": posteriors[row["key"]].requests,
+            }
+            for row in exploited
+        ],
+        "exploration": [row["key"] for row in explored],
+        "audit": [row["key"] for row in audited],
+    }
+    return base + exploited + explored + audited, summary
+
+
+def shard_novelty(runs: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
+    """Novelty (new status ids / raw candidates) over each shard's most recent requests."""
+    by_key: dict[str, list[dict[str, Any]]] = {}
+    for run in sorted(runs, key=lambda item: str(item["observed_at"])):
+        by_key.setdefault(str(run["query_key"]), []).append(run)
+    novelty = {}
+    for key, history in by_key.items():
+        recent = history[-NOVELTY_WINDOW_REQUESTS:]
+        raw = sum(int(run["raw_count"]) for run in recent)
+        new = sum(int(run["new_count"]) for run in recent)
+        streak = 0
+        for run in reversed(recent):
+            if int(run["new_count"]) >= NOVELTY_THRESHOLD * int(run["raw_count"]) and int(run["raw_count"]):
+                break
+            streak += 1
+        novelty[key] = {
+            "requests": len(recent), "raw_count": raw, "new_count": new,
+            "novelty": round(new / raw, 6) if raw else 0.0, "low_novelty_streak": streak,
+            "last_requested_at": str(recent[-1]["observed_at"]),
+        }
+    return novelty
+
+
+def novelty_backoff(
+    plan: list[dict[str, str]], runs: list[dict[str, Any]], now: datetime
+) -> tuple[list[dict[str, str]], list[dict[str, Any]]]:
+    """Skip production shards whose recent novelty is below the threshold until their backoff expires.
+
+    Each further low-novelty request doubles the wait, so an exhausted shard is
+    still probed occasionally and rejoins the rotation once it finds new posts.
+    """
+    novelty = shard_novelty(runs)
+    kept: list[dict[str, str]] = []
+    skipped: list[dict[str, Any]] = []
+    for query in plan:
+        shard = novelty.get(query["key"])
+        if (
+            query["group"] == "base" or query["group"] in AUDIT_GROUPS or shard is None
+            or shard["requests"] < NOVELTY_MIN_REQUESTS or shard["novelty"] >= NOVELTY_THRESHOLD
+            or shard["low_novelty_streak"] < 1
+        ):
+            kept.append(query)
+            continue
+        backoff_days = min(NOVELTY_MAX_BACKOFF_DAYS, 2 ** (shard["low_novelty_streak"] - 1))
+        retry_at = snapshots.parse_time(shard["last_requested_at"]) + timedelta(days=backoff_days)
+        if now >= retry_at:
+            kept.append(query)
+            continue
+        skipped.append({
+            "key": query["key"], "group": query["group"], "term": query["term"],
+            "status": "skipped", "reason": "low_novelty", "raw_candidates": 0,
+            "novelty": shard["novelty"], "novelty_requests": shard["requests"],
+            "backoff_days": backoff_days, "retry_at": utc_text(retry_at),
+        })
+    return kept, skipped
+
+
+def shard_runs(
+    query_results: list[dict[str, Any]],
+    observed: list[dict[str, Any]],
+    evaluated: list[dict[str, Any]],
+    existing_ids: set[str],
+    observed_at: datetime,
+) -> list[dict[str, Any]]:
+    # A status id found by several shards in one run counts as new for each of them.
+    accepted = {str(row.get("status_id")) for row in evaluated if row.get("last_decision") == "accepted"}
+    new_by_key: Counter[str] = Counter()
+    accepted_by_key: Counter[str] = Counter()
+    for row in observed:
+        status_id = str(row.get("status_id"))
+        if status_id in existing_ids:
+            continue
+        new_by_key.update(row.get("query_keys", []))
+        if status_id in accepted:
+            accepted_by_key.update(row.get("query_keys", []))
+    return [
+        {
+            "query_key": result["key"], "observed_at": utc_text(observed_at),
+            "raw_count": int(result.get("raw_candidates") or 0),
+            "new_count": new_by_key[result["key"]], "accepted_new_count": accepted_by_key[result["key"]],
+        }
+        for result in query_results
+        if result.get("status") == "ok"
+    ]
 
 
 def candidate_score(row: dict[str, Any]) -> tuple[bool, int, int]:
@@ -306,43 +569,177 @@ def add_candidate(
     selected[status_id] = richer
 
 
+@dataclass(slots=True)
+class TokenBucket:
+    rate: float
+    capacity: float = 1.0
+    tokens: float = field(init=False)
+    updated: float = field(init=False, default_factory=time.monotonic)
+    lock: threading.Lock = field(init=False, default_factory=threading.Lock, repr=False)
+
+    def __post_init__(self) -> None:
+        self.capacity = max(1.0, self.capacity)
+        self.tokens = self.capacity
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def fetch_shard(
+    query: dict[str, str],
+    bucket: TokenBucket,
+    stop: threading.Event,
+    snapshot_root: Path | None = None,
+    stored: dict[str, dict[str, Any]] | None = None,
+) -> tuple[dict[str, Any], list[dict[str, Any]]] | None:
+    started = time.monotonic()
+    try:
+        implementation.validate_search_url(query["url"])
+        if stored is not None:
+            entry = stored.get(query["key"])
+            if entry is None:
+                raise RuntimeError("no stored Yahoo snapshot")
+            started = time.monotonic()
+            html = snapshots.load_html(entry, snapshot_root or snapshots.SNAPSHOT_ROOT)
+            status, final_url = int(entry.get("http_status") or 200), str(entry.get("final_url") or query["url"])
+        else:
+            bucket.acquire()
+            if stop.is_set():
+                return None
+            started = time.monotonic()
+            html, status, final_url = implementation.fetch_page(query["url"])
+            if snapshot_root is not None:
+                entry = snapshots.store(query["key"], html, url=query["url"], http_status=status, final_url=final_url, root=snapshot_root)
+        rows = implementation.extract_candidates(html)
+        result = {
+            "key": query["key"], "group": query["group"], "term": query["term"],
+            "status": "ok", "http_status": status, "final_url": final_url,
+            "html_bytes": len(html.encode()), "raw_candidates": len(rows),
+        }
+        if stored is not None or snapshot_root is not None:
+            result["snapshot_sha256"] = entry["sha256"]
+            result["snapshot_fetched_at"] = entry["fetched_at"]
+    except (RuntimeError, ValueError) as exc:
+        rows = []
+        result = {
+            "key": query["key"], "group": query["group"], "term": query["term"],
+            "status": "failed", "reason": str(exc), "raw_candidates": 0,
+        }
+    result["duration_ms"] = int((time.monotonic() - started) * 1000)
+    return result, rows
+
+
 def fetch_candidates(
-    plan: list[dict[str, str]], existing_ids: set[str], target: int, stop_at_target: bool, delay: float
+    plan: list[dict[str, str]],
+    existing_ids: set[str],
+    target: int,
+    stop_at_target: bool,
+    delay: float,
+    workers: int = DEFAULT_FETCH_WORKERS,
+    *,
+    snapshot_root: Path | None = None,
+    offline: bool = False,
+    completed: dict[str, tuple[dict[str, Any], list[dict[str, Any]]]] | None = None,
+    on_result: Callable[[dict[str, Any], list[dict[str, Any]]], None] | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], int]:
+    """Fetch shards concurrently and merge them in plan order.
+
+    ``completed`` replays shard outcomes saved by an earlier, interrupted run in
+    their plan position instead of fetching them again; ``on_result`` sees every
+    freshly fetched outcome once it has been merged.
+    """
     selected: dict[str, dict[str, Any]] = {}
     results: list[dict[str, Any]] = []
     raw_total = 0
-    for index, query in enumerate(plan):
-        started = time.monotonic()
-        try:
-            implementation.validate_search_url(query["url"])
-            html, status, final_url = implementation.fetch_page(query["url"])
-            rows = implementation.extract_candidates(html)
+    bucket = TokenBucket(1 / delay if delay > 0 else 0.0)
+    stop = threading.Event()
+    stored = snapshots.latest(snapshot_root or snapshots.SNAPSHOT_ROOT) if offline else None
+    completed = completed or {}
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(plan) or 1))) as executor:
+        futures = [
+            None if query["key"] in completed else executor.submit(fetch_shard, query, bucket, stop, snapshot_root, stored)
+            for query in plan
+        ]
+        for query, future in zip(plan, futures, strict=True):
+            outcome = (dict(completed[query["key"]][0]), completed[query["key"]][1]) if future is None else future.result()
+            if outcome is None:
+                break
+            result, rows = outcome
             raw_total += len(rows)
             for row in rows:
-                add_candidate(selected, row, query)
-            result = {
-                "key": query["key"], "group": query["group"], "term": query["term"],
-                "status": "ok", "http_status": status, "final_url": final_url,
-                "html_bytes": len(html.encode()), "raw_candidates": len(rows),
-                "unique_candidates_after_query": len(selected),
-                "duration_ms": int((time.monotonic() - started) * 1000),
-            }
-        except (RuntimeError, ValueError) as exc:
-            result = {
-                "key": query["key"], "group": query["group"], "term": query["term"],
-                "status": "failed", "reason": str(exc), "raw_candidates": 0,
-                "unique_candidates_after_query": len(selected),
-                "duration_ms": int((time.monotonic() - started) * 1000),
-            }
-        results.append(result)
-        if stop_at_target and len(existing_ids | set(selected)) >= target:
-            break
-        if delay > 0 and index + 1 < len(plan):
-            time.sleep(delay)
+                add_candidate(selected, row, result)
+            duration_ms = result.pop("duration_ms")
+            result["unique_candidates_after_query"] = len(selected)
+            result["duration_ms"] = duration_ms
+            results.append(result)
+            if future is not None and on_result is not None:
+                on_result(result, rows)
+            if stop_at_target and len(existing_ids | set(selected)) >= target:
+                stop.set()
+                for pending in futures:
+                    if pending is not None:
+                        pending.cancel()
+                break
     return list(selected.values()), results, raw_total
 
 
+def add_provenance(row: dict[str, Any], previous: dict[str, Any], current: dict[str, Any], observed_at: datetime) -> None:
+    row["query_keys"] = sorted(set(previous.get("query_keys", [])) | set(current.get("query_keys", [])))
+    row["query_groups"] = sorted(set(previous.get("query_groups", [])) | set(current.get("query_groups", [])))
+    row["query_terms"] = sorted(set(previous.get("query_terms", [])) | set(current.get("query_terms", [])))
+    row["observation_count"] = int(previous.get("observation_count") or 0) + (1 if current else 0)
+    row["max_retweet_count"] = max(
+        int(previous.get("max_retweet_count") or previous.get("retweet_count") or 0),
+        int(current.get("retweet_count") or 0),
+    )
+    if previous:
+        row["first_seen_at"] = previous.get("first_seen_at") or row.get("first_seen_at")
+    if current:
+        row["last_seen_at"] = utc_text(observed_at)
+
+
+def observe_in_store(
+    store: ledger_store.LedgerStore, observed: list[dict[str, Any]], observed_at: datetime, *, maximum: int = HISTORY_MAX_COUNT
+) -> list[dict[str, Any]]:
+    """Store-backed merge_history + merge_provenance: only the observed rows are rewritten, the rest stay as stored."""
+
+    def merge(previous: dict[str, Any] | None, current: dict[str, Any]) -> dict[str, Any] | None:
+        row = ledger.merge_observation(ledger.observed_candidate(previous, observed_at) if previous else None, current, observed_at)
+        if row is not None:
+            add_provenance(row, previous or {}, current, observed_at)
+        return row
+
+    store.upsert(observed, merge)
+    store.prune(observed_at - timedelta(days=ledger.HISTORY_RETENTION_DAYS))
+    store.cap(maximum)
+    return store.rows(recent=True)
+
+
+def seed_store(store: ledger_store.LedgerStore, rows: list[dict[str, Any]], seeded_at: datetime) -> int:
+    """Add rows from the pre-ledger rejected file only for status ids the ledger has never held."""
+
+    def seed(previous: dict[str, Any] | None, row: dict[str, Any]) -> dict[str, Any] | None:
+        if previous is not None:
+            return None
+        seeded = ledger.merge_observation(None, row, seeded_at)
+        if seeded is not None:
+            add_provenance(seeded, {}, {}, seeded_at)
+        return seeded
+
+    return store.upsert(rows, seed)
+
+
 def merge_provenance(
     merged: list[dict[str, Any]],
     existing: list[dict[str, Any]],
@@ -353,20 +750,7 @@ def merge_provenance(
     new = {str(row.get("status_id")): row for row in observed}
     for row in merged:
         status_id = str(row["status_id"])
-        previous = old.get(status_id, {})
-        current = new.get(status_id, {})
-        row["query_keys"] = sorted(set(previous.get("query_keys", [])) | set(current.get("query_keys", [])))
-        row["query_groups"] = sorted(set(previous.get("query_groups", [])) | set(current.get("query_groups", [])))
-        row["query_terms"] = sorted(set(previous.get("query_terms", [])) | set(current.get("query_terms", [])))
-        row["observation_count"] = int(previous.get("observation_count") or 0) + (1 if current else 0)
-        row["max_retweet_count"] = max(
-            int(previous.get("max_retweet_count") or previous.get("retweet_count") or 0),
-            int(current.get("retweet_count") or 0),
-        )
-        if previous:
-            row["first_seen_at"] = previous.get("first_seen_at") or row.get("first_seen_at")
-        if current:
-            row["last_seen_at"] = utc_text(observed_at)
+        add_provenance(row, old.get(status_id, {}), new.get(status_id, {}), observed_at)
     merged.sort(
         key=lambda row: (str(row.get("last_seen_at")), str(row.get("status_id"))),
         reverse=True,
@@ -375,10 +759,14 @@ def merge_provenance(
 
 
 def reevaluate(
-    history: list[dict[str, Any]], actual_now: datetime, min_retweets: int, x_ids: set[str]
+    history: list[dict[str, Any]],
+    actual_now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
     accepted, rejected, evaluated = ledger.reevaluate_history(
-        history, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids
+        history, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids, cache=cache
     )
     accepted_by_status = {
         str(row.get("source_id", "")).split(":")[-1]: row for row in accepted
@@ -438,8 +826,7 @@ def audit_payload(
                 "query_groups": row.get("query_groups", []),
             })
         if row.get("last_decision") == "accepted" and (
-            has_any(str(row.get("text") or ""), implementation.PRODUCT_TERMS)
-            or has_any(str(row.get("text") or ""), implementation.GIVEAWAY_TERMS)
+            not term_groups(str(row.get("text") or "")).isdisjoint({"product", "giveaway"})
         ):
             suspicious.append({
                 "status_id": status_id, "url": row.get("url"),
@@ -478,7 +865,11 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--target", type=int)
     parser.add_argument("--max-queries", type=int)
     parser.add_argument("--delay-seconds", type=float)
+    parser.add_argument("--workers", type=int, help="maximum number of Yahoo shards fetched at once")
     parser.add_argument("--require-target", action="store_true")
+    parser.add_argument("--no-snapshots", action="store_true", help="do not archive fetched Yahoo HTML")
+    parser.add_argument("--scheduler", choices=("rotation", "bandit"), help="daily production shard selection (default: config or rotation)")
+    parser.add_argument("--no-novelty-backoff", action="store_true", help="fetch daily shards even when their recent novelty is low")
     args = parser.parse_args(argv)
 
     configure_classifier()
@@ -491,13 +882,29 @@ def main(argv: list[str] | None = None) -> int:
         else config.get("request_delay_seconds", 0.75)
     )
     now = datetime.now(UTC).replace(microsecond=0)
-    before = ledger.read_history()
+    store = ledger_store.LedgerStore()
+    before = store.rows()
     plan = build_query_plan(config)
+    schedule: dict[str, Any] = {"mode": args.mode if args.mode == "bootstrap" else "rotation"}
+    skipped: list[dict[str, Any]] = []
     if args.mode == "bootstrap":
         selected_plan = plan[: int(args.max_queries or config.get("bootstrap_query_count", 140))]
     else:
         daily_count = int(config.get("daily_query_count", 16)) * (2 if len(before) < target else 1)
-        selected_plan = select_daily_plan(plan, now, int(args.max_queries or daily_count))
+        runs = store.shard_runs(now - timedelta(days=SCHEDULER_WINDOW_DAYS))
+        # Backed-off shards leave the candidate pool first, so their slots go to other shards.
+        if not args.no_novelty_backoff:
+            plan, skipped = novelty_backoff(plan, runs, now)
+        if (args.scheduler or config.get("scheduler", "rotation")) == "bandit":
+            selected_plan, schedule = select_bandit_plan(
+                plan, now, int(args.max_queries or daily_count),
+                runs=runs, precisions=expert_precisions(read_json(EXPERT_MODEL_PATH, {})),
+            )
+        else:
+            selected_plan = select_daily_plan(plan, now, int(args.max_queries or daily_count))
+        schedule["recorded_requests"] = len(runs)
+        if not runs:
+            schedule["warning"] = f"no shard runs recorded in {ledger_store.SHARD_RUNS_PATH}; scheduling from priors only"
 
     observed, query_results, raw_total = fetch_candidates(
         selected_plan,
@@ -505,7 +912,15 @@ def main(argv: list[str] | None = None) -> int:
         target,
         args.mode == "bootstrap",
         max(0.0, delay),
+        int(args.workers or config.get("max_parallel_requests") or DEFAULT_FETCH_WORKERS),
+        snapshot_root=None if args.no_snapshots else snapshots.SNAPSHOT_ROOT,
     )
+    if not args.no_snapshots:
+        snapshots.prune(
+            now=now,
+            retention_days=int(config.get("snapshot_retention_days", snapshots.RETENTION_DAYS)),
+            keep_per_query=int(config.get("snapshot_max_per_query", snapshots.MAX_SNAPSHOTS_PER_QUERY)),
+        )
     successful = sum(row.get("status") == "ok" for row in query_results)
     if successful == 0:
         health = ledger.read_object(implementation.HEALTH_PATH)
@@ -515,37 +930,45 @@ def main(argv: list[str] | None = None) -> int:
             "corpus_target_count": target, "corpus_candidate_count": len(before),
             "corpus_target_reached": len(before) >= target,
             "queries_attempted": len(query_results), "queries_succeeded": 0,
-            "queries_failed": len(query_results), "query_results": query_results,
+            "queries_failed": len(query_results), "queries_skipped": len(skipped),
+            "query_results": query_results + skipped,
         })
         implementation.write_json(implementation.HEALTH_PATH, health)
+        store.close()
         return 1 if args.require_target and len(before) < target else 0
 
     implementation.write_json(SNAPSHOT_PATH, {
         "schema_version": "1.0", "generated_at": utc_text(now), "mode": args.mode,
         "candidate_count": len(observed), "raw_candidate_count": raw_total,
         "duplicate_observations_removed": max(0, raw_total - len(observed)),
-        "query_results": query_results, "candidates": observed,
+        "query_results": query_results + skipped, "candidates": observed,
     })
 
     ledger.HISTORY_RETENTION_DAYS = int(config.get("retention_days", HISTORY_RETENTION_DAYS))
-    migrated = ledger.merge_history(
-        before, implementation.read_array(implementation.REJECTED_PATH),
+    seed_store(
+        store, implementation.read_array(implementation.REJECTED_PATH),
         implementation.parse_instant(
             str(ledger.read_object(implementation.HEALTH_PATH).get("generated_at") or "")
         ) or now,
     )
-    merged = ledger.merge_history(migrated, observed, now)
-    merged = merge_provenance(merged, before, observed, now)
+    merged = observe_in_store(store, observed, now)
     min_retweets = int(os.environ.get("YAHOO_MIN_RETWEETS", "3"))
     x_ids = implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH))
-    accepted, rejected, evaluated = reevaluate(merged, now, min_retweets, x_ids)
+    cache = decision_cache.DecisionCache.for_stage("collect_yahoo_corpus")
+    accepted, rejected, evaluated = reevaluate(merged, now, min_retweets, x_ids, cache)
+    cache.save()
+    store.record_shard_runs(
+        shard_runs(query_results, observed, evaluated, {str(row.get("status_id")) for row in before}, now),
+        keep_after=now - timedelta(days=SCHEDULER_WINDOW_DAYS),
+    )
     accepted.sort(key=lambda row: (str(row.get("starts_at")), str(row.get("source_id"))))
     rejected.sort(
         key=lambda row: (-int(row.get("retweet_count") or 0), str(row.get("reason")), str(row.get("status_id")))
     )
     implementation.write_json(implementation.OUTPUT_PATH, accepted)
     implementation.write_json(implementation.REJECTED_PATH, rejected[:2000])
-    implementation.write_json(ledger.HISTORY_PATH, {
+    store.write(ledger_store.changed_rows(merged, evaluated))
+    store.export({
         "schema_version": "2.0",
         "retention_days": ledger.HISTORY_RETENTION_DAYS,
         "maximum_candidates": int(config.get("maximum_candidates", HISTORY_MAX_COUNT)),
@@ -553,11 +976,10 @@ def main(argv: list[str] | None = None) -> int:
         "generated_at": utc_text(now), "candidate_count": len(evaluated),
         "query_summary": {
             "attempted": len(query_results), "succeeded": successful,
-            "failed": len(query_results) - successful,
+            "failed": len(query_results) - successful, "skipped": len(skipped),
         },
-        "candidates": evaluated,
-    })
-    audit = audit_payload(before, evaluated, query_results, target, now)
+    }, recent=True)
+    audit = audit_payload(before, evaluated, query_results + skipped, target, now)
     implementation.write_json(AUDIT_PATH, audit)
     health = ledger.read_object(implementation.HEALTH_PATH)
     health.update({
@@ -571,14 +993,17 @@ def main(argv: list[str] | None = None) -> int:
         "history_rejected_count": len(rejected), "corpus_target_count": target,
         "corpus_target_reached": len(evaluated) >= target,
         "queries_attempted": len(query_results), "queries_succeeded": successful,
-        "queries_failed": len(query_results) - successful,
+        "queries_failed": len(query_results) - successful, "queries_skipped": len(skipped),
         "raw_candidate_count": raw_total, "unique_candidates_this_run": len(observed),
         "duplicate_observations_removed": max(0, raw_total - len(observed)),
-        "rejection_counts": audit["rejection_reason_counts"], "query_results": query_results,
+        "rejection_counts": audit["rejection_reason_counts"], "query_results": query_results + skipped,
+        "decision_cache": {**health.get("decision_cache", {}), "collect_yahoo_corpus": cache.stats()},
+        "ledger_store": store.stats(), "query_schedule": schedule,
     })
+    store.close()
     implementation.write_json(implementation.HEALTH_PATH, health)
     print(
-        f"Yahoo corpus: mode={args.mode} queries={len(query_results)} successful={successful} "
+        f"Yahoo corpus: mode={args.mode} queries={len(query_results)} successful={successful} skipped={len(skipped)} "
         f"observed={len(observed)} history={len(evaluated)} accepted={len(accepted)} "
         f"rejected={len(rejected)} target={target}"
     )
@@ -586,4 +1011,4 @@ def main(argv: list[str] | None = None) -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("collect_yahoo_corpus", main))
@@ -11,10 +11,12 @@ from datetime import datetime
 from difflib import SequenceMatcher
 from itertools import combinations
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
-from cast_event_cal.core import Event, render_ics
+from cast_event_cal.core import Event, write_ics
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.profiling import run_profiled
 
 DEFAULT_EVENTS = Path("public/events.json")
 DEFAULT_ICS = Path("public/calendar.ics")
@@ -478,16 +480,15 @@ def public_event(row: dict[str, Any]) -> Event:
     ).normalized()
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(
-        description="Collapse duplicate source posts into canonical event occurrences"
-    )
-    parser.add_argument("--events", type=Path, default=DEFAULT_EVENTS)
-    parser.add_argument("--ics", type=Path, default=DEFAULT_ICS)
-    parser.add_argument("--audit", type=Path, default=DEFAULT_AUDIT)
-    args = parser.parse_args()
+def calendar_events(document: dict[str, Any]) -> Iterator[Event]:
+    return (public_event(row) for row in document.get("events", []))
 
-    document = json.loads(args.events.read_text(encoding="utf-8"))
+
+def document_generated_at(document: dict[str, Any]) -> datetime:
+    return datetime.fromisoformat(str(document["generated_at"]).replace("Z", "+00:00"))
+
+
+def update_document(document: dict[str, Any]) -> dict[str, Any]:
     rows = document.get("events", [])
     generated_at = str(document.get("generated_at") or "")
     if not isinstance(rows, list):
@@ -510,26 +511,33 @@ def main() -> int:
         )
     }
 
-    args.events.write_text(
-        json.dumps(document, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-    )
-    args.audit.write_text(
-        json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
-    )
-    generated = datetime.fromisoformat(generated_at.replace("Z", "+00:00"))
-    args.ics.write_text(
-        render_ics([public_event(row) for row in deduped], generated),
-        encoding="utf-8",
-        newline="",
-    )
     print(
         "Occurrence dedup: "
         f"before={audit['event_count_before']} after={audit['event_count_after']} "
         f"collapsed={audit['duplicate_occurrence_count']} "
         f"clusters={audit['duplicate_cluster_count']}"
     )
+    return audit
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Collapse duplicate source posts into canonical event occurrences"
+    )
+    parser.add_argument("--events", type=Path, default=DEFAULT_EVENTS)
+    parser.add_argument("--ics", type=Path, default=DEFAULT_ICS)
+    parser.add_argument("--audit", type=Path, default=DEFAULT_AUDIT)
+    args = parser.parse_args()
+
+    document = json.loads(args.events.read_text(encoding="utf-8"))
+    audit = update_document(document)
+    write_events_document(args.events, document)
+    args.audit.write_text(
+        json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+    )
+    write_ics(args.ics, calendar_events(document), document_generated_at(document))
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("deduplicate_occurrences", main))
@@ -3,6 +3,7 @@ from __future__ import annotations
 import json
 import os
 import re
+import sys
 from collections import Counter
 from datetime import UTC, datetime
 from pathlib import Path
@@ -11,6 +12,12 @@ from urllib.parse import urlparse
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.sessions import session
+
 EVENTS = Path("public/events.json")
 AUDIT = Path("public/event-link-audit.json")
 URL_RE = re.compile(r"https://[^\s<>\]\[(){}\"'、。]+", re.I)
@@ -139,21 +146,19 @@ def enrich(event: dict[str, Any], client: httpx.Client, resolution_cache: dict[s
     return output
 
 
-def main() -> int:
-    doc = json.loads(EVENTS.read_text(encoding="utf-8"))
+def update_document(doc: dict[str, Any]) -> dict[str, Any]:
     counts: Counter[str] = Counter()
     rows = []
     resolution_cache: dict[str, tuple[str, str]] = {}
-    with httpx.Client(timeout=3, follow_redirects=True, headers={"User-Agent": "Mozilla/5.0 cast-event-cal/2"}) as client:
-        for event in doc.get("events", []):
-            row = enrich(event, client, resolution_cache)
-            rows.append(row)
-            for link in row.get("official_links", []) + row.get("related_links", []):
-                counts[str(link.get("kind"))] += 1
+    client = session(timeout=3)
+    for event in doc.get("events", []):
+        row = enrich(event, client, resolution_cache)
+        rows.append(row)
+        for link in row.get("official_links", []) + row.get("related_links", []):
+            counts[str(link.get("kind"))] += 1
     doc["events"] = rows
     doc["count"] = len(rows)
     doc["link_discovered_at"] = now_iso()
-    EVENTS.write_text(json.dumps(doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     audit = {
         "schema_version": "1.0",
         "generated_at": now_iso(),
@@ -177,6 +182,13 @@ def main() -> int:
     }
     AUDIT.write_text(json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     print(json.dumps(audit["link_kind_counts"], ensure_ascii=False))
+    return audit
+
+
+def main() -> int:
+    doc = json.loads(EVENTS.read_text(encoding="utf-8"))
+    update_document(doc)
+    write_events_document(EVENTS, doc)
     return 0
 
 
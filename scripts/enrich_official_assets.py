@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import json
 import re
+import sys
 from collections import Counter
 from datetime import UTC, datetime
 from pathlib import Path
@@ -10,6 +11,12 @@ from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.sessions import session
+
 EVENTS_PATH = Path("public/events.json")
 CACHE_PATH = Path("data/official_asset_cache.json")
 AUDIT_PATH = Path("public/official-asset-audit.json")
@@ -160,8 +167,7 @@ def cache_needs_refresh(item: Any) -> bool:
     return item.get("evidence") != "x_syndication_token_v2"
 
 
-def main() -> int:
-    document = load_json(EVENTS_PATH, {})
+def update_document(document: dict[str, Any]) -> dict[str, int]:
     events = document.get("events", [])
     cache_doc = load_json(CACHE_PATH, {"schema_version": "1.1", "items": {}})
     cache_doc["schema_version"] = "1.1"
@@ -174,28 +180,28 @@ def main() -> int:
 
     fetched = 0
     failures: Counter[str] = Counter()
-    with httpx.Client(timeout=12, follow_redirects=True, headers={"User-Agent": "Mozilla/5.0 cast-event-cal/2"}) as client:
-        for status_id, handle in identities.items():
-            if not cache_needs_refresh(cache.get(status_id)):
-                continue
-            try:
-                response = client.get(SYNDICATION_URL, params={"id": status_id, "lang": "ja", "token": "0"})
-                response.raise_for_status()
-                payload = response.json()
-                if not isinstance(payload, dict) or not payload.get("user"):
-                    raise ValueError("incomplete syndication payload")
-                cache[status_id] = {**assets_from_payload(payload, handle), "fetched_at": now_iso()}
-                fetched += 1
-            except (httpx.HTTPError, ValueError, TypeError) as exc:
-                failures[type(exc).__name__] += 1
-                cache[status_id] = {
-                    "official_x_url": f"https://x.com/{handle}",
-                    "official_website_url": None,
-                    "image_url": None,
-                    "image_kind": None,
-                    "evidence": "x_identity_only",
-                    "fetched_at": now_iso(),
-                }
+    client = session(timeout=12)
+    for status_id, handle in identities.items():
+        if not cache_needs_refresh(cache.get(status_id)):
+            continue
+        try:
+            response = client.get(SYNDICATION_URL, params={"id": status_id, "lang": "ja", "token": "0"})
+            response.raise_for_status()
+            payload = response.json()
+            if not isinstance(payload, dict) or not payload.get("user"):
+                raise ValueError("incomplete syndication payload")
+            cache[status_id] = {**assets_from_payload(payload, handle), "fetched_at": now_iso()}
+            fetched += 1
+        except (httpx.HTTPError, ValueError, TypeError) as exc:
+            failures[type(exc).__name__] += 1
+            cache[status_id] = {
+                "official_x_url": f"https://x.com/{handle}",
+                "official_website_url": None,
+                "image_url": None,
+                "image_kind": None,
+                "evidence": "x_identity_only",
+                "fetched_at": now_iso(),
+            }
 
     enriched = []
     for event in events:
@@ -204,7 +210,6 @@ def main() -> int:
     document["events"] = enriched
     document["count"] = len(enriched)
     document["official_asset_enriched_at"] = now_iso()
-    EVENTS_PATH.write_text(json.dumps(document, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     CACHE_PATH.write_text(json.dumps(cache_doc, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
 
     counts = {
@@ -238,6 +243,13 @@ def main() -> int:
     }
     AUDIT_PATH.write_text(json.dumps(audit, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     print(json.dumps(counts, ensure_ascii=False))
+    return counts
+
+
+def main() -> int:
+    document = load_json(EVENTS_PATH, {})
+    update_document(document)
+    write_events_document(EVENTS_PATH, document)
     return 0
 
 
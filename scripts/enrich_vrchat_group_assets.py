@@ -3,6 +3,7 @@ from __future__ import annotations
 import html
 import json
 import re
+import sys
 from collections import Counter
 from datetime import UTC, datetime
 from pathlib import Path
@@ -11,6 +12,12 @@ from urllib.parse import urlparse
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.documents import write_events_document
+from cast_event_cal.sessions import session
+
 try:
     from scripts.validate_public_image_assets import sanitize_event_images, write_audit
 except ModuleNotFoundError as exc:
@@ -62,23 +69,22 @@ def extract_group_image(page_html: str) -> str | None:
     return None
 
 
-def main() -> int:
-    document = json.loads(EVENTS.read_text(encoding="utf-8"))
+def update_document(document: dict[str, Any]) -> dict[str, Any]:
     events = [row for row in document.get("events", []) if isinstance(row, dict)]
     urls = sorted({url for row in events if (url := group_url(row))})
     images: dict[str, str | None] = {}
     failures: Counter[str] = Counter()
-    with httpx.Client(timeout=12, follow_redirects=True, headers={"User-Agent": "Mozilla/5.0 cast-event-cal/2"}) as client:
-        for url in urls:
-            try:
-                response = client.get(url)
-                response.raise_for_status()
-                images[url] = extract_group_image(response.text)
-                if not images[url]:
-                    failures["missing_meta_image"] += 1
-            except httpx.HTTPError as exc:
-                images[url] = None
-                failures[type(exc).__name__] += 1
+    client = session(timeout=12)
+    for url in urls:
+        try:
+            response = client.get(url)
+            response.raise_for_status()
+            images[url] = extract_group_image(response.text)
+            if not images[url]:
+                failures["missing_meta_image"] += 1
+        except httpx.HTTPError as exc:
+            images[url] = None
+            failures[type(exc).__name__] += 1
 
     enriched = []
     for event in events:
@@ -100,7 +106,6 @@ def main() -> int:
     document["events"] = enriched
     document["vrchat_group_assets_enriched_at"] = now_iso()
     document["image_reachability_validated_at"] = image_audit["generated_at"]
-    EVENTS.write_text(json.dumps(document, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
     audit = {
         "schema_version": "1.0",
         "generated_at": now_iso(),
@@ -136,6 +141,13 @@ def main() -> int:
             ensure_ascii=False,
         )
     )
+    return audit
+
+
+def main() -> int:
+    document = json.loads(EVENTS.read_text(encoding="utf-8"))
+    update_document(document)
+    write_events_document(EVENTS, document)
     return 0
 
 
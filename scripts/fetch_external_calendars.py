@@ -5,6 +5,7 @@ import hashlib
 import json
 import os
 import re
+import sys
 import unicodedata
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime, timedelta
@@ -12,12 +13,18 @@ from html.parser import HTMLParser
 from pathlib import Path
 from typing import Any, Iterable
 from urllib.parse import quote, urljoin, urlsplit, urlunsplit
-from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from zoneinfo import ZoneInfo
 
 import httpx
 import yaml
-from dateutil import parser as date_parser
-from dateutil.rrule import rrulestr
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.ics import Occurrence, decode_value, iter_occurrences
+from cast_event_cal.sessions import session
+from cast_event_cal.profiling import run_profiled
+from cast_event_cal.timestamps import parse_instant
 
 JST = ZoneInfo("Asia/Tokyo")
 USER_AGENT = "cast-event-cal/2.2 (+https://github.com/KAFKA2306/cast_event_cal)"
@@ -92,68 +99,16 @@ def load_config(path: Path) -> dict[str, Any]:
     return payload
 
 
-def safe_zoneinfo(value: str | None) -> ZoneInfo:
-    try:
-        return ZoneInfo(value or "Asia/Tokyo")
-    except ZoneInfoNotFoundError:
-        return JST
-
-
 def parse_datetime(value: str | datetime, *, default_timezone: str = "Asia/Tokyo") -> datetime:
-    parsed = value if isinstance(value, datetime) else date_parser.isoparse(value)
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=safe_zoneinfo(default_timezone))
-    return parsed.astimezone(UTC)
+    return parse_instant(value, default_timezone=default_timezone)
 
 
 def normalize_datetime(value: str | datetime, *, default_timezone: str = "Asia/Tokyo") -> str:
     return parse_datetime(value, default_timezone=default_timezone).isoformat().replace("+00:00", "Z")
 
 
-def unfold_ics(text: str) -> list[str]:
-    lines: list[str] = []
-    for raw in text.replace("\r\n", "\n").replace("\r", "\n").split("\n"):
-        if raw.startswith((" ", "\t")) and lines:
-            lines[-1] += raw[1:]
-        else:
-            lines.append(raw)
-    return lines
-
-
-def decode_ics_value(value: str) -> str:
-    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
-
-
-def parse_ics_property(line: str) -> tuple[str, dict[str, str], str] | None:
-    if ":" not in line:
-        return None
-    left, value = line.split(":", 1)
-    pieces = left.split(";")
-    params: dict[str, str] = {}
-    for piece in pieces[1:]:
-        if "=" in piece:
-            key, param_value = piece.split("=", 1)
-            params[key.upper()] = param_value.strip('"')
-    return pieces[0].upper(), params, value
-
-
-def parse_ics_datetime(value: str, params: dict[str, str], *, default_timezone: str) -> datetime:
-    timezone = safe_zoneinfo(params.get("TZID") or default_timezone)
-    if params.get("VALUE") == "DATE" or re.fullmatch(r"\d{8}", value):
-        return datetime.strptime(value[:8], "%Y%m%d").replace(tzinfo=timezone).astimezone(UTC)
-    if value.endswith("Z"):
-        return datetime.strptime(value, "%Y%m%dT%H%M%SZ").replace(tzinfo=UTC)
-    fmt = "%Y%m%dT%H%M%S" if len(value) >= 15 else "%Y%m%dT%H%M"
-    return datetime.strptime(value, fmt).replace(tzinfo=timezone).astimezone(UTC)
-
-
-def property_first(block: dict[str, list[tuple[dict[str, str], str]]], name: str) -> tuple[dict[str, str], str] | None:
-    values = block.get(name, [])
-    return values[0] if values else None
-
-
-def organizer_from_ics(block: dict[str, list[tuple[dict[str, str], str]]]) -> str | None:
-    item = property_first(block, "ORGANIZER")
+def organizer_from_ics(occurrence: Occurrence) -> str | None:
+    item = occurrence.first("ORGANIZER")
     if not item:
         return None
     params, value = item
@@ -168,7 +123,7 @@ def stable_source_id(source: str, raw_id: str | None, title: str, starts_at: str
 
 
 def parse_ics_events(
-    text: str,
+    text: str | Iterable[bytes | str],
     *,
     source_name: str,
     fetched_at: str,
@@ -179,83 +134,43 @@ def parse_ics_events(
     window_end: datetime,
     max_events: int,
 ) -> list[dict[str, Any]]:
-    blocks: list[dict[str, list[tuple[dict[str, str], str]]]] = []
-    current: dict[str, list[tuple[dict[str, str], str]]] | None = None
-    for line in unfold_ics(text):
-        if line == "BEGIN:VEVENT":
-            current = {}
-        elif line == "END:VEVENT" and current is not None:
-            blocks.append(current)
-            current = None
-        elif current is not None and (parsed := parse_ics_property(line)):
-            name, params, value = parsed
-            current.setdefault(name, []).append((params, value))
-
     output: dict[str, dict[str, Any]] = {}
-    for block in blocks:
-        start_item = property_first(block, "DTSTART")
-        summary_item = property_first(block, "SUMMARY")
-        if not start_item or not summary_item:
+    overrides: set[str] = set()
+    base_tags = [clean_text(tag) for tag in tags]
+    for occurrence in iter_occurrences(text, default_timezone=default_timezone, window_start=window_start, window_end=window_end):
+        title = occurrence.text("SUMMARY")
+        if title is None:
             continue
-        start = parse_ics_datetime(start_item[1], start_item[0], default_timezone=default_timezone)
-        end_item = property_first(block, "DTEND")
-        end = parse_ics_datetime(end_item[1], end_item[0], default_timezone=default_timezone) if end_item else None
-        duration = end - start if end else None
-        uid_item = property_first(block, "UID")
+        uid_item = occurrence.first("UID")
         uid = clean_text(uid_item[1]) if uid_item else None
-        title = decode_ics_value(summary_item[1])
-        description_item = property_first(block, "DESCRIPTION")
-        location_item = property_first(block, "LOCATION")
-        url_item = property_first(block, "URL")
-        status_item = property_first(block, "STATUS")
-        recurrence_item = property_first(block, "RRULE")
-        recurrence_id_item = property_first(block, "RECURRENCE-ID")
-        categories = [decode_ics_value(value) for _, value in block.get("CATEGORIES", [])]
-        event_tags = sorted({clean_text(tag) for tag in [*tags, *categories] if clean_text(tag)})
-        exdates = {
-            parse_ics_datetime(value, params, default_timezone=default_timezone)
-            for params, values in block.get("EXDATE", [])
-            for value in values.split(",")
+        url_item = occurrence.first("URL")
+        status_item = occurrence.first("STATUS")
+        categories = [decode_value(value) for _, value in occurrence.component.get("CATEGORIES", [])]
+        event_url = clean_text(url_item[1]) if url_item else source_page
+        starts_at = utc_text(occurrence.start)
+        suffix = f":{utc_text(occurrence.recurrence_id)}" if occurrence.recurrence_id else ""
+        source_id = stable_source_id(source_name, f"{uid}{suffix}" if uid else None, title, starts_at, event_url)
+        if source_id in overrides and not occurrence.override:
+            continue
+        event = {
+            "source_id": source_id,
+            "title": clean_text(title),
+            "starts_at": starts_at,
+            "ends_at": utc_text(occurrence.end) if occurrence.end else None,
+            "organizer": organizer_from_ics(occurrence),
+            "location": occurrence.text("LOCATION"),
+            "description": occurrence.text("DESCRIPTION"),
+            "url": event_url or None,
+            "status": "cancelled" if status_item and status_item[1].upper() == "CANCELLED" else "scheduled",
+            "source": source_name,
+            "fetched_at": fetched_at,
+            "tags": sorted({tag for tag in [*base_tags, *(clean_text(item) for item in categories)] if tag}),
+            "confidence": 1.0,
+            "review_required": False,
         }
-        occurrences = [start]
-        recurrence_identity: datetime | None = None
-        if recurrence_item and recurrence_id_item is None:
-            try:
-                occurrences = list(rrulestr(recurrence_item[1], dtstart=start).between(window_start, window_end, inc=True))
-            except (TypeError, ValueError, OverflowError):
-                occurrences = [start]
-        if recurrence_id_item:
-            recurrence_identity = parse_ics_datetime(recurrence_id_item[1], recurrence_id_item[0], default_timezone=default_timezone)
-            occurrences = [start]
-
-        for occurrence in occurrences:
-            occurrence = occurrence.astimezone(UTC)
-            if occurrence in exdates or not window_start <= occurrence <= window_end:
-                continue
-            event_url = clean_text(url_item[1]) if url_item else source_page
-            starts_at = utc_text(occurrence)
-            identity_time = recurrence_identity or occurrence
-            suffix = f":{utc_text(identity_time)}" if recurrence_item or recurrence_id_item else ""
-            source_id = stable_source_id(source_name, f"{uid}{suffix}" if uid else None, title, starts_at, event_url)
-            event = {
-                "source_id": source_id,
-                "title": clean_text(title),
-                "starts_at": starts_at,
-                "ends_at": utc_text(occurrence + duration) if duration else None,
-                "organizer": organizer_from_ics(block),
-                "location": decode_ics_value(location_item[1]) if location_item else None,
-                "description": decode_ics_value(description_item[1]) if description_item else None,
-                "url": event_url or None,
-                "status": "cancelled" if status_item and status_item[1].upper() == "CANCELLED" else "scheduled",
-                "source": source_name,
-                "fetched_at": fetched_at,
-                "tags": event_tags,
-                "confidence": 1.0,
-                "review_required": False,
-            }
-            output[source_id] = {key: value for key, value in event.items() if value is not None}
-            if len(output) >= max_events:
-                break
+        if occurrence.override:
+            overrides.add(source_id)
+        output[source_id] = {key: value for key, value in event.items() if value is not None}
         if len(output) >= max_events:
             break
     return sorted(output.values(), key=lambda row: (row["starts_at"], row["title"]))
@@ -463,19 +378,19 @@ def source_url(source: dict[str, Any]) -> str:
 
 
 def collect_ics(client: httpx.Client, source: dict[str, Any], *, fetched_at: str, start: datetime, end: datetime) -> list[dict[str, Any]]:
-    response = client.get(source_url(source), headers=source.get("headers"))
-    response.raise_for_status()
-    return parse_ics_events(
-        response.text,
-        source_name=clean_text(source["name"]),
-        fetched_at=fetched_at,
-        source_page=clean_text(source.get("source_page")) or None,
-        tags=source.get("tags", []),
-        default_timezone=clean_text(source.get("timezone") or "Asia/Tokyo"),
-        window_start=start,
-        window_end=end,
-        max_events=max(1, min(int(source.get("max_events", 2000)), 10000)),
-    )
+    with client.stream("GET", source_url(source), headers=source.get("headers")) as response:
+        response.raise_for_status()
+        return parse_ics_events(
+            response.iter_bytes(),
+            source_name=clean_text(source["name"]),
+            fetched_at=fetched_at,
+            source_page=clean_text(source.get("source_page")) or None,
+            tags=source.get("tags", []),
+            default_timezone=clean_text(source.get("timezone") or "Asia/Tokyo"),
+            window_start=start,
+            window_end=end,
+            max_events=max(1, min(int(source.get("max_events", 2000)), 10000)),
+        )
 
 
 def collect_jsonld(client: httpx.Client, source: dict[str, Any], *, config_path: Path, fetched_at: str, start: datetime, end: datetime) -> list[dict[str, Any]]:
@@ -508,39 +423,39 @@ def run_collection(*, config_path: Path, output: Path, health_output: Path, time
     gathered: list[dict[str, Any]] = []
     results: list[SourceResult] = []
 
-    with httpx.Client(timeout=request_timeout, follow_redirects=True, headers={"User-Agent": USER_AGENT}) as client:
-        for source in config.get("sources", []):
-            if not isinstance(source, dict) or not source.get("enabled", True):
+    client = session(timeout=request_timeout, user_agent=USER_AGENT)
+    for source in config.get("sources", []):
+        if not isinstance(source, dict) or not source.get("enabled", True):
+            continue
+        name = clean_text(source.get("name"))
+        source_type = clean_text(source.get("type"))
+        source_page = clean_text(source.get("source_page")) or None
+        policy_url = clean_text(source.get("policy_url")) or None
+        if not name:
+            raise ValueError("external source has no name")
+        effective_type = source_type
+        if source_type == "permissioned_ics":
+            approval_env = clean_text(source.get("approval_env"))
+            if not approval_env or not env_truthy(approval_env):
+                results.append(SourceResult(name, source_type, "skipped", 0, error=f"{approval_env or 'approval env'} is not approved", source_page=source_page, policy_url=policy_url))
                 continue
-            name = clean_text(source.get("name"))
-            source_type = clean_text(source.get("type"))
-            source_page = clean_text(source.get("source_page")) or None
-            policy_url = clean_text(source.get("policy_url")) or None
-            if not name:
-                raise ValueError("external source has no name")
-            effective_type = source_type
-            if source_type == "permissioned_ics":
-                approval_env = clean_text(source.get("approval_env"))
-                if not approval_env or not env_truthy(approval_env):
-                    results.append(SourceResult(name, source_type, "skipped", 0, error=f"{approval_env or 'approval env'} is not approved", source_page=source_page, policy_url=policy_url))
+            effective_type = "ics"
+        try:
+            if effective_type == "ics":
+                events = collect_ics(client, source, fetched_at=fetched_at, start=start, end=end)
+            elif effective_type in {"jsonld_pages", "ontology_jsonld"}:
+                if not source_urls(source, config_path):
+                    results.append(SourceResult(name, source_type, "skipped", 0, error="no official event pages configured", source_page=source_page, policy_url=policy_url))
                     continue
-                effective_type = "ics"
-            try:
-                if effective_type == "ics":
-                    events = collect_ics(client, source, fetched_at=fetched_at, start=start, end=end)
-                elif effective_type in {"jsonld_pages", "ontology_jsonld"}:
-                    if not source_urls(source, config_path):
-                        results.append(SourceResult(name, source_type, "skipped", 0, error="no official event pages configured", source_page=source_page, policy_url=policy_url))
-                        continue
-                    events = collect_jsonld(client, source, config_path=config_path, fetched_at=fetched_at, start=start, end=end)
-                else:
-                    raise ExternalSourceError(f"unsupported external source type: {source_type}")
-                gathered.extend(events)
-                results.append(SourceResult(name, source_type, "ok", len(events), source_page=source_page, policy_url=policy_url))
-            except Exception as exc:
-                cached = [row for row in previous if clean_text(row.get("source")) == name]
-                gathered.extend(cached)
-                results.append(SourceResult(name, source_type, "degraded", len(cached), error=f"{type(exc).__name__}: {exc}", stale_cache_count=len(cached), source_page=source_page, policy_url=policy_url))
+                events = collect_jsonld(client, source, config_path=config_path, fetched_at=fetched_at, start=start, end=end)
+            else:
+                raise ExternalSourceError(f"unsupported external source type: {source_type}")
+            gathered.extend(events)
+            results.append(SourceResult(name, source_type, "ok", len(events), source_page=source_page, policy_url=policy_url))
+        except Exception as exc:
+            cached = [row for row in previous if clean_text(row.get("source")) == name]
+            gathered.extend(cached)
+            results.append(SourceResult(name, source_type, "degraded", len(cached), error=f"{type(exc).__name__}: {exc}", stale_cache_count=len(cached), source_page=source_page, policy_url=policy_url))
 
     existing: list[dict[str, Any]] = []
     for path in config.get("dedupe_against", []):
@@ -583,4 +498,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("fetch_external_calendars", main))
@@ -4,12 +4,18 @@ import argparse
 import json
 import os
 import re
+import sys
 from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.sessions import session
+
 SEARCH_API_URL = "https://api.vrchat.cloud/api/1/calendar/search"
 DISCOVER_API_URL = "https://api.vrchat.cloud/api/1/calendar/discover"
 USER_AGENT = "cast-event-cal/2.2 (+https://github.com/KAFKA2306/cast_event_cal)"
@@ -229,24 +235,20 @@ def run_discovery(
     errors: list[str] = []
     raw_rows: list[dict[str, Any]] = []
     route_counts = {"discover": 0, "search": 0}
-    with httpx.Client(
-        timeout=timeout,
-        follow_redirects=True,
-        headers={"User-Agent": USER_AGENT, "Cookie": f"auth={token}"},
-    ) as client:
+    client = session(timeout=timeout, user_agent=USER_AGENT, headers={"Cookie": f"auth={token}"})
+    try:
+        discovered = fetch_discover(client, page_size=page_size, max_pages=max_pages)
+        raw_rows.extend(discovered)
+        route_counts["discover"] = len(discovered)
+    except Exception as exc:
+        errors.append(f"discover: {type(exc).__name__}: {exc}")
+    for term in terms:
         try:
-            discovered = fetch_discover(client, page_size=page_size, max_pages=max_pages)
-            raw_rows.extend(discovered)
-            route_counts["discover"] = len(discovered)
+            searched = fetch_term(client, term=term, page_size=page_size, max_pages=max_pages)
+            raw_rows.extend(searched)
+            route_counts["search"] += len(searched)
         except Exception as exc:
-            errors.append(f"discover: {type(exc).__name__}: {exc}")
-        for term in terms:
-            try:
-                searched = fetch_term(client, term=term, page_size=page_size, max_pages=max_pages)
-                raw_rows.extend(searched)
-                route_counts["search"] += len(searched)
-            except Exception as exc:
-                errors.append(f"search:{term}: {type(exc).__name__}: {exc}")
+            errors.append(f"search:{term}: {type(exc).__name__}: {exc}")
 
     events_by_id: dict[str, dict[str, Any]] = {}
     for item in raw_rows:
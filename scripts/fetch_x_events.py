@@ -3,13 +3,20 @@ from __future__ import annotations
 import json
 import os
 import re
-from datetime import UTC, datetime, timedelta
+import sys
+from datetime import UTC, datetime
 from pathlib import Path
 from typing import Any
 from zoneinfo import ZoneInfo
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.sessions import session
+
 JST = ZoneInfo("Asia/Tokyo")
 OUTPUT_PATH = Path("data/x_events.json")
 HEALTH_PATH = Path("data/x_discovery_health.json")
@@ -29,7 +36,6 @@ PRODUCT_TERMS = {
     "booth", "販売開始", "発売", "プレゼント企画", "giveaway", "rpキャンペーン",
     "プレゼントキャンペーン",
 }
-WEEKDAY_RE = r"(?:\([月火水木金土日]\)|（[月火水木金土日]）)?"
 
 
 def utc_text(value: datetime) -> str:
@@ -66,32 +72,7 @@ def write_health(
 
 
 def parse_post_datetime(text: str, created_at: datetime) -> datetime | None:
-    normalized = text.replace("：", ":")
-    patterns = [
-        rf"(?P<year>20\d{{2}})[./年-](?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?{WEEKDAY_RE}.*?(?P<hour>[01]?\d|2[0-3])[:時](?P<minute>\d{{2}})?",
-        rf"(?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?{WEEKDAY_RE}.*?(?P<hour>[01]?\d|2[0-3])[:時](?P<minute>\d{{2}})?",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, normalized, flags=re.IGNORECASE | re.DOTALL)
-        if not match:
-            continue
-        groups = match.groupdict()
-        year = int(groups.get("year") or created_at.year)
-        month = int(groups["month"])
-        day = int(groups["day"])
-        hour = int(groups["hour"])
-        minute = int(groups.get("minute") or 0)
-        try:
-            candidate = datetime(year, month, day, hour, minute, tzinfo=JST)
-        except ValueError:
-            return None
-        if not groups.get("year") and candidate < created_at - timedelta(days=45):
-            try:
-                candidate = candidate.replace(year=candidate.year + 1)
-            except ValueError:
-                return None
-        return candidate
-    return None
+    return dates.post_datetime(text, created_at)
 
 
 def classify(text: str) -> str | None:
@@ -204,10 +185,9 @@ def main() -> int:
     }
     headers = {"Authorization": f"Bearer {token}"}
     try:
-        with httpx.Client(timeout=30.0, follow_redirects=True) as client:
-            response = client.get(API_URL, params=params, headers=headers)
-            response.raise_for_status()
-            payload = response.json()
+        response = session(timeout=30.0).get(API_URL, params=params, headers=headers)
+        response.raise_for_status()
+        payload = response.json()
     except (httpx.HTTPError, ValueError) as exc:
         write_health(
             status="degraded",
@@ -3,23 +3,32 @@ from __future__ import annotations
 import json
 import os
 import re
+import sys
 import time
 from collections import Counter
 from datetime import UTC, datetime, timedelta
 from html import unescape
 from html.parser import HTMLParser
 from pathlib import Path
-from typing import Any, Iterable
+from typing import Any, Callable, Iterable
 from urllib.parse import urlencode, urlparse
 from zoneinfo import ZoneInfo
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.sessions import BROWSER_USER_AGENT, session
+from cast_event_cal.timestamps import try_parse_instant
+
 JST = ZoneInfo("Asia/Tokyo")
 OUTPUT_PATH = Path("data/yahoo_realtime_events.json")
 REJECTED_PATH = Path("data/yahoo_realtime_rejected.json")
 HEALTH_PATH = Path("data/yahoo_realtime_health.json")
 X_EVENTS_PATH = Path("data/x_events.json")
+PAGE_HEADERS = {"Accept": "text/html,application/xhtml+xml", "Accept-Language": "ja,en-US;q=0.7,en;q=0.4"}
 DEFAULT_QUERY = (
     '(イベント OR 参加方法 OR 参加条件 OR 開催 OR 主催 OR join OR ジョイン OR リクイン OR reqin '
     'OR リクエストインバイト OR "request invite" OR 本日 OR 営業 OR 応募) (VRChat OR VRC)'
@@ -40,11 +49,17 @@ URL_KEYS = ("url", "tweetUrl", "statusUrl", "permalink")
 ID_KEYS = ("id", "tweetId", "statusId", "id_str", "rest_id")
 AUTHOR_KEYS = ("screenName", "screen_name", "username", "userName", "handle")
 RETWEET_KEYS = ("rtCount", "retweet_count", "retweetCount", "repost_count", "repostCount")
-EVENT_TERMS = {
+STATUS_KEYS = frozenset(URL_KEYS + ID_KEYS)
+JSON_SCRIPT_IDS = {"__next_data__", "__initial_state__"}
+SCRIPT_OPEN_RE = re.compile(r"<script(?=[\s/>])((?:[^>\"']|\"[^\"]*\"|'[^']*')*)>", re.IGNORECASE)
+SCRIPT_CLOSE_RE = re.compile(r"</\s*script\s*>", re.IGNORECASE)
+SCRIPT_ATTR_RE = re.compile(r"([^\s=/>\"']+)(?:\s*=\s*(\"[^\"]*\"|'[^']*'|[^\s>]+))?")
+KEYWORD_EVENT_TERMS = frozenset({
     "イベント", "参加方法", "参加条件", "開催", "join", "ジョイン", "リクイン", "reqin",
     "リクエストインバイト", "request invite", "営業", "公演", "集会", "ライブ", "ツアー",
     "開場", "group instance", "グループインスタンス", "join先",
-}
+})
+EVENT_TERMS = set(KEYWORD_EVENT_TERMS)
 RECRUITMENT_TERMS = {"募集", "応募", "締切", "〆切", "テスター"}
 PRODUCT_TERMS = {
     "booth", "販売", "発売", "配布", "価格", "セール", "商品", "patreon", "記事",
@@ -115,8 +130,11 @@ def walk(value: Any) -> Iterable[Any]:
             yield from walk(child)
 
 
-def direct_string(mapping: dict[str, Any], keys: Iterable[str]) -> str | None:
-    folded = {str(key).casefold(): value for key, value in mapping.items()}
+def folded_mapping(mapping: dict[str, Any]) -> dict[str, Any]:
+    return {str(key).casefold(): value for key, value in mapping.items()}
+
+
+def folded_string(folded: dict[str, Any], keys: Iterable[str]) -> str | None:
     for key in keys:
         value = folded.get(key.casefold())
         if isinstance(value, str) and value.strip():
@@ -124,8 +142,7 @@ def direct_string(mapping: dict[str, Any], keys: Iterable[str]) -> str | None:
     return None
 
 
-def direct_integer(mapping: dict[str, Any], keys: Iterable[str]) -> int | None:
-    folded = {str(key).casefold(): value for key, value in mapping.items()}
+def folded_integer(folded: dict[str, Any], keys: Iterable[str]) -> int | None:
     for key in keys:
         value = folded.get(key.casefold())
         if isinstance(value, bool) or value is None:
@@ -137,6 +154,14 @@ def direct_integer(mapping: dict[str, Any], keys: Iterable[str]) -> int | None:
     return None
 
 
+def direct_string(mapping: dict[str, Any], keys: Iterable[str]) -> str | None:
+    return folded_string(folded_mapping(mapping), keys)
+
+
+def direct_integer(mapping: dict[str, Any], keys: Iterable[str]) -> int | None:
+    return folded_integer(folded_mapping(mapping), keys)
+
+
 def status_id(mapping: dict[str, Any]) -> str | None:
     for key in URL_KEYS:
         value = mapping.get(key)
@@ -183,81 +208,120 @@ def candidate_from_mapping(mapping: dict[str, Any]) -> dict[str, Any] | None:
     }
 
 
+def keyed_candidate(mapping: dict[str, Any]) -> dict[str, Any] | None:
+    post_id = status_id(mapping)
+    if not post_id:
+        return None
+    folded = folded_mapping(mapping)
+    text = folded_string(folded, TEXT_KEYS)
+    if not text:
+        return None
+    return {
+        "status_id": post_id,
+        "url": status_url(mapping, post_id),
+        "text": clean_yahoo_text(text),
+        "author": folded_string(folded, AUTHOR_KEYS),
+        "retweet_count": folded_integer(folded, RETWEET_KEYS),
+    }
+
+
+def json_scripts(html_text: str) -> list[str]:
+    """Slice JSON script bodies out of the page by offset instead of tokenizing all of it."""
+    scripts: list[str] = []
+    position = 0
+    while (opening := SCRIPT_OPEN_RE.search(html_text, position)) is not None:
+        if opening.group(1).rstrip().endswith("/"):
+            position = opening.end()
+            continue
+        closing = SCRIPT_CLOSE_RE.search(html_text, opening.end())
+        if closing is None:
+            break
+        attrs = {}
+        for name, value in SCRIPT_ATTR_RE.findall(opening.group(1)):
+            if value[:1] in {'"', "'"}:
+                value = value[1:-1]
+            attrs[name.lower()] = unescape(value)
+        if "json" in attrs.get("type", "").lower() or attrs.get("id", "").lower() in JSON_SCRIPT_IDS:
+            scripts.append(html_text[opening.end():closing.start()].strip())
+        position = closing.end()
+    return scripts
+
+
+def status_mappings(payload: Any) -> Iterable[dict[str, Any]]:
+    # Pre-order like walk(), but only containers are stacked and only dicts with a status key are yielded.
+    stack = [payload]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, dict):
+            if not STATUS_KEYS.isdisjoint(value):
+                yield value
+            stack.extend(child for child in reversed(value.values()) if isinstance(child, (dict, list)))
+        elif isinstance(value, list):
+            stack.extend(child for child in reversed(value) if isinstance(child, (dict, list)))
+
+
+def select_candidates(candidates: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    selected: dict[str, dict[str, Any]] = {}
+    for candidate in candidates:
+        post_id = str(candidate["status_id"])
+        current = selected.get(post_id)
+        candidate_score = (candidate.get("retweet_count") is not None, len(str(candidate["text"])))
+        current_score = (
+            (current.get("retweet_count") is not None, len(str(current.get("text", ""))))
+            if current else (False, -1)
+        )
+        if current is None or candidate_score > current_score:
+            selected[post_id] = candidate
+    return list(selected.values())
+
+
 def extract_candidates(html_text: str) -> list[dict[str, Any]]:
+    def candidates() -> Iterable[dict[str, Any]]:
+        for raw in json_scripts(html_text):
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            for node in status_mappings(payload):
+                if (candidate := keyed_candidate(node)) is not None:
+                    yield candidate
+
+    return select_candidates(candidates())
+
+
+def extract_candidates_reference(html_text: str) -> list[dict[str, Any]]:
+    """Full HTMLParser + recursive walk extractor, kept as the parity baseline."""
     collector = JsonScriptCollector()
     collector.feed(html_text)
-    selected: dict[str, dict[str, Any]] = {}
-    for raw in collector.scripts:
-        try:
-            payload = json.loads(raw)
-        except json.JSONDecodeError:
-            continue
-        for node in walk(payload):
-            if not isinstance(node, dict) or (candidate := candidate_from_mapping(node)) is None:
+
+    def candidates() -> Iterable[dict[str, Any]]:
+        for raw in collector.scripts:
+            try:
+                payload = json.loads(raw)
+            except json.JSONDecodeError:
                 continue
-            post_id = str(candidate["status_id"])
-            current = selected.get(post_id)
-            candidate_score = (candidate.get("retweet_count") is not None, len(str(candidate["text"])))
-            current_score = (
-                (current.get("retweet_count") is not None, len(str(current.get("text", ""))))
-                if current else (False, -1)
-            )
-            if current is None or candidate_score > current_score:
-                selected[post_id] = candidate
-    return list(selected.values())
+            for node in walk(payload):
+                if isinstance(node, dict) and (candidate := candidate_from_mapping(node)) is not None:
+                    yield candidate
+
+    return select_candidates(candidates())
 
 
 def normalize_text(text: str) -> str:
-    return (
-        text.replace("：", ":").replace("／", "/").replace("．", ".").replace("－", "-")
-        .replace("〜", "~").replace("～", "~")
-    )
+    return dates.normalize(text)
 
 
 def parse_event_datetime(text: str, anchor: datetime) -> datetime | None:
-    normalized = normalize_text(text)
-    clock = r"(?P<hour>[01]?\d|2[0-3])(?:[:時](?P<minute>\d{2})?)"
-    patterns = [
-        rf"(?P<year>20\d{{2}})[./年-](?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?"
-        rf"(?:\s*[（(]?[月火水木金土日][）)]?)?.{{0,40}}?{clock}",
-        rf"(?P<month>\d{{1,2}})[./月-](?P<day>\d{{1,2}})日?"
-        rf"(?:\s*[（(]?[月火水木金土日][）)]?)?.{{0,40}}?{clock}",
-    ]
-    for pattern in patterns:
-        match = re.search(pattern, normalized, flags=re.IGNORECASE | re.DOTALL)
-        if not match:
-            continue
-        values = match.groupdict()
-        try:
-            event_at = datetime(
-                int(values.get("year") or anchor.year), int(values["month"]), int(values["day"]),
-                int(values["hour"]), int(values.get("minute") or 0), tzinfo=JST,
-            )
-        except ValueError:
-            return None
-        if not values.get("year") and event_at < anchor - timedelta(days=2):
-            try:
-                event_at = event_at.replace(year=event_at.year + 1)
-            except ValueError:
-                return None
-        return event_at
-    relative = re.search(
-        rf"(?P<day>本日|今日|明日).{{0,30}}?{clock}", normalized, flags=re.IGNORECASE | re.DOTALL
-    )
-    if not relative:
-        return None
-    day = (anchor + timedelta(days=1 if relative.group("day") == "明日" else 0)).date()
-    return datetime(
-        day.year, day.month, day.day, int(relative.group("hour")),
-        int(relative.group("minute") or 0), tzinfo=JST,
-    )
+    return dates.explicit_datetime(text, anchor)
 
 
-def classify(text: str) -> tuple[str | None, str | None]:
+def classify(
+    text: str, *, vrchat_re: re.Pattern[str] | None = None, event_terms: Iterable[str] | None = None
+) -> tuple[str | None, str | None]:
     folded = text.casefold()
-    if not VRCHAT_RE.search(text):
+    if not (vrchat_re or VRCHAT_RE).search(text):
         return None, "not_vrchat"
-    has_event = any(term in folded for term in EVENT_TERMS)
+    has_event = any(term in folded for term in (EVENT_TERMS if event_terms is None else event_terms))
     has_recruitment = any(term in folded for term in RECRUITMENT_TERMS)
     has_product = any(term in folded for term in PRODUCT_TERMS)
     has_giveaway = any(term in folded for term in GIVEAWAY_TERMS)
@@ -270,14 +334,18 @@ def classify(text: str) -> tuple[str | None, str | None]:
     return ("event", None) if has_event else (None, "missing_event_marker")
 
 
-def title_from_text(text: str, category: str) -> str:
+def title_from_text(
+    text: str, category: str, *, vrchat_re: re.Pattern[str] | None = None, event_terms: Iterable[str] | None = None
+) -> str:
+    vrchat_re = vrchat_re or VRCHAT_RE
+    event_terms = EVENT_TERMS if event_terms is None else event_terms
     lines = [re.sub(r"\s+", " ", line).strip() for line in text.splitlines()]
     lines = [line for line in lines if line and not line.startswith("http")]
     if category == "recruitment_deadline":
         selected = next((line for line in lines if any(term in line for term in RECRUITMENT_TERMS)), None)
     else:
         selected = next(
-            (line for line in lines if VRCHAT_RE.search(line) or any(term in line.casefold() for term in EVENT_TERMS)),
+            (line for line in lines if vrchat_re.search(line) or any(term in line.casefold() for term in event_terms)),
             None,
         )
     selected = selected or (lines[0] if lines else "VRChatイベント")
@@ -296,8 +364,17 @@ def known_x_ids(events: Iterable[dict[str, Any]]) -> set[str]:
 
 
 def candidate_to_event(
-    candidate: dict[str, Any], *, now: datetime, min_retweets: int, x_ids: set[str]
+    candidate: dict[str, Any],
+    *,
+    now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    classifier: Callable[[str], tuple[str | None, str | None]] | None = None,
+    parse_datetime: Callable[[str, datetime], datetime | None] | None = None,
+    vrchat_re: re.Pattern[str] | None = None,
+    event_terms: Iterable[str] | None = None,
 ) -> tuple[dict[str, Any] | None, str | None]:
+    """Shared candidate checks; a classifier version passes its own rules, otherwise the module's are used."""
     post_id = str(candidate.get("status_id") or "")
     text = clean_yahoo_text(str(candidate.get("text") or ""))
     if not STATUS_ID_RE.fullmatch(post_id):
@@ -308,7 +385,7 @@ def candidate_to_event(
         return None, "missing_text"
     if len(text) > 1200 or any(marker in text for marker in ('\\",\\"', '"displayText"', '"rtCount"')):
         return None, "malformed_text"
-    category, reason = classify(text)
+    category, reason = (classifier or classify)(text)
     if reason:
         return None, reason
     retweets = candidate.get("retweet_count")
@@ -320,7 +397,7 @@ def candidate_to_event(
         return None, "retweet_count_invalid"
     if retweets < min_retweets:
         return None, "retweet_below_threshold"
-    event_at = parse_event_datetime(text, now.astimezone(JST))
+    event_at = (parse_datetime or parse_event_datetime)(text, now.astimezone(JST))
     if event_at is None:
         return None, "missing_datetime"
     if event_at < now.astimezone(JST) - timedelta(hours=12):
@@ -330,7 +407,7 @@ def candidate_to_event(
     author = str(candidate.get("author") or "").strip().lstrip("@")
     event = {
         "source_id": f"yahoo:x:{post_id}",
-        "title": title_from_text(text, str(category)),
+        "title": title_from_text(text, str(category), vrchat_re=vrchat_re, event_terms=event_terms),
         "starts_at": utc_text(event_at),
         "organizer": f"@{author}" if author else None,
         "location": "オンライン" if category == "recruitment_deadline" else "VRChat",
@@ -345,13 +422,7 @@ def candidate_to_event(
 
 
 def parse_instant(value: str) -> datetime | None:
-    try:
-        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
-    except ValueError:
-        return None
-    if parsed.tzinfo is None:
-        parsed = parsed.replace(tzinfo=JST)
-    return parsed.astimezone(UTC)
+    return try_parse_instant(value)
 
 
 def clean_cached_event_text(event: dict[str, Any]) -> dict[str, Any]:
@@ -400,25 +471,20 @@ def validate_search_url(url: str) -> None:
 
 
 def fetch_page(url: str) -> tuple[str, int, str]:
-    headers = {
-        "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/124 Safari/537.36",
-        "Accept": "text/html,application/xhtml+xml",
-        "Accept-Language": "ja,en-US;q=0.7,en;q=0.4",
-    }
+    client = session(timeout=30.0, user_agent=BROWSER_USER_AGENT, headers=PAGE_HEADERS)
     errors: list[str] = []
     for attempt in range(3):
         try:
-            with httpx.Client(timeout=30.0, follow_redirects=True, headers=headers) as client:
-                response = client.get(url)
-                response.raise_for_status()
-                final_url = str(response.url)
-                if urlparse(final_url).hostname not in {"search.yahoo.co.jp", "search.yahoo.com"}:
-                    raise RuntimeError(f"unexpected redirect host: {final_url}")
-                if "html" not in response.headers.get("content-type", "").casefold():
-                    raise RuntimeError("unexpected content type")
-                if len(response.text) < 5000:
-                    raise RuntimeError(f"response too small: {len(response.text)} bytes")
-                return response.text, response.status_code, final_url
+            response = client.get(url)
+            response.raise_for_status()
+            final_url = str(response.url)
+            if urlparse(final_url).hostname not in {"search.yahoo.co.jp", "search.yahoo.com"}:
+                raise RuntimeError(f"unexpected redirect host: {final_url}")
+            if "html" not in response.headers.get("content-type", "").casefold():
+                raise RuntimeError("unexpected content type")
+            if len(response.text) < 5000:
+                raise RuntimeError(f"response too small: {len(response.text)} bytes")
+            return response.text, response.status_code, final_url
         except (httpx.HTTPError, RuntimeError) as exc:
             errors.append(str(exc))
             if attempt < 2:
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
+import argparse
 import sys
 from datetime import UTC, datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.profiling import run_profiled
 from scripts import collect_yahoo_corpus as corpus
 from scripts import fetch_yahoo_realtime as implementation
 from scripts import refine_yahoo_corpus as refinement
 from scripts import run_yahoo_realtime as ledger
+from scripts import yahoo_classifier_versions as classifier_versions
+from scripts import yahoo_decision_cache as decision_cache
+from scripts import yahoo_ledger_store as ledger_store
+from scripts import yahoo_parallel as parallel
 
 ARCHIVE_RETENTION_DAYS = 365
 
@@ -46,103 +54,163 @@ def reclassify(
     *,
     actual_now: datetime,
     x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
+    workers: int = 1,
+    install: Callable[[], object] | None = None,
+    version: classifier_versions.ClassifierVersion | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    """Reclassify the ledger; with the installed ``version`` given, cache-missing rows resolve their dates in one batch."""
+    if workers > 1 and len(history) > 1:
+        accepted, rejected, evaluated = parallel.run_chunks(
+            reclassify,
+            history,
+            workers=workers,
+            install=install,
+            cache=cache,
+            actual_now=actual_now,
+            x_ids=x_ids,
+            version=version,
+        )
+        return refinement.sort_outcome(accepted, rejected, evaluated)
+    parse = batch_event_datetime(history, actual_now=actual_now, x_ids=x_ids, cache=cache, version=version) if version else None
     accepted: list[dict[str, Any]] = []
     rejected: list[dict[str, Any]] = []
     evaluated: list[dict[str, Any]] = []
+    for original in history:
+        row, event, rejection = evaluate_row(original, actual_now=actual_now, x_ids=x_ids, cache=cache, parse_event_datetime=parse)
+        if event:
+            accepted.append(event)
+        if rejection:
+            rejected.append(rejection)
+        evaluated.append(row)
+    return refinement.sort_outcome(accepted, rejected, evaluated)
+
 
+def batch_event_datetime(
+    history: list[dict[str, Any]],
+    *,
+    actual_now: datetime,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None,
+    version: classifier_versions.ClassifierVersion,
+) -> Callable[[str, datetime], datetime | None]:
+    """A parser answering from one ``resolve_many`` batch over the rows the decision cache cannot answer."""
+    texts: list[str] = []
+    anchors: list[datetime] = []
     for original in history:
         row = dict(original)
-        status_id = str(row.get("status_id") or "")
-        source_created_at = refinement.twitter_snowflake_created_at(status_id)
-        if source_created_at and source_created_at <= actual_now + timedelta(days=1):
-            row["source_created_at"] = implementation.utc_text(source_created_at)
-        else:
-            source_created_at = None
-        anchor = (
-            source_created_at
-            or implementation.parse_instant(str(row.get("first_seen_at") or ""))
-            or actual_now
-        )
+        anchor = refinement.source_anchor(row, actual_now)
+        candidate, _reason = adjusted_candidate(row)
+        if candidate is None:
+            continue
+        key = decision_cache.fingerprint(candidate, anchor=anchor, min_retweets=None, x_ids=x_ids)
+        if cache is not None and cache.peek(candidate["status_id"], key):
+            continue
+        texts.append(str(candidate.get("text") or ""))
+        anchors.append(anchor)
+    resolved = dict(zip(zip(texts, anchors, strict=True), dates.resolve_many(texts, anchors, weekdays=version.weekdays), strict=True))
 
-        candidate, reason = adjusted_candidate(row)
-        event = None
-        if candidate is not None:
-            text = str(candidate.get("text") or "")
-            if refinement.giveaway_without_event_access(text):
-                reason = "giveaway_only"
-            else:
-                parsed = implementation.parse_event_datetime(text, anchor)
-                if parsed is None:
-                    reason = "missing_datetime"
-                elif parsed > actual_now + timedelta(days=180):
-                    reason = "too_far_future_now"
-                else:
-                    event, reason = corpus.refined_candidate_to_event(
-                        candidate,
-                        now=parsed.astimezone(UTC),
-                        min_retweets=3,
-                        x_ids=x_ids,
-                    )
+    def parse(text: str, anchor: datetime) -> datetime | None:
+        if (text, anchor) not in resolved:
+            return version.parse_event_datetime(text, anchor)
+        resolution = resolved[(text, anchor)]
+        return resolution.event_at if resolution else None
 
-        if event:
-            start = implementation.parse_instant(str(event.get("starts_at") or ""))
-            if start is None:
-                event = None
-                reason = "missing_datetime"
-            else:
-                observed = int(row.get("retweet_count") or 0)
-                event["retweet_count"] = observed
-                event["temporal_status"] = temporal_status(start, actual_now)
-                event["is_archived"] = start < actual_now
-                tags = [
-                    tag
-                    for tag in event.get("tags", [])
-                    if tag != "リポスト3件以上"
-                ]
-                tags.append("終了済み" if start < actual_now else "開催予定")
-                tags.append(f"リポスト{observed}件")
-                event["tags"] = tags
+    return parse
 
-        if event:
-            row["last_decision"] = "accepted"
-            row["last_reason"] = None
-            accepted.append(event)
-        else:
-            resolved = reason or "unknown"
-            row["last_decision"] = "rejected"
-            row["last_reason"] = resolved
-            rejected.append(refinement.rejection_row(row, resolved))
-        evaluated.append(row)
 
-    accepted.sort(key=lambda item: (str(item.get("starts_at")), str(item.get("source_id"))))
-    rejected.sort(
-        key=lambda item: (
-            -int(item.get("retweet_count") or 0),
-            str(item.get("reason")),
-            str(item.get("status_id")),
+def evaluate_row(
+    original: dict[str, Any],
+    *,
+    actual_now: datetime,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
+    candidate_to_event: ledger.CandidateToEvent | None = None,
+    parse_event_datetime: Callable[[str, datetime], datetime | None] | None = None,
+) -> tuple[dict[str, Any], dict[str, Any] | None, dict[str, Any] | None]:
+    """The updated ledger row with its accepted event or rejection row; the callables default to the installed ones."""
+    to_event = candidate_to_event or corpus.refined_candidate_to_event
+    parse = parse_event_datetime or implementation.parse_event_datetime
+
+    def classify(candidate: dict[str, Any], anchor: datetime) -> dict[str, Any]:
+        # Classification uses only the source anchor; the actual_now horizon is applied by the caller.
+        text = str(candidate.get("text") or "")
+        if refinement.giveaway_without_event_access(text):
+            return {"event_at": None, "event": None, "reason": "giveaway_only"}
+        parsed = parse(text, anchor)
+        if parsed is None:
+            return {"event_at": None, "event": None, "reason": "missing_datetime"}
+        event, reason = to_event(
+            candidate,
+            now=parsed.astimezone(UTC),
+            min_retweets=3,
+            x_ids=x_ids,
         )
-    )
-    return accepted, rejected, evaluated
+        return {"event_at": implementation.utc_text(parsed), "event": event, "reason": reason}
+
+    row = dict(original)
+    anchor = refinement.source_anchor(row, actual_now)
+    candidate, reason = adjusted_candidate(row)
+    event = None
+    if candidate is not None:
+        decision = decision_cache.decide(cache, candidate, classify, anchor=anchor, min_retweets=None, x_ids=x_ids)
+        parsed = implementation.parse_instant(decision["event_at"]) if decision["event_at"] else None
+        if parsed is not None and parsed > actual_now + timedelta(days=180):
+            reason = "too_far_future_now"
+        else:
+            event, reason = decision["event"], decision["reason"]
+
+    if event:
+        start = implementation.parse_instant(str(event.get("starts_at") or ""))
+        if start is None:
+            event = None
+            reason = "missing_datetime"
+        else:
+            observed = int(row.get("retweet_count") or 0)
+            event["retweet_count"] = observed
+            event["temporal_status"] = temporal_status(start, actual_now)
+            event["is_archived"] = start < actual_now
+            tags = [
+                tag
+                for tag in event.get("tags", [])
+                if tag != "リポスト3件以上"
+            ]
+            tags.append("終了済み" if start < actual_now else "開催予定")
+            tags.append(f"リポスト{observed}件")
+            event["tags"] = tags
+
+    if event:
+        row["last_decision"] = "accepted"
+        row["last_reason"] = None
+        return row, event, None
+    resolved = reason or "unknown"
+    row["last_decision"] = "rejected"
+    row["last_reason"] = resolved
+    return row, None, refinement.rejection_row(row, resolved)
 
 
-def main() -> int:
-    corpus.configure_classifier()
-    implementation.PARSER_VERSION = "1.9"
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Reclassify the Yahoo candidate ledger with the production classifier")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the per-row pass (default: serial)")
+    args = parser.parse_args(argv)
+    version = classifier_versions.install(classifier_versions.PRODUCTION_VERSION)
     now = datetime.now(UTC).replace(microsecond=0)
-    history_payload = corpus.read_json(ledger.HISTORY_PATH, {})
-    if not isinstance(history_payload, dict):
-        raise ValueError("Yahoo candidate history must be an object")
-    history = history_payload.get("candidates", [])
-    if not isinstance(history, list):
-        raise ValueError("Yahoo candidate history candidates must be an array")
+    store = ledger_store.LedgerStore()
+    history_payload = store.header()
+    history = store.rows()
 
     x_ids = implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH))
+    cache = decision_cache.DecisionCache.for_stage("reclassify_yahoo_archive")
     accepted, rejected, evaluated = reclassify(
-        [row for row in history if isinstance(row, dict)],
+        history,
         actual_now=now,
         x_ids=x_ids,
+        cache=cache,
+        workers=max(1, args.workers),
+        install=partial(classifier_versions.install, classifier_versions.PRODUCTION_VERSION),
+        version=version,
     )
+    cache.save()
 
     history_payload.update(
         {
@@ -153,10 +221,11 @@ def main() -> int:
             "engagement_policy": "retweet_count_required_but_no_minimum",
             "temporal_policy": f"retain_past_events_for_{ARCHIVE_RETENTION_DAYS}_day_candidate_history",
             "giveaway_policy": "require_specific_event_or_vrchat_access_method",
-            "candidates": evaluated,
         }
     )
-    implementation.write_json(ledger.HISTORY_PATH, history_payload)
+    store.write(ledger_store.changed_rows(history, evaluated))
+    store.export(history_payload)
+    store.close()
     implementation.write_json(implementation.OUTPUT_PATH, accepted)
     implementation.write_json(implementation.REJECTED_PATH, rejected)
 
@@ -199,6 +268,7 @@ def main() -> int:
             "engagement_policy": history_payload["engagement_policy"],
             "temporal_policy": history_payload["temporal_policy"],
             "rejection_counts": audit["rejection_reason_counts"],
+            "decision_cache": {**health.get("decision_cache", {}), "reclassify_yahoo_archive": cache.stats()},
         }
     )
     implementation.write_json(implementation.HEALTH_PATH, health)
@@ -211,4 +281,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("reclassify_yahoo_archive", main))
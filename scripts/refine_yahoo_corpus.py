@@ -1,19 +1,26 @@
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 from collections import Counter
 from datetime import UTC, datetime, timedelta
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
+from cast_event_cal.profiling import run_profiled
 from scripts import collect_yahoo_corpus as corpus
 from scripts import fetch_yahoo_realtime as implementation
 from scripts import run_yahoo_realtime as ledger
-from scripts.relative_datetime import build_resolution_audit, install_classifier_datetime
+from scripts import yahoo_classifier_versions as classifier_versions
+from scripts import yahoo_decision_cache as decision_cache
+from scripts import yahoo_ledger_store as ledger_store
+from scripts import yahoo_parallel as parallel
+from scripts.relative_datetime import build_resolution_audit
 
 TWITTER_EPOCH_MS = 1_288_834_974_657
 AUDIT_PATH = Path("public/yahoo-classifier-audit.json")
@@ -42,6 +49,13 @@ VR_EVENT_ACCESS_TERMS = {
     "入場",
     "開場",
 }
+GIVEAWAY_ACCESS_MATCHER = corpus.TermMatcher.build(
+    {
+        "strong_giveaway": STRONG_GIVEAWAY_TERMS,
+        "specific_event": corpus.SPECIFIC_EVENT_TERMS,
+        "vr_event_access": VR_EVENT_ACCESS_TERMS,
+    }
+)
 
 
 def twitter_snowflake_created_at(status_id: str) -> datetime | None:
@@ -75,11 +89,22 @@ def rejection_row(row: dict[str, Any], reason: str) -> dict[str, Any]:
 
 
 def giveaway_without_event_access(text: str) -> bool:
-    return (
-        corpus.has_any(text, STRONG_GIVEAWAY_TERMS)
-        and not corpus.has_any(text, corpus.SPECIFIC_EVENT_TERMS)
-        and not corpus.has_any(text, VR_EVENT_ACCESS_TERMS)
+    matched = GIVEAWAY_ACCESS_MATCHER.matches(text)
+    return "strong_giveaway" in matched and "specific_event" not in matched and "vr_event_access" not in matched
+
+
+def sort_outcome(
+    accepted: list[dict[str, Any]], rejected: list[dict[str, Any]], evaluated: list[dict[str, Any]]
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    accepted.sort(key=lambda item: (str(item.get("starts_at")), str(item.get("source_id"))))
+    rejected.sort(
+        key=lambda item: (
+            -int(item.get("retweet_count") or 0),
+            str(item.get("reason")),
+            str(item.get("status_id")),
+        )
     )
+    return accepted, rejected, evaluated
 
 
 def reevaluate_with_source_time(
@@ -88,70 +113,103 @@ def reevaluate_with_source_time(
     actual_now: datetime,
     min_retweets: int,
     x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
+    workers: int = 1,
+    install: Callable[[], object] | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
+    if workers > 1 and len(history) > 1:
+        accepted, rejected, evaluated = parallel.run_chunks(
+            reevaluate_with_source_time,
+            history,
+            workers=workers,
+            install=install,
+            cache=cache,
+            actual_now=actual_now,
+            min_retweets=min_retweets,
+            x_ids=x_ids,
+        )
+        return sort_outcome(accepted, rejected, evaluated)
     accepted: list[dict[str, Any]] = []
     rejected: list[dict[str, Any]] = []
     evaluated: list[dict[str, Any]] = []
     for original in history:
-        row = dict(original)
-        status_id = str(row.get("status_id") or "")
-        source_created_at = twitter_snowflake_created_at(status_id)
-        if source_created_at and source_created_at <= actual_now + timedelta(days=1):
-            row["source_created_at"] = implementation.utc_text(source_created_at)
-        else:
-            source_created_at = None
-        anchor = (
-            source_created_at
-            or implementation.parse_instant(str(row.get("first_seen_at") or ""))
-            or actual_now
-        )
-        candidate = {
-            "status_id": status_id,
-            "url": row.get("url"),
-            "text": row.get("text"),
-            "author": row.get("author"),
-            "retweet_count": row.get("retweet_count"),
-        }
-        text = str(candidate.get("text") or "")
-        if giveaway_without_event_access(text):
-            event, reason = None, "giveaway_only"
-        else:
-            event, reason = corpus.refined_candidate_to_event(
-                candidate,
-                now=anchor,
-                min_retweets=min_retweets,
-                x_ids=x_ids,
-            )
-        if event:
-            start = implementation.parse_instant(str(event.get("starts_at") or ""))
-            if start is None:
-                reason = "missing_datetime"
-                event = None
-            elif start < actual_now - timedelta(hours=12):
-                reason = "past_event_now"
-                event = None
-            elif start > actual_now + timedelta(days=180):
-                reason = "too_far_future_now"
-                event = None
+        row, event, rejection = evaluate_row(original, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids, cache=cache)
         if event:
-            row["last_decision"] = "accepted"
-            row["last_reason"] = None
             accepted.append(event)
-        else:
-            resolved_reason = reason or "unknown"
-            row["last_decision"] = "rejected"
-            row["last_reason"] = resolved_reason
-            rejected.append(rejection_row(row, resolved_reason))
+        if rejection:
+            rejected.append(rejection)
         evaluated.append(row)
-    accepted.sort(key=lambda item: (str(item.get("starts_at")), str(item.get("source_id"))))
-    rejected.sort(
-        key=lambda item: (
-            -int(item.get("retweet_count") or 0),
-            str(item.get("reason")),
-            str(item.get("status_id")),
-        )
+    return sort_outcome(accepted, rejected, evaluated)
+
+
+def source_anchor(row: dict[str, Any], actual_now: datetime) -> datetime:
+    """Stamp ``row`` with its snowflake creation time and return the anchor relative dates resolve against."""
+    source_created_at = twitter_snowflake_created_at(str(row.get("status_id") or ""))
+    if source_created_at and source_created_at <= actual_now + timedelta(days=1):
+        row["source_created_at"] = implementation.utc_text(source_created_at)
+    else:
+        source_created_at = None
+    return (
+        source_created_at
+        or implementation.parse_instant(str(row.get("first_seen_at") or ""))
+        or actual_now
     )
-    return accepted, rejected, evaluated
+
+
+def evaluate_row(
+    original: dict[str, Any],
+    *,
+    actual_now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
+    candidate_to_event: ledger.CandidateToEvent | None = None,
+) -> tuple[dict[str, Any], dict[str, Any] | None, dict[str, Any] | None]:
+    """The updated ledger row with its accepted event or rejection row; ``candidate_to_event`` defaults to the installed one."""
+    to_event = candidate_to_event or corpus.refined_candidate_to_event
+
+    def classify(candidate: dict[str, Any], anchor: datetime) -> dict[str, Any]:
+        if giveaway_without_event_access(str(candidate.get("text") or "")):
+            return {"event": None, "reason": "giveaway_only"}
+        event, reason = to_event(
+            candidate,
+            now=anchor,
+            min_retweets=min_retweets,
+            x_ids=x_ids,
+        )
+        return {"event": event, "reason": reason}
+
+    row = dict(original)
+    anchor = source_anchor(row, actual_now)
+    candidate = {
+        "status_id": str(row.get("status_id") or ""),
+        "url": row.get("url"),
+        "text": row.get("text"),
+        "author": row.get("author"),
+        "retweet_count": row.get("retweet_count"),
+    }
+    # Only the checks against actual_now below are redone for a cached decision.
+    decision = decision_cache.decide(cache, candidate, classify, anchor=anchor, min_retweets=min_retweets, x_ids=x_ids)
+    event, reason = decision["event"], decision["reason"]
+    if event:
+        start = implementation.parse_instant(str(event.get("starts_at") or ""))
+        if start is None:
+            reason = "missing_datetime"
+            event = None
+        elif start < actual_now - timedelta(hours=12):
+            reason = "past_event_now"
+            event = None
+        elif start > actual_now + timedelta(days=180):
+            reason = "too_far_future_now"
+            event = None
+    if event:
+        row["last_decision"] = "accepted"
+        row["last_reason"] = None
+        return row, event, None
+    resolved_reason = reason or "unknown"
+    row["last_decision"] = "rejected"
+    row["last_reason"] = resolved_reason
+    return row, None, rejection_row(row, resolved_reason)
 
 
 def build_audit(
@@ -179,8 +237,7 @@ def build_audit(
                 }
             )
         if row.get("last_decision") == "accepted" and (
-            corpus.has_any(str(row.get("text") or ""), implementation.PRODUCT_TERMS)
-            or corpus.has_any(str(row.get("text") or ""), implementation.GIVEAWAY_TERMS)
+            not corpus.term_groups(str(row.get("text") or "")).isdisjoint({"product", "giveaway"})
         ):
             suspicious.append(
                 {
@@ -258,26 +315,29 @@ def build_positive_vocabulary(events: list[dict[str, Any]], now: datetime) -> di
     }
 
 
-def main() -> int:
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Re-evaluate the Yahoo candidate ledger with source-time anchors")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes for the per-row pass (default: serial)")
+    args = parser.parse_args(argv)
     previous_events = implementation.read_array(implementation.OUTPUT_PATH)
-    corpus.configure_classifier()
-    install_classifier_datetime(corpus, implementation)
-    implementation.PARSER_VERSION = "1.8"
+    classifier_versions.install("1.8")
     now = datetime.now(UTC).replace(microsecond=0)
-    history_payload = corpus.read_json(ledger.HISTORY_PATH, {})
-    if not isinstance(history_payload, dict):
-        raise ValueError("Yahoo candidate history must be an object")
-    history = history_payload.get("candidates", [])
-    if not isinstance(history, list):
-        raise ValueError("Yahoo candidate history candidates must be an array")
+    store = ledger_store.LedgerStore()
+    history_payload = store.header()
+    history = store.rows()
     min_retweets = int(os.environ.get("YAHOO_MIN_RETWEETS", "3"))
     x_ids = implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH))
+    cache = decision_cache.DecisionCache.for_stage("refine_yahoo_corpus")
     accepted, rejected, evaluated = reevaluate_with_source_time(
-        [row for row in history if isinstance(row, dict)],
+        history,
         actual_now=now,
         min_retweets=min_retweets,
         x_ids=x_ids,
+        cache=cache,
+        workers=max(1, args.workers),
+        install=partial(classifier_versions.install, "1.8"),
     )
+    cache.save()
     history_payload.update(
         {
             "schema_version": "2.3",
@@ -286,10 +346,11 @@ def main() -> int:
             "source_time_policy": "x_snowflake_created_at_then_first_seen_at",
             "date_resolution_policy": "calendar-week-relative-date.v1",
             "giveaway_policy": "require_specific_event_or_vrchat_access_method",
-            "candidates": evaluated,
         }
     )
-    implementation.write_json(ledger.HISTORY_PATH, history_payload)
+    store.write(ledger_store.changed_rows(history, evaluated))
+    store.export(history_payload)
+    store.close()
     implementation.write_json(implementation.OUTPUT_PATH, accepted)
     implementation.write_json(POSITIVE_VOCABULARY_PATH, build_positive_vocabulary(accepted, now))
     implementation.write_json(implementation.REJECTED_PATH, rejected[:2000])
@@ -333,6 +394,7 @@ def main() -> int:
             ],
             "giveaway_policy": history_payload["giveaway_policy"],
             "rejection_counts": audit["rejection_reason_counts"],
+            "decision_cache": {**health.get("decision_cache", {}), "refine_yahoo_corpus": cache.stats()},
         }
     )
     implementation.write_json(implementation.HEALTH_PATH, health)
@@ -346,4 +408,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("refine_yahoo_corpus", main))
@@ -1,134 +1,49 @@
 from __future__ import annotations
 
-import re
+import sys
 from collections import Counter
-from dataclasses import dataclass
-from datetime import datetime, timedelta
+from datetime import datetime
+from pathlib import Path
 from typing import Any, Callable
-from zoneinfo import ZoneInfo
-
-JST = ZoneInfo("Asia/Tokyo")
-WEEKDAY_INDEX = {name: index for index, name in enumerate("月火水木金土日")}
-WEEKDAY_PATTERN = re.compile(
-    r"(?P<prefix>次(?:の)?|来週(?:の)?|今週(?:の)?)?\s*"
-    r"(?P<weekday>[月火水木金土日])曜日?.{0,100}?"
-    r"(?P<hour>[01]?\d|2[0-3])(?:[:時](?P<minute>\d{2})?)",
-    flags=re.IGNORECASE | re.DOTALL,
-)
-RELATIVE_DAY_PATTERN = re.compile(r"本日|今日|明日")
-EXPLICIT_DATE_PATTERN = re.compile(
-    r"(?:20\d{2}[./年-])?\d{1,2}[./月-]\d{1,2}日?"
-)
-
-
-@dataclass(frozen=True)
-class DateResolution:
-    event_at: datetime
-    method: str
-    anchor: datetime
-    matched_text: str
-
-    def evidence(self, utc_text: Callable[[datetime], str]) -> dict[str, str]:
-        return {
-            "method": self.method,
-            "anchor": utc_text(self.anchor),
-            "resolved_at": utc_text(self.event_at),
-            "timezone": "Asia/Tokyo",
-            "week_start": "monday",
-            "matched_text": self.matched_text,
-        }
-
-
-def _jst(value: datetime) -> datetime:
-    if value.tzinfo is None:
-        return value.replace(tzinfo=JST)
-    return value.astimezone(JST)
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.date_resolution import DateResolution
 
 
 def resolve_event_datetime(
     text: str,
     anchor: datetime,
     *,
-    explicit_parser: Callable[[str, datetime], datetime | None],
+    explicit_parser: Callable[[str, datetime], datetime | None] | None = None,
 ) -> DateResolution | None:
     """Resolve explicit and weekday-based event dates without future leakage.
 
     Weekday phrases use a Monday-start calendar week. `今週` never rolls a
     past target into the following week. `来週` resolves inside the next
     calendar week, while `次の` and an unprefixed weekday use next-occurrence
-    semantics.
+    semantics. Without an explicit parser the shared memoized engine resolves
+    explicit dates too.
     """
-    anchor_jst = _jst(anchor)
-    explicit = explicit_parser(text, anchor_jst)
-    if explicit is not None:
-        if RELATIVE_DAY_PATTERN.search(text):
-            method = "relative_day_from_source_timestamp"
-        elif EXPLICIT_DATE_PATTERN.search(text):
-            method = "explicit_calendar_date"
-        else:
-            method = "explicit_datetime"
-        return DateResolution(
-            event_at=_jst(explicit),
-            method=method,
-            anchor=anchor_jst,
-            matched_text="explicit",
-        )
+    return dates.resolve(text, anchor, explicit_parser=explicit_parser)
 
-    normalized = (
-        text.replace("：", ":")
-        .replace("／", "/")
-        .replace("．", ".")
-        .replace("－", "-")
-        .replace("〜", "~")
-        .replace("～", "~")
-    )
-    match = WEEKDAY_PATTERN.search(normalized)
-    if not match:
-        return None
-
-    target_weekday = WEEKDAY_INDEX[match.group("weekday")]
-    prefix = (match.group("prefix") or "").strip()
-    hour = int(match.group("hour"))
-    minute = int(match.group("minute") or 0)
-    week_start = anchor_jst.date() - timedelta(days=anchor_jst.weekday())
-
-    if prefix.startswith("来週"):
-        target_date = week_start + timedelta(days=7 + target_weekday)
-        method = "next_calendar_week_weekday"
-    elif prefix.startswith("今週"):
-        target_date = week_start + timedelta(days=target_weekday)
-        method = "current_calendar_week_weekday"
-    else:
-        days_ahead = (target_weekday - anchor_jst.weekday()) % 7
-        if prefix.startswith("次") and days_ahead == 0:
-            days_ahead = 7
-        target_date = anchor_jst.date() + timedelta(days=days_ahead)
-        method = (
-            "next_occurrence_explicit"
-            if prefix.startswith("次")
-            else "next_occurrence_unprefixed"
-        )
 
-    resolved = datetime(
-        target_date.year,
-        target_date.month,
-        target_date.day,
-        hour,
-        minute,
-        tzinfo=JST,
-    )
-
-    if prefix.startswith("今週") and resolved < anchor_jst:
-        return None
-    if not prefix and resolved < anchor_jst - timedelta(hours=2):
-        resolved += timedelta(days=7)
-
-    return DateResolution(
-        event_at=resolved,
-        method=method,
-        anchor=anchor_jst,
-        matched_text=match.group(0)[:160],
-    )
+def with_resolution_evidence(
+    event: dict[str, Any],
+    reason: str | None,
+    resolution: DateResolution | None,
+    utc_text: Callable[[datetime], str],
+) -> tuple[dict[str, Any] | None, str | None]:
+    """Attach the date-resolution evidence of an accepted event, rejecting it when the date does not resolve."""
+    if resolution is None:
+        return None, "missing_datetime"
+    evidence = resolution.evidence(utc_text)
+    event["date_resolution_method"] = evidence["method"]
+    event["date_resolution_anchor"] = evidence["anchor"]
+    event["date_resolution_evidence"] = evidence
+    return event, reason
 
 
 def install_classifier_datetime(
@@ -136,15 +51,10 @@ def install_classifier_datetime(
     implementation: Any,
 ) -> None:
     """Install the corrected parser after the existing v1.8 classifier setup."""
-    explicit_parser = corpus._ORIGINAL_PARSE_EVENT_DATETIME
     base_candidate_to_event = corpus.refined_candidate_to_event
 
     def parse_datetime(text: str, anchor: datetime) -> datetime | None:
-        resolution = resolve_event_datetime(
-            text,
-            anchor,
-            explicit_parser=explicit_parser,
-        )
+        resolution = resolve_event_datetime(text, anchor)
         return resolution.event_at if resolution else None
 
     def candidate_to_event(
@@ -162,18 +72,7 @@ def install_classifier_datetime(
         )
         if not event:
             return event, reason
-        resolution = resolve_event_datetime(
-            str(candidate.get("text") or ""),
-            now,
-            explicit_parser=explicit_parser,
-        )
-        if resolution is None:
-            return None, "missing_datetime"
-        evidence = resolution.evidence(implementation.utc_text)
-        event["date_resolution_method"] = evidence["method"]
-        event["date_resolution_anchor"] = evidence["anchor"]
-        event["date_resolution_evidence"] = evidence
-        return event, reason
+        return with_resolution_evidence(event, reason, resolve_event_datetime(str(candidate.get("text") or ""), now), implementation.utc_text)
 
     implementation.parse_event_datetime = parse_datetime
     corpus.parse_event_datetime_v18 = parse_datetime
@@ -13,6 +13,8 @@ try:
 except ModuleNotFoundError:
     from render_search_pages import BASE_URL, SAFE_ID, event_title, format_jst, indexable, parse_time
 
+from cast_event_cal.profiling import run_profiled
+
 
 KIND_LABELS = {
     "registration": "応募・登録",
@@ -189,4 +191,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("render_category_pages", main))
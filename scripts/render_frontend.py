@@ -3,11 +3,13 @@ from __future__ import annotations
 import json
 import sys
 from pathlib import Path
+from typing import Any
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from cast_event_cal.ontology import main as enrich_event_ontology
+from cast_event_cal.profiling import run_profiled
 from scripts.build_observed_ontology import main as build_observed_ontology
 
 TEMPLATE = Path("web/index.template.html")
@@ -150,10 +152,7 @@ def patch_frontend(html: str) -> str:
     return html
 
 
-def main() -> int:
-    enrich_event_ontology()
-    build_observed_ontology()
-    payload = json.loads(EVENTS.read_text(encoding="utf-8"))
+def render(payload: dict[str, Any]) -> None:
     generated_at = str(payload.get("generated_at") or "")
     html = TEMPLATE.read_text(encoding="utf-8").replace("{{GENERATED_AT}}", generated_at)
     html = patch_frontend(html)
@@ -173,8 +172,14 @@ def main() -> int:
         raise ValueError(f"frontend template validation failed: {missing}")
     OUTPUT.write_text(html, encoding="utf-8")
     print(f"rendered {OUTPUT}")
+
+
+def main() -> int:
+    enrich_event_ontology()
+    build_observed_ontology()
+    render(json.loads(EVENTS.read_text(encoding="utf-8")))
     return 0
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("render_frontend", main))
@@ -6,12 +6,19 @@ import json
 import os
 import re
 import shutil
-from datetime import UTC, datetime
+import sys
+from datetime import datetime
 from pathlib import Path
 from urllib.parse import urlsplit
 from xml.etree.ElementTree import Element, SubElement, tostring
 from zoneinfo import ZoneInfo
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.profiling import run_profiled
+from cast_event_cal.timestamps import try_parse_instant
+
 BASE_URL = "https://kafka2306.github.io/cast_event_cal"
 JST = ZoneInfo("Asia/Tokyo")
 SAFE_ID = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
@@ -19,13 +26,7 @@ ROOT_PREVIEW_LIMIT = 24
 
 
 def parse_time(value: object) -> datetime | None:
-    if not value:
-        return None
-    try:
-        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
-        return parsed.replace(tzinfo=UTC) if parsed.tzinfo is None else parsed
-    except ValueError:
-        return None
+    return try_parse_instant(value, default_timezone="UTC")
 
 
 def https_url(value: object) -> str:
@@ -405,4 +406,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("render_search_pages", main))
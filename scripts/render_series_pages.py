@@ -14,6 +14,8 @@ try:
 except ModuleNotFoundError:
     from render_search_pages import BASE_URL, SAFE_ID, event_title, format_jst, https_url, indexable, parse_time
 
+from cast_event_cal.profiling import run_profiled
+
 MIN_OBSERVATIONS = 2
 SERIES_LINK_START = "<!-- series-link:start -->"
 SERIES_LINK_END = "<!-- series-link:end -->"
@@ -344,4 +346,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(run_profiled("render_series_pages", main))
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import argparse
 import os
 import sys
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import Any
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from scripts import fetch_yahoo_realtime as implementation
+from scripts import yahoo_snapshots as snapshots
 from scripts.run_yahoo_realtime import (
     HISTORY_RETENTION_DAYS,
     configure,
@@ -20,8 +23,33 @@ from scripts.run_yahoo_realtime import (
 )
 
 
-def main() -> int:
+def replay_snapshots(
+    history: list[dict[str, Any]], entries: list[dict[str, Any]], root: Path = snapshots.SNAPSHOT_ROOT
+) -> list[dict[str, Any]]:
+    """Re-extract archived Yahoo pages with the current parser, oldest fetch first."""
+    last_seen = {str(row["status_id"]): str(row.get("last_seen_at") or "") for row in history}
+    for entry in entries:
+        observed_at = snapshots.parse_time(str(entry["fetched_at"]))
+        if observed_at is None:
+            continue
+        rows = implementation.extract_candidates(snapshots.load_html(entry, root))
+        observed_ids = {str(row.get("status_id") or "").strip() for row in rows}
+        history = merge_history(history, rows, observed_at)
+        for row in history:
+            status_id = str(row["status_id"])
+            if status_id not in observed_ids:
+                continue
+            # An older page must not move a newer observation backwards; only observed rows can move at all.
+            row["last_seen_at"] = last_seen[status_id] = max(str(row["last_seen_at"]), last_seen.get(status_id, ""))
+    return history
+
+
+def main(argv: list[str] | None = None) -> int:
     """Re-evaluate the durable Yahoo ledger without making a network request."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from-snapshots", action="store_true", help="re-extract archived Yahoo HTML before re-evaluating")
+    parser.add_argument("--snapshot-dir", type=Path, default=snapshots.SNAPSHOT_ROOT)
+    args = parser.parse_args(argv)
     configure()
     actual_now = datetime.now(UTC).replace(microsecond=0)
     previous_health = read_object(implementation.HEALTH_PATH)
@@ -33,6 +61,9 @@ def main() -> int:
         implementation.read_array(implementation.REJECTED_PATH),
         previous_observed_at,
     )
+    snapshot_entries = snapshots.entries(args.snapshot_dir) if args.from_snapshots else []
+    if snapshot_entries:
+        history = replay_snapshots(history, snapshot_entries, args.snapshot_dir)
     min_retweets = int(os.environ.get("YAHOO_MIN_RETWEETS", "3"))
     x_ids = implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH))
     accepted, rejected, evaluated = reevaluate_history(
@@ -55,7 +86,8 @@ def main() -> int:
     health.update(
         {
             "parser_version": implementation.PARSER_VERSION,
-            "history_replay_mode": "ledger_only",
+            "history_replay_mode": "snapshots" if args.from_snapshots else "ledger_only",
+            "history_replayed_snapshot_count": len(snapshot_entries),
             "history_retention_days": HISTORY_RETENTION_DAYS,
             "history_candidate_count": len(evaluated),
             "history_accepted_count": len(accepted),
@@ -67,7 +99,7 @@ def main() -> int:
     implementation.write_json(implementation.HEALTH_PATH, health)
     print(
         "Yahoo ledger replay: "
-        f"candidates={len(evaluated)} accepted={len(accepted)} "
+        f"snapshots={len(snapshot_entries)} candidates={len(evaluated)} accepted={len(accepted)} "
         f"rejected={len(rejected)} promoted={len(promoted)} events={len(merged)}"
     )
     return 0
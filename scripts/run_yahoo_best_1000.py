@@ -1,6 +1,8 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import json
 import os
 import sys
 from collections import Counter
@@ -16,10 +18,15 @@ from scripts import collect_yahoo_corpus as corpus
 from scripts import fetch_yahoo_realtime as implementation
 from scripts import refine_yahoo_corpus as refinement
 from scripts import run_yahoo_realtime as ledger
+from scripts import yahoo_ledger_store as ledger_store
+from scripts import yahoo_parallel as parallel
+from scripts import yahoo_snapshots as snapshots
 
 AUDIT_PATH = Path("public/yahoo-best-1000-audit.json")
 RAW_PATH = Path("data/yahoo-best-1000-raw.json")
 EVENTS_PATH = Path("data/yahoo-best-1000-events.json")
+CHECKPOINT_PATH = Path("data/yahoo-best-1000-checkpoint.jsonl")
+CHECKPOINT_MAX_AGE = timedelta(hours=24)
 DEFAULT_TARGET = 1000
 DEFAULT_MAX_QUERIES = 180
 DEFAULT_DELAY_SECONDS = 0.35
@@ -175,8 +182,15 @@ def select_exact_target(
 
 
 def evaluate_candidates(
-    rows: list[dict[str, Any]], *, now: datetime, min_retweets: int, x_ids: set[str]
+    rows: list[dict[str, Any]], *, now: datetime, min_retweets: int, x_ids: set[str], workers: int = 1
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]], Counter[str]]:
+    if workers > 1 and len(rows) > 1:
+        content_events, production_events, evaluated, reasons = parallel.run_chunks(
+            evaluate_candidates, rows, workers=workers, install=corpus.configure_classifier, now=now, min_retweets=min_retweets, x_ids=x_ids
+        )
+        content_events.sort(key=lambda item: (str(item.get("starts_at")), str(item.get("source_id"))))
+        production_events.sort(key=lambda item: (str(item.get("starts_at")), str(item.get("source_id"))))
+        return content_events, production_events, evaluated, reasons
     content_events: list[dict[str, Any]] = []
     production_events: list[dict[str, Any]] = []
     evaluated: list[dict[str, Any]] = []
@@ -236,6 +250,14 @@ def evaluate_candidates(
     return content_events, production_events, evaluated, reasons
 
 
+def query_index(evaluated: list[dict[str, Any]]) -> dict[str, list[int]]:
+    index: dict[str, list[int]] = {}
+    for position, row in enumerate(evaluated):
+        for key in dict.fromkeys(str(key) for key in row.get("query_keys", [])):
+            index.setdefault(key, []).append(position)
+    return index
+
+
 def query_metrics(
     plan: list[dict[str, str]],
     query_results: list[dict[str, Any]],
@@ -243,13 +265,14 @@ def query_metrics(
     existing_ids: set[str],
 ) -> list[dict[str, Any]]:
     result_by_key = {str(row.get("key")): row for row in query_results}
+    index = query_index(evaluated)
     metrics: list[dict[str, Any]] = []
     for query in plan:
         key = query["key"]
         fetched = result_by_key.get(key)
         if fetched is None:
             continue
-        matching = [row for row in evaluated if key in set(row.get("query_keys", []))]
+        matching = [evaluated[position] for position in index.get(key, [])]
         accepted = [row for row in matching if row.get("decision") == "accepted"]
         metrics.append(
             {
@@ -267,29 +290,96 @@ def query_metrics(
     return metrics
 
 
-def update_production_ledger(
-    selected: list[dict[str, Any]], *, before: list[dict[str, Any]], now: datetime
-) -> None:
-    history_payload = corpus.read_json(ledger.HISTORY_PATH, {})
-    if not isinstance(history_payload, dict):
-        history_payload = {}
-    merged = ledger.merge_history(before, selected, now)
-    merged = corpus.merge_provenance(merged, before, selected, now)
-    history_payload.update(
-        {
-            "schema_version": "2.3",
-            "generated_at": implementation.utc_text(now),
-            "candidate_count": len(merged),
-            "target_count": int(history_payload.get("target_count") or 1000),
-            "target_reached": len(merged) >= int(history_payload.get("target_count") or 1000),
-            "retention_days": int(history_payload.get("retention_days") or 365),
-            "maximum_candidates": int(history_payload.get("maximum_candidates") or 5000),
-            "source_time_policy": "x_snowflake_created_at_then_first_seen_at",
-            "giveaway_policy": "require_specific_event_or_vrchat_access_method",
-            "candidates": merged,
-        }
-    )
-    implementation.write_json(ledger.HISTORY_PATH, history_payload)
+def plan_fingerprint(plan: list[dict[str, str]], target: int) -> str:
+    parts = [str(target), *(f"{query['key']}\x1e{query['query']}" for query in plan)]
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+class Checkpoint:
+    """Append-only JSONL record of the shards a best-1000 run has already fetched.
+
+    The first line names the plan and the run's start time; each later line holds
+    one successful shard result with its rows. A run that finds a fresh checkpoint
+    for the same plan replays those shards instead of querying Yahoo again.
+    """
+
+    def __init__(self, path: Path, fingerprint: str, now: datetime, *, resume: bool = True, max_age: timedelta = CHECKPOINT_MAX_AGE) -> None:
+        self.path = path
+        self.started_at = now
+        self.completed: dict[str, tuple[dict[str, Any], list[dict[str, Any]]]] = {}
+        lines = self.read(fingerprint, now, max_age) if resume else []
+        if lines:
+            self.started_at = implementation.parse_instant(lines[0]["started_at"]) or now
+            for line in lines[1:]:
+                self.completed[str(line["result"]["key"])] = (line["result"], line["rows"])
+        else:
+            lines = [{"fingerprint": fingerprint, "started_at": implementation.utc_text(now)}]
+        # Rewriting drops a line cut short by the interruption before new shards are appended.
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("".join(encode_line(line) for line in lines), encoding="utf-8")
+
+    def read(self, fingerprint: str, now: datetime, max_age: timedelta) -> list[dict[str, Any]]:
+        try:
+            text = self.path.read_text(encoding="utf-8")
+        except OSError:
+            return []
+        lines: list[dict[str, Any]] = []
+        for raw in text.splitlines():
+            try:
+                line = json.loads(raw)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(line, dict):
+                continue
+            if not lines:
+                started = implementation.parse_instant(str(line.get("started_at") or ""))
+                if line.get("fingerprint") != fingerprint or started is None or now - started > max_age:
+                    return []
+            elif not isinstance(line.get("result"), dict) or not isinstance(line.get("rows"), list) or "key" not in line["result"]:
+                continue
+            lines.append(line)
+        return lines
+
+    def record(self, result: dict[str, Any], rows: list[dict[str, Any]]) -> None:
+        if result.get("status") != "ok":
+            return
+        with self.path.open("a", encoding="utf-8") as handle:
+            handle.write(encode_line({"result": result, "rows": rows}))
+            handle.flush()
+            os.fsync(handle.fileno())
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
+def encode_line(value: dict[str, Any]) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def replay_time(query_results: list[dict[str, Any]], fallback: datetime) -> datetime:
+    # Offline runs classify as of the newest archived fetch so relative dates resolve as they did online.
+    stamps = [snapshots.parse_time(str(row.get("snapshot_fetched_at") or "")) for row in query_results]
+    return max((stamp for stamp in stamps if stamp), default=fallback)
+
+
+def update_production_ledger(selected: list[dict[str, Any]], *, now: datetime) -> None:
+    with ledger_store.LedgerStore() as store:
+        history_payload = store.header()
+        merged = corpus.observe_in_store(store, selected, now)
+        history_payload.update(
+            {
+                "schema_version": "2.3",
+                "generated_at": implementation.utc_text(now),
+                "candidate_count": len(merged),
+                "target_count": int(history_payload.get("target_count") or 1000),
+                "target_reached": len(merged) >= int(history_payload.get("target_count") or 1000),
+                "retention_days": int(history_payload.get("retention_days") or 365),
+                "maximum_candidates": int(history_payload.get("maximum_candidates") or 5000),
+                "source_time_policy": "x_snowflake_created_at_then_first_seen_at",
+                "giveaway_policy": "require_specific_event_or_vrchat_access_method",
+            }
+        )
+        store.export(history_payload, recent=True)
     refinement.main()
 
 
@@ -298,8 +388,13 @@ def main(argv: list[str] | None = None) -> int:
     parser.add_argument("--target", type=int, default=DEFAULT_TARGET)
     parser.add_argument("--max-queries", type=int, default=DEFAULT_MAX_QUERIES)
     parser.add_argument("--delay-seconds", type=float, default=DEFAULT_DELAY_SECONDS)
+    parser.add_argument("--workers", type=int, default=corpus.DEFAULT_FETCH_WORKERS)
+    parser.add_argument("--classify-workers", type=int, default=1, help="worker processes for candidate evaluation (default: serial)")
     parser.add_argument("--require-target", action="store_true")
     parser.add_argument("--no-update-production", action="store_true")
+    parser.add_argument("--no-snapshots", action="store_true", help="do not archive fetched Yahoo HTML")
+    parser.add_argument("--from-snapshots", action="store_true", help="re-extract the latest stored Yahoo HTML offline")
+    parser.add_argument("--no-resume", action="store_true", help="ignore an interrupted run's checkpoint and query every shard again")
     args = parser.parse_args(argv)
 
     if args.target <= 0:
@@ -310,16 +405,31 @@ def main(argv: list[str] | None = None) -> int:
     if not isinstance(config, dict):
         raise ValueError("Yahoo query config must be an object")
     plan = build_best_query_plan(config)[: max(1, args.max_queries)]
+    checkpoint = None
+    if not args.from_snapshots:
+        checkpoint = Checkpoint(CHECKPOINT_PATH, plan_fingerprint(plan, args.target), now, resume=not args.no_resume)
+        # A resumed run keeps its original clock so replayed and fresh shards classify alike.
+        now = checkpoint.started_at
     observed, query_results, raw_total = corpus.fetch_candidates(
         plan,
         set(),
         args.target,
         True,
         max(0.0, args.delay_seconds),
+        max(1, args.workers),
+        snapshot_root=None if args.no_snapshots and not args.from_snapshots else snapshots.SNAPSHOT_ROOT,
+        offline=args.from_snapshots,
+        completed=checkpoint.completed if checkpoint else None,
+        on_result=checkpoint.record if checkpoint else None,
     )
+    if args.from_snapshots:
+        now = replay_time(query_results, now)
+    elif not args.no_snapshots:
+        snapshots.prune(now=now)
     successful = sum(row.get("status") == "ok" for row in query_results)
     target_reached = len(observed) >= args.target
     if args.require_target and not target_reached:
+        # The checkpoint survives so a rerun retries only the shards that failed.
         raise RuntimeError(
             f"best-1000 target not reached: {len(observed)}/{args.target}; "
             f"queries={len(query_results)} successful={successful}"
@@ -335,6 +445,7 @@ def main(argv: list[str] | None = None) -> int:
         now=now,
         min_retweets=min_retweets,
         x_ids=x_ids,
+        workers=max(1, args.classify_workers),
     )
     metrics = query_metrics(plan, query_results, evaluated, existing_ids)
 
@@ -343,6 +454,7 @@ def main(argv: list[str] | None = None) -> int:
         "generated_at": implementation.utc_text(now),
         "classifier_version": implementation.PARSER_VERSION,
         "strategy_version": "ablation-informed-1.0",
+        "fetch_mode": "snapshots" if args.from_snapshots else "network",
         "status": "ok" if target_reached else "partial",
         "target_count": args.target,
         "target_reached": target_reached,
@@ -351,6 +463,7 @@ def main(argv: list[str] | None = None) -> int:
         "duplicate_observations_removed": max(0, raw_total - len(observed)),
         "queries_planned": len(plan),
         "queries_attempted": len(query_results),
+        "queries_resumed": sum(str(row.get("key")) in checkpoint.completed for row in query_results) if checkpoint else 0,
         "queries_succeeded": successful,
         "queries_failed": len(query_results) - successful,
         "content_accepted_count": len(content_events),
@@ -403,7 +516,9 @@ def main(argv: list[str] | None = None) -> int:
     )
 
     if not args.no_update_production:
-        update_production_ledger(selected, before=before, now=now)
+        update_production_ledger(selected, now=now)
+    if checkpoint:
+        checkpoint.clear()
 
     print(
         "Yahoo best-1000: "
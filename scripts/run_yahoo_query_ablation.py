@@ -4,7 +4,7 @@ import argparse
 import sys
 import time
 from collections import Counter
-from datetime import UTC, datetime
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 from typing import Any
 from urllib.parse import urlencode
@@ -16,6 +16,9 @@ from scripts import collect_yahoo_corpus as corpus
 from scripts import fetch_yahoo_realtime as yahoo
 from scripts import refine_yahoo_corpus as refinement
 from scripts import run_yahoo_realtime as ledger
+from scripts import yahoo_decision_cache as decision_cache
+from scripts import yahoo_snapshots as snapshots
+from scripts.yahoo_bitsets import union_of_others
 
 CONFIG_PATH = Path("config/yahoo_query_ablation.json")
 PUBLIC_PATH = Path("public/yahoo-query-ablation.json")
@@ -31,8 +34,35 @@ def ratio(numerator: int, denominator: int) -> float:
     return round(numerator / denominator, 6) if denominator else 0.0
 
 
-def jaccard(left: set[str], right: set[str]) -> float:
-    return ratio(len(left & right), len(left | right))
+def status_index(results: list[dict[str, Any]]) -> dict[str, int]:
+    """One bit position per status id seen by any variant."""
+    ids = {str(value) for row in results for value in row.get("candidate_status_ids", [])}
+    return {status_id: bit for bit, status_id in enumerate(sorted(ids))}
+
+
+def bitset(values: list[str], index: dict[str, int]) -> int:
+    mask = 0
+    for value in values:
+        mask |= 1 << index[str(value)]
+    return mask
+
+
+def bit_jaccard(left: int, right: int) -> float:
+    return ratio((left & right).bit_count(), (left | right).bit_count())
+
+
+def overlap_matrices(keys: list[str], candidates: list[int], accepted: list[int]) -> dict[str, Any]:
+    """Pairwise overlap over variant bitsets; coverage[i][j] is the share of j's accepted ids that i also found."""
+    return {
+        "keys": keys,
+        "candidate_overlap_count": [[(left & right).bit_count() for right in candidates] for left in candidates],
+        "candidate_jaccard": [[bit_jaccard(left, right) for right in candidates] for left in candidates],
+        "accepted_overlap_count": [[(left & right).bit_count() for right in accepted] for left in accepted],
+        "accepted_jaccard": [[bit_jaccard(left, right) for right in accepted] for left in accepted],
+        "accepted_coverage": [
+            [ratio((left & right).bit_count(), right.bit_count()) for right in accepted] for left in accepted
+        ],
+    }
 
 
 def build_query_plan(config: dict[str, Any]) -> list[dict[str, str]]:
@@ -75,7 +105,11 @@ def build_query_plan(config: dict[str, Any]) -> list[dict[str, str]]:
 
 
 def evaluate(
-    candidates: list[dict[str, Any]], now: datetime, minimum_retweets: int, x_ids: set[str]
+    candidates: list[dict[str, Any]],
+    now: datetime,
+    minimum_retweets: int,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
 ) -> tuple[set[str], Counter[str]]:
     observed_at = yahoo.utc_text(now)
     rows = [
@@ -89,7 +123,7 @@ def evaluate(
         for row in candidates
     ]
     accepted, _rejected, evaluated = refinement.reevaluate_with_source_time(
-        rows, actual_now=now, min_retweets=minimum_retweets, x_ids=x_ids
+        rows, actual_now=now, min_retweets=minimum_retweets, x_ids=x_ids, cache=cache
     )
     accepted_ids = {str(row.get("source_id", "")).split(":")[-1] for row in accepted}
     reasons = Counter(
@@ -108,16 +142,29 @@ def fetch_variant(
     result_limit: int,
     ledger_ids: set[str],
     x_ids: set[str],
+    snapshot_root: Path | None = None,
+    stored: dict[str, dict[str, Any]] | None = None,
+    offline: bool = False,
+    cache: decision_cache.DecisionCache | None = None,
 ) -> dict[str, Any]:
     started = time.monotonic()
     yahoo.validate_search_url(variant["url"])
-    html, status, final_url = yahoo.fetch_page(variant["url"])
+    entry = stored.get(variant["key"]) if stored is not None else None
+    if entry is not None:
+        html = snapshots.load_html(entry, snapshot_root or snapshots.SNAPSHOT_ROOT)
+        status, final_url = int(entry.get("http_status") or 200), str(entry.get("final_url") or variant["url"])
+    elif offline:
+        raise RuntimeError("no stored Yahoo snapshot")
+    else:
+        html, status, final_url = yahoo.fetch_page(variant["url"])
+        if snapshot_root is not None:
+            snapshots.store(variant["key"], html, url=variant["url"], http_status=status, final_url=final_url, root=snapshot_root)
     candidates = list({str(row["status_id"]): row for row in yahoo.extract_candidates(html)}.values())
     if not candidates:
         raise RuntimeError("no direct Yahoo post objects")
     candidate_ids = {str(row["status_id"]) for row in candidates}
-    content_ids, reasons = evaluate(candidates, now, minimum_retweets, set())
-    production_ids, _ = evaluate(candidates, now, minimum_retweets, x_ids)
+    content_ids, reasons = evaluate(candidates, now, minimum_retweets, set(), cache)
+    production_ids, _ = evaluate(candidates, now, minimum_retweets, x_ids, cache)
     new_ids = candidate_ids - ledger_ids
     return {
         **{name: variant[name] for name in ("key", "label", "kind", "query")},
@@ -125,6 +172,7 @@ def fetch_variant(
         "http_status": status,
         "final_url": final_url,
         "duration_ms": int((time.monotonic() - started) * 1000),
+        "snapshot_reused": entry is not None,
         "candidate_count": len(candidate_ids),
         "result_limit": result_limit,
         "result_limit_reached": len(candidate_ids) >= result_limit,
@@ -148,22 +196,23 @@ def enrich(results: list[dict[str, Any]], full_key: str) -> dict[str, Any]:
     full = successful.get(full_key)
     if full is None:
         return {"full_variant_available": False, "block_effects": {}}
-    full_candidates = set(full["candidate_status_ids"])
-    full_accepted = set(full["content_accepted_status_ids"])
-    accepted_by_key = {
-        key: set(row["content_accepted_status_ids"]) for key, row in successful.items()
-    }
-    for key, row in successful.items():
-        candidates, accepted = set(row["candidate_status_ids"]), accepted_by_key[key]
-        others = set().union(*(values for other, values in accepted_by_key.items() if other != key))
+    index = status_index(list(successful.values()))
+    keys = list(successful)
+    candidates = [bitset(row["candidate_status_ids"], index) for row in successful.values()]
+    accepted = [bitset(row["content_accepted_status_ids"], index) for row in successful.values()]
+    masks = {key: (candidate, kept) for key, candidate, kept in zip(keys, candidates, accepted, strict=True)}
+    full_candidates, full_accepted = masks[full_key]
+    for (key, row), others in zip(successful.items(), union_of_others(accepted), strict=True):
+        candidate, kept = masks[key]
+        exclusive = kept & ~others
         row.update(
             {
-                "candidate_overlap_with_full_count": len(candidates & full_candidates),
-                "candidate_jaccard_with_full": jaccard(candidates, full_candidates),
-                "accepted_overlap_with_full_count": len(accepted & full_accepted),
-                "accepted_jaccard_with_full": jaccard(accepted, full_accepted),
-                "incremental_accepted_vs_full_count": len(accepted - full_accepted),
-                "exclusive_accepted_count": len(accepted - others),
+                "candidate_overlap_with_full_count": (candidate & full_candidates).bit_count(),
+                "candidate_jaccard_with_full": bit_jaccard(candidate, full_candidates),
+                "accepted_overlap_with_full_count": (kept & full_accepted).bit_count(),
+                "accepted_jaccard_with_full": bit_jaccard(kept, full_accepted),
+                "incremental_accepted_vs_full_count": (kept & ~full_accepted).bit_count(),
+                "exclusive_accepted_count": exclusive.bit_count(),
             }
         )
     effects = {}
@@ -175,7 +224,7 @@ def enrich(results: list[dict[str, Any]], full_key: str) -> dict[str, Any]:
         ablated = successful.get(ablated_key)
         if not ablated:
             continue
-        ablated_ids = set(ablated["content_accepted_status_ids"])
+        ablated_ids = masks[ablated_key][1]
         effects[block] = {
             "full_key": full_key,
             "ablated_key": ablated_key,
@@ -186,13 +235,31 @@ def enrich(results: list[dict[str, Any]], full_key: str) -> dict[str, Any]:
             ),
             "accepted_yield_delta_full_minus_ablated": int(full["content_accepted_count"])
             - int(ablated["content_accepted_count"]),
-            "accepted_lost_when_removed_count": len(full_accepted - ablated_ids),
-            "accepted_gained_when_removed_count": len(ablated_ids - full_accepted),
+            "accepted_lost_when_removed_count": (full_accepted & ~ablated_ids).bit_count(),
+            "accepted_gained_when_removed_count": (ablated_ids & ~full_accepted).bit_count(),
         }
-    return {"full_variant_available": True, "block_effects": effects}
+    return {
+        "full_variant_available": True,
+        "block_effects": effects,
+        "pairwise_overlap": overlap_matrices(keys, candidates, accepted),
+    }
 
 
-def run(config_path: Path = CONFIG_PATH) -> dict[str, Any]:
+def reusable_snapshots(root: Path, now: datetime, ttl_hours: float) -> dict[str, dict[str, Any]]:
+    lower = now - timedelta(hours=ttl_hours)
+    return {
+        key: entry for key, entry in snapshots.latest(root, as_of=now).items()
+        if (fetched_at := snapshots.parse_time(str(entry["fetched_at"]))) is not None and fetched_at >= lower
+    }
+
+
+def run(
+    config_path: Path = CONFIG_PATH,
+    *,
+    snapshot_root: Path | None = None,
+    offline: bool = False,
+    snapshot_ttl_hours: float | None = None,
+) -> dict[str, Any]:
     config = corpus.read_json(config_path, {})
     if not isinstance(config, dict):
         raise ValueError("Ablation config must be an object")
@@ -203,10 +270,21 @@ def run(config_path: Path = CONFIG_PATH) -> dict[str, Any]:
     result_limit = int(config.get("result_limit") or 40)
     delay = max(0.0, float(config.get("request_delay_seconds") or 0.0))
     plan = build_query_plan(config)
+    ttl_hours = float(config.get("snapshot_ttl_hours") or 0) if snapshot_ttl_hours is None else snapshot_ttl_hours
+    stored = snapshots.latest(snapshot_root or snapshots.SNAPSHOT_ROOT) if offline else None
+    if stored is None and snapshot_root is not None and ttl_hours > 0:
+        # Pages fetched within the TTL are re-extracted instead of requested again.
+        stored = reusable_snapshots(snapshot_root, now, ttl_hours)
+    elif stored:
+        # Replays classify as of the newest archived fetch so relative dates resolve as they did online.
+        stamps = [snapshots.parse_time(str(stored[row["key"]]["fetched_at"])) for row in plan if row["key"] in stored]
+        now = max((stamp for stamp in stamps if stamp), default=now)
     history = corpus.read_json(ledger.HISTORY_PATH, {})
     old_rows = history.get("candidates", []) if isinstance(history, dict) else []
     ledger_ids = {str(row.get("status_id")) for row in old_rows if isinstance(row, dict)}
     x_ids = yahoo.known_x_ids(yahoo.read_array(yahoo.X_EVENTS_PATH))
+    # Variants overlap heavily, so each status id is classified once per run.
+    cache = decision_cache.DecisionCache()
     results = []
     for index, variant in enumerate(plan):
         try:
@@ -217,6 +295,10 @@ def run(config_path: Path = CONFIG_PATH) -> dict[str, Any]:
                 result_limit=result_limit,
                 ledger_ids=ledger_ids,
                 x_ids=x_ids,
+                snapshot_root=snapshot_root,
+                stored=stored,
+                offline=offline,
+                cache=cache,
             )
         except (RuntimeError, ValueError) as exc:
             result = {
@@ -233,7 +315,7 @@ def run(config_path: Path = CONFIG_PATH) -> dict[str, Any]:
             f"content={result.get('content_accepted_count', 0)} "
             f"production={result.get('production_accepted_count', 0)}"
         )
-        if delay and index + 1 < len(plan):
+        if delay and not offline and not result.get("snapshot_reused") and index + 1 < len(plan):
             time.sleep(delay)
     comparison = enrich(results, str(config["full_variant_key"]))
     successful = sum(row.get("status") == "ok" for row in results)
@@ -241,10 +323,13 @@ def run(config_path: Path = CONFIG_PATH) -> dict[str, Any]:
         "schema_version": "1.0",
         "generated_at": yahoo.utc_text(now),
         "classifier_version": yahoo.PARSER_VERSION,
+        "fetch_mode": "snapshots" if offline else "network",
         "status": "ok" if successful == len(results) else ("degraded" if successful else "failed"),
         "variant_count": len(results),
         "successful_variant_count": successful,
         "failed_variant_count": len(results) - successful,
+        "snapshot_ttl_hours": 0 if offline else ttl_hours,
+        "reused_snapshot_count": sum(bool(row.get("snapshot_reused")) for row in results),
         "existing_ledger_candidate_count": len(ledger_ids),
         "existing_x_source_count": len(x_ids),
         "full_variant_key": config["full_variant_key"],
@@ -290,8 +375,19 @@ def main(argv: list[str] | None = None) -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--config", type=Path, default=CONFIG_PATH)
     parser.add_argument("--require-complete", action="store_true")
+    parser.add_argument("--no-snapshots", action="store_true", help="do not archive fetched Yahoo HTML")
+    parser.add_argument("--from-snapshots", action="store_true", help="re-extract the latest stored Yahoo HTML offline")
+    parser.add_argument("--snapshot-ttl-hours", type=float, help="reuse stored Yahoo HTML fetched within this many hours (default: config)")
     args = parser.parse_args(argv)
-    payload = run(args.config)
+    archive = not args.no_snapshots or args.from_snapshots
+    payload = run(
+        args.config,
+        snapshot_root=snapshots.SNAPSHOT_ROOT if archive else None,
+        offline=args.from_snapshots,
+        snapshot_ttl_hours=args.snapshot_ttl_hours,
+    )
+    if archive and not args.from_snapshots:
+        snapshots.prune()
     print(
         f"Yahoo query ablation: {payload['status']} "
         f"{payload['successful_variant_count']}/{payload['variant_count']}"
@@ -6,24 +6,28 @@ import re
 import sys
 from datetime import UTC, datetime, timedelta
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable
 
 if __package__ in {None, ""}:
     sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from scripts import fetch_yahoo_realtime as implementation
+from scripts import yahoo_decision_cache as decision_cache
 
 HISTORY_PATH = Path("public/yahoo-candidate-history.json")
 HISTORY_RETENTION_DAYS = 30
 AUTHOR_FROM_URL_RE = re.compile(
     r"https?://(?:www\.)?(?:x|twitter)\.com/([^/]+)/status/\d+", re.IGNORECASE
 )
+# Python treats Japanese characters as word characters. A normal ``VRC\b``
+# therefore misses VRCイベント / VRC初心者. Reject only Latin continuations.
+VRCHAT_RE = re.compile(r"(?:#?vrchat|#?vrc)(?![a-z])", re.IGNORECASE)
+
+CandidateToEvent = Callable[..., tuple[dict[str, Any] | None, str | None]]
 
 
 def configure() -> None:
-    # Python treats Japanese characters as word characters. A normal ``VRC\b``
-    # therefore misses VRCイベント / VRC初心者. Reject only Latin continuations.
-    implementation.VRCHAT_RE = re.compile(r"(?:#?vrchat|#?vrc)(?![a-z])", re.IGNORECASE)
+    implementation.VRCHAT_RE = VRCHAT_RE
     implementation.PARSER_VERSION = "1.4"
 
 
@@ -79,6 +83,23 @@ def observed_candidate(row: dict[str, Any], observed_at: datetime) -> dict[str,
     }
 
 
+def merge_observation(
+    current: dict[str, Any] | None, row: dict[str, Any], observed_at: datetime
+) -> dict[str, Any] | None:
+    """Fold one fresh observation into the normalized ledger row for the same status id."""
+    normalized = observed_candidate(row, observed_at)
+    if not normalized:
+        return None
+    if current:
+        normalized["first_seen_at"] = current["first_seen_at"]
+        old_retweets = current.get("retweet_count")
+        new_retweets = normalized.get("retweet_count")
+        if old_retweets is not None and (new_retweets is None or int(old_retweets) > int(new_retweets)):
+            normalized["retweet_count"] = int(old_retweets)
+    normalized["last_seen_at"] = implementation.utc_text(observed_at)
+    return normalized
+
+
 def merge_history(
     existing: list[dict[str, Any]], observed: list[dict[str, Any]], observed_at: datetime
 ) -> list[dict[str, Any]]:
@@ -87,20 +108,10 @@ def merge_history(
         normalized = observed_candidate(row, observed_at)
         if normalized:
             selected[normalized["status_id"]] = normalized
-    stamp = implementation.utc_text(observed_at)
     for row in observed:
-        normalized = observed_candidate(row, observed_at)
-        if not normalized:
-            continue
-        current = selected.get(normalized["status_id"])
-        if current:
-            normalized["first_seen_at"] = current["first_seen_at"]
-            old_retweets = current.get("retweet_count")
-            new_retweets = normalized.get("retweet_count")
-            if old_retweets is not None and (new_retweets is None or int(old_retweets) > int(new_retweets)):
-                normalized["retweet_count"] = int(old_retweets)
-        normalized["last_seen_at"] = stamp
-        selected[normalized["status_id"]] = normalized
+        normalized = merge_observation(selected.get(str(row.get("status_id") or "").strip()), row, observed_at)
+        if normalized:
+            selected[normalized["status_id"]] = normalized
     lower = observed_at - timedelta(days=HISTORY_RETENTION_DAYS)
     kept: list[dict[str, Any]] = []
     for row in selected.values():
@@ -110,46 +121,70 @@ def merge_history(
     return sorted(kept, key=lambda item: (str(item.get("first_seen_at")), str(item["status_id"])))
 
 
+def evaluate_row(
+    row: dict[str, Any],
+    *,
+    actual_now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
+    candidate_to_event: CandidateToEvent | None = None,
+) -> tuple[dict[str, Any], dict[str, Any] | None, dict[str, Any] | None]:
+    """The updated ledger row with its accepted event or rejection row; ``candidate_to_event`` defaults to the installed one."""
+    to_event = candidate_to_event or implementation.candidate_to_event
+
+    def classify(candidate: dict[str, Any], anchor: datetime) -> dict[str, Any]:
+        event, reason = to_event(candidate, now=anchor, min_retweets=min_retweets, x_ids=x_ids)
+        return {"event": event, "reason": reason}
+
+    # Relative expressions such as "本日" must use first observation time,
+    # not the day on which a future parser version reprocesses the candidate.
+    anchor = implementation.parse_instant(str(row.get("first_seen_at") or "")) or actual_now
+    candidate = {
+        "status_id": row["status_id"],
+        "url": row.get("url"),
+        "text": row.get("text"),
+        "author": row.get("author"),
+        "retweet_count": row.get("retweet_count"),
+    }
+    decision = decision_cache.decide(cache, candidate, classify, anchor=anchor, min_retweets=min_retweets, x_ids=x_ids)
+    event, reason = decision["event"], decision["reason"]
+    updated = dict(row)
+    if event:
+        updated["last_decision"] = "accepted"
+        updated["last_reason"] = None
+        return updated, event, None
+    rejection = reason or "unknown"
+    updated["last_decision"] = "rejected"
+    updated["last_reason"] = rejection
+    return updated, None, {
+        "status_id": row["status_id"],
+        "url": row.get("url"),
+        "reason": rejection,
+        "retweet_count": row.get("retweet_count"),
+        "first_seen_at": row.get("first_seen_at"),
+        "last_seen_at": row.get("last_seen_at"),
+        "text_excerpt": str(row.get("text") or "")[:360],
+    }
+
+
 def reevaluate_history(
-    history: list[dict[str, Any]], *, actual_now: datetime, min_retweets: int, x_ids: set[str]
+    history: list[dict[str, Any]],
+    *,
+    actual_now: datetime,
+    min_retweets: int,
+    x_ids: set[str],
+    cache: decision_cache.DecisionCache | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]], list[dict[str, Any]]]:
     accepted: list[dict[str, Any]] = []
     rejected: list[dict[str, Any]] = []
     evaluated: list[dict[str, Any]] = []
     for row in history:
-        # Relative expressions such as "本日" must use first observation time,
-        # not the day on which a future parser version reprocesses the candidate.
-        anchor = implementation.parse_instant(str(row.get("first_seen_at") or "")) or actual_now
-        candidate = {
-            "status_id": row["status_id"],
-            "url": row.get("url"),
-            "text": row.get("text"),
-            "author": row.get("author"),
-            "retweet_count": row.get("retweet_count"),
-        }
-        event, reason = implementation.candidate_to_event(
-            candidate, now=anchor, min_retweets=min_retweets, x_ids=x_ids
-        )
-        updated = dict(row)
+        updated, event, rejection = evaluate_row(row, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids, cache=cache)
         if event:
-            updated["last_decision"] = "accepted"
-            updated["last_reason"] = None
             accepted.append(event)
-        else:
-            rejection = reason or "unknown"
-            updated["last_decision"] = "rejected"
-            updated["last_reason"] = rejection
-            rejected.append(
-                {
-                    "status_id": row["status_id"],
-                    "url": row.get("url"),
-                    "reason": rejection,
-                    "retweet_count": row.get("retweet_count"),
-                    "first_seen_at": row.get("first_seen_at"),
-                    "last_seen_at": row.get("last_seen_at"),
-                    "text_excerpt": str(row.get("text") or "")[:360],
-                }
-            )
+        if rejection:
+            rejected.append(rejection)
         evaluated.append(updated)
     return accepted, rejected, evaluated
 
@@ -194,9 +229,11 @@ def main() -> int:
     history = merge_history(history, captured, actual_now)
     min_retweets = int(os.environ.get("YAHOO_MIN_RETWEETS", "3"))
     x_ids = implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH))
+    cache = decision_cache.DecisionCache.for_stage("run_yahoo_realtime")
     accepted, rejected, evaluated = reevaluate_history(
-        history, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids
+        history, actual_now=actual_now, min_retweets=min_retweets, x_ids=x_ids, cache=cache
     )
+    cache.save()
     before = implementation.read_array(implementation.OUTPUT_PATH)
     merged = implementation.merge_cache(before, accepted, actual_now)
     promoted = {
@@ -216,6 +253,7 @@ def main() -> int:
             "history_rejected_count": len(rejected),
             "automatically_promoted_count": len(promoted),
             "event_count": len(merged),
+            "decision_cache": {**health.get("decision_cache", {}), "run_yahoo_realtime": cache.stats()},
         }
     )
     implementation.write_json(implementation.HEALTH_PATH, health)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import argparse
+import sys
+from collections import Counter
+from datetime import UTC, datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.profiling import run_profiled
+from scripts import collect_yahoo_corpus as corpus
+from scripts import fetch_yahoo_realtime as implementation
+from scripts import reclassify_yahoo_archive as reclassification
+from scripts import refine_yahoo_corpus as refinement
+from scripts import run_yahoo_realtime as ledger
+from scripts import yahoo_classifier_versions as classifier_versions
+
+REPORT_PATH = Path("public/yahoo-classifier-shadow.json")
+EXAMPLE_LIMIT = 50
+MIN_RETWEETS = 3
+
+RowOutcome = tuple[dict[str, Any], dict[str, Any] | None, dict[str, Any] | None]
+
+
+def evaluate_ledger(
+    row: dict[str, Any], version: classifier_versions.ClassifierVersion, context: classifier_versions.RowContext, *, actual_now: datetime, x_ids: set[str]
+) -> RowOutcome:
+    to_event = partial(version.candidate_to_event, context=context)
+    return ledger.evaluate_row(row, actual_now=actual_now, min_retweets=MIN_RETWEETS, x_ids=x_ids, candidate_to_event=to_event)
+
+
+def evaluate_refine(
+    row: dict[str, Any], version: classifier_versions.ClassifierVersion, context: classifier_versions.RowContext, *, actual_now: datetime, x_ids: set[str]
+) -> RowOutcome:
+    to_event = partial(version.candidate_to_event, context=context)
+    return refinement.evaluate_row(row, actual_now=actual_now, min_retweets=MIN_RETWEETS, x_ids=x_ids, candidate_to_event=to_event)
+
+
+def evaluate_reclassify(
+    row: dict[str, Any], version: classifier_versions.ClassifierVersion, context: classifier_versions.RowContext, *, actual_now: datetime, x_ids: set[str]
+) -> RowOutcome:
+    return reclassification.evaluate_row(
+        row,
+        actual_now=actual_now,
+        x_ids=x_ids,
+        candidate_to_event=partial(version.candidate_to_event, context=context),
+        parse_event_datetime=partial(version.parse_event_datetime, context=context),
+    )
+
+
+PIPELINES = {"ledger": evaluate_ledger, "refine": evaluate_refine, "reclassify": evaluate_reclassify}
+
+
+def decision(updated: dict[str, Any], event: dict[str, Any] | None) -> dict[str, Any]:
+    return {
+        "decision": updated.get("last_decision"),
+        "reason": updated.get("last_reason"),
+        "starts_at": event.get("starts_at") if event else None,
+    }
+
+
+def outcome_label(decision: dict[str, Any]) -> str:
+    return "accepted" if decision["decision"] == "accepted" else f"rejected:{decision['reason']}"
+
+
+def version_summary(name: str, rows: dict[str, dict[str, Any]]) -> dict[str, Any]:
+    rejected = Counter(str(row["reason"]) for row in rows.values() if row["decision"] != "accepted")
+    return {
+        "description": classifier_versions.get(name).description,
+        "accepted_count": sum(row["decision"] == "accepted" for row in rows.values()),
+        "rejected_count": sum(rejected.values()),
+        "rejection_reason_counts": dict(sorted(rejected.items())),
+    }
+
+
+def decision_diff(
+    production: dict[str, dict[str, Any]],
+    candidate: dict[str, dict[str, Any]],
+    texts: dict[str, dict[str, Any]],
+    *,
+    example_limit: int,
+) -> dict[str, Any]:
+    transitions: Counter[str] = Counter()
+    examples: list[dict[str, Any]] = []
+    start_changed = 0
+    for status_id, before in production.items():
+        after = candidate.get(status_id)
+        if after is None or after == before:
+            continue
+        old_label, new_label = outcome_label(before), outcome_label(after)
+        if old_label == new_label:
+            start_changed += 1
+        else:
+            transitions[f"{old_label} -> {new_label}"] += 1
+        if len(examples) < example_limit:
+            row = texts[status_id]
+            examples.append(
+                {
+                    "status_id": status_id,
+                    "url": row.get("url"),
+                    "retweet_count": row.get("retweet_count"),
+                    "production": before,
+                    "candidate": after,
+                    "text_excerpt": str(row.get("text") or "")[:360],
+                }
+            )
+    return {
+        "changed_count": sum(transitions.values()) + start_changed,
+        "decision_changed_count": sum(transitions.values()),
+        "start_changed_count": start_changed,
+        "newly_accepted_count": sum(count for label, count in transitions.items() if label.endswith("-> accepted")),
+        "newly_rejected_count": sum(count for label, count in transitions.items() if label.startswith("accepted ->")),
+        "transition_counts": dict(transitions.most_common()),
+        "examples": examples,
+    }
+
+
+def shadow(
+    history: list[dict[str, Any]],
+    *,
+    production: str,
+    candidates: list[str],
+    actual_now: datetime,
+    x_ids: set[str],
+    example_limit: int = EXAMPLE_LIMIT,
+) -> dict[str, Any]:
+    """Evaluate one ledger load under the production and candidate versions.
+
+    Each row is evaluated under every version before moving on, and the
+    versions share one date scan and one term scan per rule set for it.
+    """
+    versions = [classifier_versions.get(name) for name in [production, *(name for name in candidates if name != production)]]
+    names = [version.name for version in versions]
+    texts = {str(row.get("status_id") or ""): row for row in history}
+    results: dict[str, dict[str, dict[str, Any]]] = {name: {} for name in names}
+    for row in history:
+        context = classifier_versions.RowContext()
+        for version in versions:
+            updated, event, _rejection = PIPELINES[version.pipeline](row, version, context, actual_now=actual_now, x_ids=x_ids)
+            results[version.name][str(updated.get("status_id") or "")] = decision(updated, event)
+    return {
+        "schema_version": "1.0",
+        "generated_at": implementation.utc_text(actual_now),
+        "production_version": production,
+        "candidate_versions": names[1:],
+        "candidate_count": len(history),
+        "versions": {name: version_summary(name, rows) for name, rows in results.items()},
+        "diffs": {
+            name: decision_diff(results[production], results[name], texts, example_limit=example_limit)
+            for name in names[1:]
+        },
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare candidate Yahoo classifier versions against production on the candidate ledger")
+    parser.add_argument("--production", default=classifier_versions.PRODUCTION_VERSION)
+    parser.add_argument("--candidate", action="append", dest="candidates", help="classifier version to shadow; repeatable (default: every other registered version)")
+    parser.add_argument("--history", type=Path, default=ledger.HISTORY_PATH)
+    parser.add_argument("--output", type=Path, default=REPORT_PATH)
+    parser.add_argument("--example-limit", type=int, default=EXAMPLE_LIMIT)
+    args = parser.parse_args(argv)
+    history_payload = corpus.read_json(args.history, {})
+    history = history_payload.get("candidates", []) if isinstance(history_payload, dict) else []
+    if not isinstance(history, list):
+        raise ValueError("Yahoo candidate history candidates must be an array")
+    candidates = args.candidates or [name for name in classifier_versions.REGISTRY if name != args.production]
+    report = shadow(
+        [row for row in history if isinstance(row, dict)],
+        production=args.production,
+        candidates=candidates,
+        actual_now=datetime.now(UTC).replace(microsecond=0),
+        x_ids=implementation.known_x_ids(implementation.read_array(implementation.X_EVENTS_PATH)),
+        example_limit=max(0, args.example_limit),
+    )
+    implementation.write_json(args.output, report)
+    summary = " ".join(f"{name}:changed={diff['changed_count']}" for name, diff in report["diffs"].items())
+    print(f"Yahoo classifier shadow: production={args.production} candidates={report['candidate_count']} {summary}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(run_profiled("shadow_yahoo_classifier", main))
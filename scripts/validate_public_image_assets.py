@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import json
+import sys
 from collections import Counter
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import UTC, datetime
@@ -9,6 +10,11 @@ from typing import Any, Callable
 
 import httpx
 
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal.sessions import session
+
 AUDIT_PATH = Path("public/image-reachability-audit.json")
 IMAGE_FIELDS = (
     ("preferred_image_url", "preferred_image_kind"),
@@ -23,17 +29,12 @@ def now_iso() -> str:
 
 def probe_image(url: str) -> tuple[bool, str]:
     try:
-        with httpx.Client(
-            timeout=8,
-            follow_redirects=True,
-            headers={"User-Agent": "Mozilla/5.0 cast-event-cal/2", "Range": "bytes=0-0"},
-        ) as client:
-            with client.stream("GET", url) as response:
-                response.raise_for_status()
-                content_type = response.headers.get("content-type", "").split(";", 1)[0].strip().lower()
-                if not content_type.startswith("image/"):
-                    return False, f"unexpected_content_type:{content_type or 'missing'}"
-                return True, "ok"
+        with session(timeout=8).stream("GET", url, headers={"Range": "bytes=0-0"}) as response:
+            response.raise_for_status()
+            content_type = response.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if not content_type.startswith("image/"):
+                return False, f"unexpected_content_type:{content_type or 'missing'}"
+            return True, "ok"
     except httpx.HTTPStatusError as exc:
         return False, f"http_{exc.response.status_code}"
     except httpx.HTTPError as exc:
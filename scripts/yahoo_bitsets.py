@@ -0,0 +1,11 @@
+from __future__ import annotations
+
+
+def union_of_others(masks: list[int]) -> list[int]:
+    """For each status-id bitset, the union of every other bitset, in linear time via prefix and suffix unions."""
+    prefix, suffix = [0] * (len(masks) + 1), [0] * (len(masks) + 1)
+    for position, mask in enumerate(masks):
+        prefix[position + 1] = prefix[position] | mask
+    for position in range(len(masks) - 1, -1, -1):
+        suffix[position] = suffix[position + 1] | masks[position]
+    return [prefix[position] | suffix[position + 1] for position in range(len(masks))]
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from pathlib import Path
+from typing import Any
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from cast_event_cal import date_resolution as dates
+from cast_event_cal.date_resolution import DateResolution, WeekdayPolicy
+from scripts import collect_yahoo_corpus as corpus
+from scripts import fetch_yahoo_realtime as implementation
+from scripts import run_yahoo_realtime as ledger
+from scripts.collect_yahoo_corpus import STRUCTURED_EVENT_TERMS, refined_candidate_to_event, structured_classify
+from scripts.fetch_yahoo_realtime import KEYWORD_EVENT_TERMS
+from scripts.fetch_yahoo_realtime import candidate_to_event as shared_candidate_to_event
+from scripts.fetch_yahoo_realtime import classify as keyword_classify
+from scripts.relative_datetime import with_resolution_evidence
+
+PRODUCTION_VERSION = "1.9"
+# Module globals install() points at one version's callables; activation always starts from the values seen at import.
+PATCHED_GLOBALS: tuple[tuple[Any, tuple[str, ...]], ...] = (
+    (implementation, ("PARSER_VERSION", "VRCHAT_RE", "classify", "parse_event_datetime", "EVENT_TERMS", "candidate_to_event")),
+    (corpus, ("TERM_RULES", "parse_event_datetime_v18", "refined_candidate_to_event")),
+)
+
+
+@dataclass(slots=True)
+class RowContext:
+    """Work shared by every version evaluating one row: one date scan per text and one term scan per rule set."""
+
+    texts: dict[str, dates.TextResolutions] = field(default_factory=dict)
+    terms: dict[tuple[str, str], frozenset[str]] = field(default_factory=dict)
+
+    def resolve(self, text: str, anchor: datetime, weekdays: WeekdayPolicy | None) -> DateResolution | None:
+        if text not in self.texts:
+            self.texts[text] = dates.TextResolutions(text)
+        return self.texts[text].resolve(anchor, weekdays)
+
+    def term_groups(self, text: str, rules: str) -> frozenset[str]:
+        key = (rules, text)
+        if key not in self.terms:
+            self.terms[key] = corpus.classifier_matcher(rules).matches(text)
+        return self.terms[key]
+
+
+@dataclass(frozen=True, slots=True)
+class ClassifierVersion:
+    name: str
+    pipeline: str
+    rules: str
+    description: str
+    weekdays: WeekdayPolicy | None
+    structured: bool = True
+    resolution_evidence: bool = False
+
+    @property
+    def event_terms(self) -> frozenset[str]:
+        return STRUCTURED_EVENT_TERMS if self.structured else KEYWORD_EVENT_TERMS
+
+    def resolution(self, text: str, anchor: datetime, context: RowContext | None = None) -> DateResolution | None:
+        if context is None:
+            return dates.resolve(text, anchor, weekdays=self.weekdays)
+        return context.resolve(text, anchor, self.weekdays)
+
+    def term_groups(self, text: str, context: RowContext | None = None) -> frozenset[str]:
+        return corpus.term_groups(text, self.rules) if context is None else context.term_groups(text, self.rules)
+
+    def parse_event_datetime(self, text: str, anchor: datetime, *, context: RowContext | None = None) -> datetime | None:
+        resolution = self.resolution(text, anchor, context)
+        return resolution.event_at if resolution else None
+
+    def classify(self, text: str, *, context: RowContext | None = None) -> tuple[str | None, str | None]:
+        if self.structured:
+            return structured_classify(text, matched=self.term_groups(text, context), vrchat_re=ledger.VRCHAT_RE)
+        return keyword_classify(text, vrchat_re=ledger.VRCHAT_RE, event_terms=self.event_terms)
+
+    def candidate_to_event(
+        self,
+        candidate: dict[str, Any],
+        *,
+        now: datetime,
+        min_retweets: int,
+        x_ids: set[str],
+        context: RowContext | None = None,
+    ) -> tuple[dict[str, Any] | None, str | None]:
+        base = partial(
+            shared_candidate_to_event,
+            classifier=partial(self.classify, context=context),
+            parse_datetime=partial(self.parse_event_datetime, context=context),
+            vrchat_re=ledger.VRCHAT_RE,
+            event_terms=self.event_terms,
+        )
+        if not self.structured:
+            return base(candidate, now=now, min_retweets=min_retweets, x_ids=x_ids)
+        text = str(candidate.get("text") or "")
+        event, reason = refined_candidate_to_event(
+            candidate,
+            now=now,
+            min_retweets=min_retweets,
+            x_ids=x_ids,
+            matched=self.term_groups(text.strip(), context),
+            base=base,
+        )
+        if event and self.resolution_evidence:
+            return with_resolution_evidence(event, reason, self.resolution(text, now, context), implementation.utc_text)
+        return event, reason
+
+
+def snapshot() -> list[tuple[Any, str, Any]]:
+    return [(module, name, getattr(module, name)) for module, names in PATCHED_GLOBALS for name in names]
+
+
+def restore(saved: list[tuple[Any, str, Any]]) -> None:
+    for module, name, value in saved:
+        setattr(module, name, value)
+
+
+BASELINE = snapshot()
+
+
+REGISTRY = {
+    version.name: version
+    for version in (
+        ClassifierVersion("1.4", "ledger", "1.4", "keyword classifier with the Japanese-aware VRC boundary", None, structured=False),
+        ClassifierVersion(
+            "1.8", "refine", "1.8", "structured classifier, calendar-week dates, upcoming events only", "calendar_week", resolution_evidence=True
+        ),
+        ClassifierVersion("1.9", "reclassify", "1.8", "structured classifier keeping past events as archive", "next_occurrence"),
+    )
+}
+
+
+def get(name: str) -> ClassifierVersion:
+    try:
+        return REGISTRY[name]
+    except KeyError:
+        raise ValueError(f"unknown Yahoo classifier version {name!r}; known: {', '.join(sorted(REGISTRY))}") from None
+
+
+def install(name: str) -> ClassifierVersion:
+    """Point the module globals the production scripts read at one version's callables."""
+    version = get(name)
+    restore(BASELINE)
+    implementation.PARSER_VERSION = version.name
+    implementation.VRCHAT_RE = ledger.VRCHAT_RE
+    implementation.EVENT_TERMS = set(version.event_terms)
+    implementation.classify = version.classify
+    implementation.parse_event_datetime = version.parse_event_datetime
+    implementation.candidate_to_event = version.candidate_to_event
+    corpus.TERM_RULES = version.rules
+    if version.structured:
+        corpus.parse_event_datetime_v18 = version.parse_event_datetime
+        corpus.refined_candidate_to_event = version.candidate_to_event
+    return version
+
+
+@contextmanager
+def activated(name: str) -> Iterator[ClassifierVersion]:
+    saved = snapshot()
+    try:
+        yield install(name)
+    finally:
+        restore(saved)
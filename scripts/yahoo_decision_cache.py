@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts import fetch_yahoo_realtime as implementation
+
+CACHE_ROOT = Path("data/yahoo_decision_cache")
+CACHE_VERSION = "1.0"
+
+
+class DecisionCache:
+    """Time-independent ledger decisions by status id, reused while their fingerprint is unchanged."""
+
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path
+        self.entries: dict[str, dict[str, Any]] = {}
+        self.touched: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+        if path and path.exists():
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, json.JSONDecodeError):
+                payload = {}
+            if isinstance(payload, dict) and payload.get("schema_version") == CACHE_VERSION:
+                self.entries = dict(payload.get("entries", {}))
+
+    @classmethod
+    def for_stage(cls, stage: str, root: Path = CACHE_ROOT) -> DecisionCache:
+        return cls(root / f"{stage}.json")
+
+    def lookup(self, status_id: str, fingerprint: str) -> dict[str, Any] | None:
+        entry = self.entries.get(status_id)
+        if entry and entry.get("fingerprint") == fingerprint:
+            self.hits += 1
+            self.touched.add(status_id)
+            return clone(entry["decision"])
+        self.misses += 1
+        return None
+
+    def peek(self, status_id: str, fingerprint: str) -> bool:
+        """Whether ``lookup`` would hit, without counting it."""
+        entry = self.entries.get(status_id)
+        return bool(entry) and entry.get("fingerprint") == fingerprint
+
+    def store(self, status_id: str, fingerprint: str, decision: dict[str, Any]) -> None:
+        self.entries[status_id] = {"fingerprint": fingerprint, "decision": clone(decision)}
+        self.touched.add(status_id)
+
+    def subset(self, status_ids: Iterable[str]) -> DecisionCache:
+        shard = DecisionCache()
+        shard.entries = {status_id: self.entries[status_id] for status_id in status_ids if status_id in self.entries}
+        return shard
+
+    def absorb(self, shard: DecisionCache) -> None:
+        self.entries.update((status_id, shard.entries[status_id]) for status_id in shard.touched)
+        self.touched |= shard.touched
+        self.hits += shard.hits
+        self.misses += shard.misses
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entry_count": len(self.touched)}
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        # Only decisions used by this run survive, so rows pruned from the ledger leave the cache too.
+        entries = {status_id: self.entries[status_id] for status_id in sorted(self.touched)}
+        payload = {"schema_version": CACHE_VERSION, "parser_version": implementation.PARSER_VERSION, "entries": entries}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.path.with_suffix(self.path.suffix + ".tmp")
+        temporary.write_text(json.dumps(payload, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+        temporary.replace(self.path)
+
+
+def fingerprint(candidate: dict[str, Any], *, anchor: datetime, min_retweets: int | None, x_ids: set[str]) -> str:
+    # Text, engagement and parser version are the request-level key; the remaining fields also feed the decision.
+    parts = (
+        implementation.PARSER_VERSION,
+        str(candidate.get("retweet_count")),
+        str(min_retweets),
+        str(int(anchor.timestamp())),
+        "x" if str(candidate.get("status_id") or "") in x_ids else "",
+        str(candidate.get("url")),
+        str(candidate.get("author")),
+        str(candidate.get("text") or ""),
+    )
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+
+def clone(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {key: clone(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [clone(item) for item in value]
+    return value
+
+
+def decide(
+    cache: DecisionCache | None,
+    candidate: dict[str, Any],
+    compute: Callable[[dict[str, Any], datetime], dict[str, Any]],
+    *,
+    anchor: datetime,
+    min_retweets: int | None,
+    x_ids: set[str],
+) -> dict[str, Any]:
+    if cache is None:
+        return compute(candidate, anchor)
+    status_id = str(candidate.get("status_id") or "")
+    key = fingerprint(candidate, anchor=anchor, min_retweets=min_retweets, x_ids=x_ids)
+    decision = cache.lookup(status_id, key)
+    if decision is None:
+        decision = compute(candidate, anchor)
+        cache.store(status_id, key, decision)
+    return decision
@@ -0,0 +1,268 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import sys
+from collections import Counter
+from collections.abc import Iterable
+from datetime import datetime
+from itertools import pairwise
+from pathlib import Path
+from typing import Any, Callable
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts import fetch_yahoo_realtime as implementation
+from scripts import run_yahoo_realtime as ledger
+
+STORE_PATH = Path("data/yahoo_ledger.sqlite3")
+SHARD_RUNS_PATH = Path("data/yahoo_shard_runs.json")
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    status_id TEXT PRIMARY KEY,
+    position INTEGER NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    body TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_last_seen ON candidates (last_seen_at, status_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS shard_runs (
+    query_key TEXT NOT NULL,
+    observed_at TEXT NOT NULL,
+    raw_count INTEGER NOT NULL,
+    new_count INTEGER NOT NULL,
+    accepted_new_count INTEGER NOT NULL,
+    PRIMARY KEY (query_key, observed_at)
+);
+"""
+SHARD_RUN_FIELDS = ("query_key", "observed_at", "raw_count", "new_count", "accepted_new_count")
+QUERY_BATCH = 500
+
+Merge = Callable[[dict[str, Any] | None, dict[str, Any]], dict[str, Any] | None]
+
+
+def encode(row: dict[str, Any]) -> str:
+    return json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+
+
+def seen_key(row: dict[str, Any]) -> str:
+    # Unparseable stamps sort before every real one, so retention pruning drops them as merge_history does.
+    seen = implementation.parse_instant(str(row.get("last_seen_at") or ""))
+    return implementation.utc_text(seen) if seen else ""
+
+
+def recent_first(rows: list[dict[str, Any]]) -> bool:
+    keys = [(seen_key(row), str(row["status_id"])) for row in rows]
+    return all(left > right for left, right in pairwise(keys))
+
+
+def file_digest(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest() if path.exists() else ""
+
+
+def file_size(path: Path) -> str:
+    return str(path.stat().st_size) if path.exists() else ""
+
+
+def changed_rows(before: Iterable[dict[str, Any]], after: Iterable[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Rows of ``after`` that differ from the row with the same status id in ``before``."""
+    previous = {str(row.get("status_id")): row for row in before}
+    return [row for row in after if previous.get(str(row.get("status_id"))) != row]
+
+
+class LedgerStore:
+    """SQLite ledger of Yahoo candidates; the public history JSON is its export.
+
+    The store is the source of truth. The JSON is imported only into a store
+    that holds no ledger yet, or when the file's size no longer matches the
+    last export because a script wrote it directly. Rows written since opening
+    are tracked, so an export with nothing changed leaves the file alone.
+    """
+
+    def __init__(self, path: Path = STORE_PATH, history_path: Path = ledger.HISTORY_PATH, shard_runs_path: Path = SHARD_RUNS_PATH) -> None:
+        self.path = path
+        self.history_path = history_path
+        self.shard_runs_path = shard_runs_path
+        self.counts: Counter[str] = Counter()
+        self.dirty: set[str] = set()
+        self.removed = 0
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.sync()
+        self.sync_shard_runs()
+
+    def __enter__(self) -> LedgerStore:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def meta(self, key: str, default: str = "") -> str:
+        row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return str(row[0]) if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        self.connection.execute("INSERT INTO meta (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def sync(self) -> None:
+        # A size check instead of a content hash: a restored checkout keeps the bytes, a direct writer changes them.
+        size = file_size(self.history_path)
+        if self.meta("payload") and size == self.meta("export_size"):
+            return
+        payload = ledger.read_object(self.history_path)
+        rows = payload.pop("candidates", [])
+        rows = [row for row in rows if isinstance(row, dict) and row.get("status_id")] if isinstance(rows, list) else []
+        with self.connection:
+            self.connection.execute("DELETE FROM candidates")
+            self.connection.executemany(
+                "INSERT OR REPLACE INTO candidates (status_id, position, last_seen_at, body) VALUES (?, ?, ?, ?)",
+                ((str(row["status_id"]), index, seen_key(row), encode(row)) for index, row in enumerate(rows)),
+            )
+            self.set_meta("payload", encode(payload))
+            self.set_meta("order", "recent_first" if recent_first(rows) else "position")
+            self.set_meta("export_size", size)
+        self.counts["imported"] += len(rows)
+
+    def count(self) -> int:
+        return int(self.connection.execute("SELECT COUNT(*) FROM candidates").fetchone()[0])
+
+    def rows(self, *, recent: bool | None = None) -> list[dict[str, Any]]:
+        # The collectors export newest-first; that order comes from the index, so it needs no stored positions.
+        recent = self.meta("order") == "recent_first" if recent is None else recent
+        order = "last_seen_at DESC, status_id DESC" if recent else "position, status_id"
+        return [json.loads(body) for (body,) in self.connection.execute(f"SELECT body FROM candidates ORDER BY {order}")]
+
+    def header(self) -> dict[str, Any]:
+        return json.loads(self.meta("payload", "{}"))
+
+    def payload(self) -> dict[str, Any]:
+        payload = self.header()
+        payload["candidates"] = self.rows()
+        return payload
+
+    def get(self, status_ids: Iterable[str]) -> dict[str, dict[str, Any]]:
+        wanted = list(dict.fromkeys(status_ids))
+        found: dict[str, dict[str, Any]] = {}
+        for start in range(0, len(wanted), QUERY_BATCH):
+            batch = wanted[start:start + QUERY_BATCH]
+            marks = ",".join("?" * len(batch))
+            for status_id, body in self.connection.execute(f"SELECT status_id, body FROM candidates WHERE status_id IN ({marks})", batch):
+                found[status_id] = json.loads(body)
+        return found
+
+    def upsert(self, observed: Iterable[dict[str, Any]], merge: Merge) -> int:
+        """Merge each observation into its stored row by primary key, touching no other rows."""
+        incoming = [row for row in observed if str(row.get("status_id") or "")]
+        stored = self.get(str(row["status_id"]) for row in incoming)
+        merged: dict[str, dict[str, Any]] = {}
+        for row in incoming:
+            status_id = str(row["status_id"])
+            result = merge(merged.get(status_id) or stored.get(status_id), row)
+            if result is not None:
+                merged[status_id] = result
+        self.write(merged.values())
+        self.counts["upserted"] += len(merged)
+        return len(merged)
+
+    def write(self, rows: Iterable[dict[str, Any]]) -> int:
+        """Store rows the caller changed, keeping the position of rows already held and appending new ones."""
+        position = int(self.connection.execute("SELECT COALESCE(MAX(position), -1) FROM candidates").fetchone()[0])
+        written = 0
+        with self.connection:
+            for row in rows:
+                status_id = str(row["status_id"])
+                position += 1
+                self.connection.execute(
+                    "INSERT INTO candidates (status_id, position, last_seen_at, body) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(status_id) DO UPDATE SET last_seen_at = excluded.last_seen_at, body = excluded.body",
+                    (status_id, position, seen_key(row), encode(row)),
+                )
+                self.dirty.add(status_id)
+                written += 1
+        self.counts["written"] += written
+        return written
+
+    def prune(self, lower: datetime) -> int:
+        with self.connection:
+            removed = self.connection.execute("DELETE FROM candidates WHERE last_seen_at < ?", (implementation.utc_text(lower),)).rowcount
+        self.counts["pruned"] += removed
+        self.removed += removed
+        return removed
+
+    def cap(self, limit: int) -> int:
+        with self.connection:
+            removed = self.connection.execute(
+                "DELETE FROM candidates WHERE status_id NOT IN "
+                "(SELECT status_id FROM candidates ORDER BY last_seen_at DESC, status_id DESC LIMIT ?)",
+                (max(0, limit),),
+            ).rowcount
+        self.counts["pruned"] += removed
+        self.removed += removed
+        return removed
+
+    def export(self, header: dict[str, Any], *, recent: bool | None = None) -> bool:
+        """Write the public history JSON when rows, their order or the header changed; ``generated_at`` alone is not a change."""
+        order = self.meta("order") if recent is None else "recent_first" if recent else "position"
+        previous = self.header()
+        unchanged = (
+            not self.dirty
+            and not self.removed
+            and order == self.meta("order")
+            and {**previous, "generated_at": None} == {**header, "generated_at": None}
+            and self.history_path.exists()
+        )
+        if unchanged:
+            return False
+        with self.connection:
+            self.set_meta("order", order)
+            self.set_meta("payload", encode(header))
+            implementation.write_json(self.history_path, {**header, "candidates": self.rows()})
+            self.set_meta("export_size", file_size(self.history_path))
+        self.counts["exported"] += 1
+        self.dirty.clear()
+        self.removed = 0
+        return True
+
+    def sync_shard_runs(self) -> None:
+        # The committed JSON is the durable record; a store restored without it, or a lost store, re-imports it.
+        digest = file_digest(self.shard_runs_path)
+        if digest == self.meta("shard_runs_sha256"):
+            return
+        payload = ledger.read_object(self.shard_runs_path)
+        runs = payload.get("runs", [])
+        runs = [run for run in runs if isinstance(run, dict) and all(name in run for name in SHARD_RUN_FIELDS)] if isinstance(runs, list) else []
+        with self.connection:
+            self.connection.execute("DELETE FROM shard_runs")
+            self.insert_shard_runs(runs)
+            self.set_meta("shard_runs_sha256", digest)
+
+    def insert_shard_runs(self, runs: list[dict[str, Any]]) -> None:
+        self.connection.executemany(
+            f"INSERT OR REPLACE INTO shard_runs ({', '.join(SHARD_RUN_FIELDS)}) VALUES (?, ?, ?, ?, ?)",
+            ([run[name] for name in SHARD_RUN_FIELDS] for run in runs),
+        )
+
+    def record_shard_runs(self, runs: list[dict[str, Any]], *, keep_after: datetime) -> None:
+        """Store one yield row per successful shard request and export the scheduler window to its JSON file."""
+        with self.connection:
+            self.insert_shard_runs(runs)
+            self.connection.execute("DELETE FROM shard_runs WHERE observed_at < ?", (implementation.utc_text(keep_after),))
+            kept = self.shard_runs(keep_after)
+            implementation.write_json(self.shard_runs_path, {"schema_version": "1.0", "run_count": len(kept), "runs": kept})
+            self.set_meta("shard_runs_sha256", file_digest(self.shard_runs_path))
+
+    def shard_runs(self, since: datetime) -> list[dict[str, Any]]:
+        cursor = self.connection.execute(
+            f"SELECT {', '.join(SHARD_RUN_FIELDS)} FROM shard_runs WHERE observed_at >= ? ORDER BY observed_at, query_key",
+            (implementation.utc_text(since),),
+        )
+        return [dict(zip(SHARD_RUN_FIELDS, row, strict=True)) for row in cursor]
+
+    def stats(self) -> dict[str, int]:
+        return {name: self.counts[name] for name in ("imported", "upserted", "written", "pruned", "exported")} | {"row_count": self.count()}
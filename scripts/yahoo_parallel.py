@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import multiprocessing
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Callable
+
+if __package__ in {None, ""}:
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts import yahoo_decision_cache as decision_cache
+
+CHUNKS_PER_WORKER = 4
+
+
+def chunks(rows: list[dict[str, Any]], workers: int) -> list[list[dict[str, Any]]]:
+    # Contiguous chunks keep each worker's output in ledger order; several per worker even out slow rows.
+    size = max(1, -(-len(rows) // (max(1, workers) * CHUNKS_PER_WORKER)))
+    return [rows[start:start + size] for start in range(0, len(rows), size)]
+
+
+def evaluate_chunk(
+    function: Callable[..., tuple[Any, ...]],
+    rows: list[dict[str, Any]],
+    cache: decision_cache.DecisionCache | None,
+    options: dict[str, Any],
+) -> tuple[tuple[Any, ...], decision_cache.DecisionCache | None]:
+    if cache is None:
+        return function(rows, **options), None
+    return function(rows, cache=cache, **options), cache
+
+
+def run_chunks(
+    function: Callable[..., tuple[Any, ...]],
+    rows: list[dict[str, Any]],
+    *,
+    workers: int,
+    install: Callable[[], object] | None,
+    cache: decision_cache.DecisionCache | None = None,
+    **options: Any,
+) -> tuple[Any, ...]:
+    """Run a per-row ledger pass over chunks in worker processes and join the outputs in chunk order.
+
+    Forked workers inherit the parent's patched classifier globals exactly; where
+    fork is unavailable ``install`` rebuilds them in each worker. Lists are
+    concatenated and counters summed; callers re-apply their own final sort,
+    which is stable and therefore matches the serial order. Without fork the
+    caller must pass the installer it actually used, or the run is refused.
+    """
+    forked = "fork" in multiprocessing.get_all_start_methods()
+    if not forked and install is None:
+        raise ValueError("parallel ledger passes need fork or the caller's classifier installer")
+    parts = chunks(rows, workers)
+    shards = [cache.subset(str(row.get("status_id") or "") for row in part) if cache else None for part in parts]
+    with ProcessPoolExecutor(
+        max_workers=max(1, min(workers, len(parts))),
+        mp_context=multiprocessing.get_context("fork") if forked else None,
+        initializer=None if forked else install,
+    ) as pool:
+        results = list(pool.map(evaluate_chunk, [function] * len(parts), parts, shards, [options] * len(parts)))
+    joined: list[Any] = []
+    for output, shard in results:
+        if cache is not None and shard is not None:
+            cache.absorb(shard)
+        if not joined:
+            joined = [Counter(value) if isinstance(value, Counter) else list(value) for value in output]
+            continue
+        for target, value in zip(joined, output, strict=True):
+            if isinstance(target, Counter):
+                target.update(value)
+            else:
+                target.extend(value)
+    return tuple(joined)
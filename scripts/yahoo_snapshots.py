@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import threading
+from datetime import UTC, datetime, timedelta
+from pathlib import Path
+from typing import Any
+
+SNAPSHOT_ROOT = Path("data/source_snapshots/yahoo")
+INDEX_NAME = "index.jsonl"
+RETENTION_DAYS = 30
+MAX_SNAPSHOTS_PER_QUERY = 30
+
+_lock = threading.Lock()
+
+
+def utc_text(value: datetime) -> str:
+    return value.astimezone(UTC).replace(microsecond=0).isoformat().replace("+00:00", "Z")
+
+
+def parse_time(value: str) -> datetime | None:
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=UTC)
+
+
+def object_path(digest: str, root: Path = SNAPSHOT_ROOT) -> Path:
+    return root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+
+def store(
+    query_key: str,
+    html: str,
+    *,
+    url: str,
+    http_status: int,
+    final_url: str,
+    fetched_at: datetime | None = None,
+    root: Path = SNAPSHOT_ROOT,
+) -> dict[str, Any]:
+    body = html.encode("utf-8")
+    digest = hashlib.sha256(body).hexdigest()
+    path = object_path(digest, root)
+    entry = {
+        "query_key": query_key,
+        "fetched_at": utc_text(fetched_at or datetime.now(UTC)),
+        "sha256": digest,
+        "html_bytes": len(body),
+        "url": url,
+        "http_status": http_status,
+        "final_url": final_url,
+    }
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # mtime=0 keeps the compressed object byte-stable for identical pages.
+        temporary = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(gzip.compress(body, compresslevel=9, mtime=0))
+        temporary.replace(path)
+    with _lock:
+        with (root / INDEX_NAME).open("a", encoding="utf-8", newline="\n") as handle:
+            handle.write(json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n")
+    return entry
+
+
+def entries(root: Path = SNAPSHOT_ROOT) -> list[dict[str, Any]]:
+    path = root / INDEX_NAME
+    if not path.exists():
+        return []
+    rows = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(row, dict) and row.get("query_key") and row.get("sha256") and parse_time(str(row.get("fetched_at") or "")):
+            rows.append(row)
+    return sorted(rows, key=lambda row: (str(row["fetched_at"]), str(row["query_key"])))
+
+
+def latest(root: Path = SNAPSHOT_ROOT, *, as_of: datetime | None = None) -> dict[str, dict[str, Any]]:
+    selected: dict[str, dict[str, Any]] = {}
+    for row in entries(root):
+        fetched_at = parse_time(str(row["fetched_at"]))
+        if fetched_at is None or (as_of is not None and fetched_at > as_of):
+            continue
+        selected[str(row["query_key"])] = row
+    return selected
+
+
+def load_html(entry: dict[str, Any], root: Path = SNAPSHOT_ROOT) -> str:
+    path = object_path(str(entry["sha256"]), root)
+    if not path.exists():
+        raise RuntimeError(f"missing Yahoo snapshot object {entry['sha256']}")
+    return gzip.decompress(path.read_bytes()).decode("utf-8")
+
+
+def prune(
+    root: Path = SNAPSHOT_ROOT,
+    *,
+    now: datetime | None = None,
+    retention_days: int = RETENTION_DAYS,
+    keep_per_query: int = MAX_SNAPSHOTS_PER_QUERY,
+) -> dict[str, int]:
+    rows = entries(root)
+    lower = (now or datetime.now(UTC)) - timedelta(days=retention_days)
+    per_query: dict[str, list[dict[str, Any]]] = {}
+    for row in rows:
+        fetched_at = parse_time(str(row["fetched_at"]))
+        if fetched_at is not None and fetched_at >= lower:
+            per_query.setdefault(str(row["query_key"]), []).append(row)
+    kept = sorted(
+        (row for group in per_query.values() for row in group[-max(1, keep_per_query):]),
+        key=lambda row: (str(row["fetched_at"]), str(row["query_key"])),
+    )
+    referenced = {str(row["sha256"]) for row in kept}
+    removed_objects = 0
+    for path in sorted((root / "objects").glob("*/*.html.gz")):
+        if path.name.removesuffix(".html.gz") not in referenced:
+            path.unlink()
+            removed_objects += 1
+    with _lock:
+        index = root / INDEX_NAME
+        if rows or index.exists():
+            index.parent.mkdir(parents=True, exist_ok=True)
+            temporary = index.with_suffix(".tmp")
+            temporary.write_text(
+                "".join(json.dumps(row, ensure_ascii=False, separators=(",", ":")) + "\n" for row in kept),
+                encoding="utf-8",
+                newline="\n",
+            )
+            temporary.replace(index)
+    return {"snapshot_count": len(kept), "removed_snapshot_count": len(rows) - len(kept), "removed_object_count": removed_objects}
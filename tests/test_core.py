@@ -1,5 +1,12 @@
+import hashlib
+import json
+import threading
+import time
 from datetime import UTC, datetime
 
+import httpx
+
+from cast_event_cal import core
 from cast_event_cal.core import Event, deduplicate, parse_ics, render_ics, write_outputs, x_post_to_event
 
 
@@ -38,3 +45,150 @@ def test_core_outputs_leave_html_to_canonical_frontend_renderer(tmp_path):
 
     assert {path.name for path in tmp_path.iterdir()} == {"events.json", "calendar.ics", "health.json", ".nojekyll"}
     assert not (tmp_path / "index.html").exists()
+
+
+def test_collect_sources_runs_concurrently_in_config_order_with_deadline(monkeypatch):
+    release = threading.Event()
+
+    def fake_collect(client, source, config_dir, fetched_at, cache=None):
+        if source["name"] == "stuck":
+            release.wait(5)
+            return []
+        time.sleep(source["delay"])
+        return [Event(id=source["name"], title=source["name"], starts_at="2026-08-02T12:00:00Z", source=source["name"])]
+
+    monkeypatch.setattr(core, "collect_source", fake_collect)
+    sources = [
+        {"name": "slow", "delay": 0.3},
+        {"name": "stuck", "deadline_seconds": 0.2},
+        {"name": "fast", "delay": 0.0},
+    ]
+    began = time.monotonic()
+    events, rows = core.collect_sources(None, sources, None, "2026-08-02T00:00:00Z", concurrency=3, deadline=5)
+    stuck = [thread for thread in threading.enumerate() if thread.name == "source-1"]
+    release.set()
+
+    assert time.monotonic() - began < 0.6
+    assert [event.id for event in events] == ["slow", "fast"]
+    assert [(row["name"], row["status"], row["count"]) for row in rows] == [("slow", "ok", 1), ("stuck", "error", 0), ("fast", "ok", 1)]
+    assert "deadline" in rows[1]["error"]
+    assert stuck and all(thread.daemon for thread in stuck)
+    assert all(isinstance(row["duration_ms"], int) for row in rows)
+
+
+def test_conditional_get_reuses_cached_ics_events(tmp_path):
+    body = "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:c-1\r\nDTSTART:20260802T120000Z\r\nSUMMARY:Cached\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    seen: list[dict[str, str]] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(dict(request.headers))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=body, headers={"ETag": '"v1"', "Last-Modified": "Sun, 02 Aug 2026 00:00:00 GMT"})
+
+    source = {"name": "feed", "type": "ics", "url": "https://calendar.example/feed.ics"}
+    cache_path = tmp_path / "validators.json"
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        cache = core.ValidatorCache(cache_path)
+        first, rows = core.collect_sources(client, [source], tmp_path, "2026-08-01T00:00:00Z", cache=cache)
+        cache.save()
+        cache = core.ValidatorCache(cache_path)
+        second, rows_again = core.collect_sources(client, [source], tmp_path, "2026-08-02T00:00:00Z", cache=cache)
+
+    assert "if-none-match" not in seen[0]
+    assert seen[1]["if-none-match"] == '"v1"'
+    assert seen[1]["if-modified-since"] == "Sun, 02 Aug 2026 00:00:00 GMT"
+    assert rows[0]["cache"] == "miss"
+    assert rows_again[0]["cache"] == "not_modified"
+    assert [event.id for event in second] == [event.id for event in first]
+    assert second[0].fetched_at == "2026-08-02T00:00:00Z"
+    validators = json.loads(cache_path.read_text(encoding="utf-8"))["entries"][source["url"]]
+    assert validators["etag"] == '"v1"' and "parsed" not in validators
+    assert source["url"] in json.loads((tmp_path / "validators.parsed.json").read_text(encoding="utf-8"))["entries"]
+
+
+def test_not_modified_recurring_feed_is_reexpanded_for_the_current_run(tmp_path):
+    body = "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:weekly\r\nDTSTART:20260802T120000Z\r\nRRULE:FREQ=WEEKLY\r\nSUMMARY:Weekly\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, text=body, headers={"ETag": '"v1"'})
+
+    source = {"name": "feed", "type": "ics", "url": "https://calendar.example/weekly.ics"}
+    cache_path = tmp_path / "validators.json"
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        cache = core.ValidatorCache(cache_path)
+        first = core.collect_ics_source(client, source, "2026-08-01T00:00:00Z", cache)
+        cache.save()
+        cache = core.ValidatorCache(cache_path)
+        later = core.collect_ics_source(client, source, "2027-09-01T00:00:00Z", cache)
+
+    assert cache.outcomes == {"feed": "not_modified"}
+    assert [event.starts_at for event in later] == [event.starts_at for event in parse_ics(body, "feed", "2027-09-01T00:00:00Z")]
+    assert min(event.starts_at for event in later) >= "2027-08-01"
+    assert max(event.starts_at for event in later) > max(event.starts_at for event in first)
+
+
+def test_ics_body_is_streamed_into_the_parser_and_an_unchanged_body_is_replayed(tmp_path, monkeypatch):
+    body = b"BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:s-1\r\nDTSTART:20260802T120000Z\r\nSUMMARY:Streamed\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, content=iter([body[:40], body[40:90], body[90:]]))
+
+    def buffered(self):
+        raise AssertionError("response body was buffered")
+
+    monkeypatch.setattr(httpx.Response, "read", buffered)
+    source = {"name": " feed ", "type": "ics", "url": "https://calendar.example/feed.ics"}
+    cache = core.ValidatorCache()
+    with httpx.Client(transport=httpx.MockTransport(handler)) as client:
+        first = core.collect_ics_source(client, source, "2026-08-01T00:00:00Z", cache)
+
+        def reparsed(lines):
+            raise AssertionError("unchanged body was parsed again")
+
+        monkeypatch.setattr(core, "iter_vevents", reparsed)
+        second, rows = core.collect_sources(client, [source], tmp_path, "2026-08-01T01:00:00Z", cache=cache)
+
+    assert [event.title for event in first] == ["Streamed"]
+    assert [event.id for event in second] == [event.id for event in first]
+    assert second[0].fetched_at == "2026-08-01T01:00:00Z"
+    assert cache.entries[source["url"]]["body_sha256"] == hashlib.sha256(body).hexdigest()
+    assert cache.outcomes == {"feed": "unchanged"}
+    assert rows[0]["cache"] == "unchanged"
+
+
+def test_ics_writer_streams_cached_vevent_blocks(tmp_path):
+    event = Event(id="cached", title="長いタイトル" * 10, starts_at="2026-08-02T12:00:00Z", description="a,b;c", source="one").normalized()
+    core.render_vevent.cache_clear()
+    first = tmp_path / "first.ics"
+    second = tmp_path / "second.ics"
+    assert core.write_ics(first, [event], datetime(2026, 8, 1, tzinfo=UTC)) == 1
+    core.write_ics(second, [event], datetime(2026, 8, 2, tzinfo=UTC))
+
+    assert core.render_vevent.cache_info().hits == 1
+    assert first.read_bytes() == render_ics([event], datetime(2026, 8, 1, tzinfo=UTC)).encode("utf-8")
+    assert b"DTSTAMP:20260802T000000Z\r\n" in second.read_bytes()
+    assert b"DESCRIPTION:a\\,b\\;c\r\n" in second.read_bytes()
+    assert all(len(line.removeprefix(b" ")) <= 75 for line in first.read_bytes().split(b"\r\n"))
+
+
+def test_event_instants_are_parsed_once_across_pipeline_stages(monkeypatch):
+    calls: list[str] = []
+    parse_datetime = core.parse_datetime
+
+    def counting_parse(value):
+        calls.append(value)
+        return parse_datetime(value)
+
+    monkeypatch.setattr(core, "parse_datetime", counting_parse)
+    raws = [{"source_id": str(index), "title": f"集会{index}", "starts_at": f"2026-08-{index + 1:02d}T21:00:00+09:00", "ends_at": f"2026-08-{index + 1:02d}T22:00:00+09:00"} for index in range(20)]
+    events = [core.build_event(raw, "sample", "2026-08-01T00:00:00Z") for raw in raws]
+    events = core.filter_window(core.deduplicate(events + events), past_days=1, future_days=60, now=datetime(2026, 8, 1, tzinfo=UTC))
+    render_ics(events, datetime(2026, 8, 1, tzinfo=UTC))
+
+    assert len(events) == 20
+    assert len(calls) == 3 * len(raws)
+    assert "start_utc" not in events[0].as_dict()
+    assert events[0].as_dict()["starts_at"] == "2026-08-01T12:00:00Z"
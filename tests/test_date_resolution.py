@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+
+from cast_event_cal import date_resolution as dates
+from scripts.yahoo_snapshots import utc_text
+
+# Wednesday 2026-08-12 10:00 JST
+ANCHOR = datetime(2026, 8, 12, 1, tzinfo=UTC)
+
+
+def test_batch_matches_single_resolutions_and_keeps_evidence():
+    texts = ["8/20 21:00 VRChat 集会", "今週の月曜 22時 開催", "来週の月曜日 22:00 から", "明日 21：30 開店", "告知のみ"]
+    anchors = [ANCHOR] * len(texts)
+
+    batch = dates.resolve_many(texts, anchors)
+
+    assert batch == [dates.resolve(text, ANCHOR) for text in texts]
+    assert [row.method if row else None for row in batch] == [
+        "explicit_calendar_date", None, "next_calendar_week_weekday", "relative_day_from_source_timestamp", None,
+    ]
+    assert batch[2].evidence(utc_text) == {
+        "method": "next_calendar_week_weekday",
+        "anchor": "2026-08-12T01:00:00Z",
+        "resolved_at": "2026-08-17T13:00:00Z",
+        "timezone": "Asia/Tokyo",
+        "week_start": "monday",
+        "matched_text": "来週の月曜日 22:00",
+    }
+    with pytest.raises(ValueError):
+        dates.resolve_many(texts, anchors[:-1])
+
+
+def test_memo_is_shared_per_jst_day_but_time_checks_use_the_full_anchor():
+    dates.cache_clear()
+    text = "水曜 11:00 オープン"
+    morning = dates.resolve(text, ANCHOR)
+    afternoon = dates.resolve(text, datetime(2026, 8, 12, 4, 30, tzinfo=UTC))
+
+    assert morning.event_at == datetime(2026, 8, 12, 2, tzinfo=UTC)
+    assert afternoon.event_at == datetime(2026, 8, 19, 2, tzinfo=UTC)
+    assert dates.cache_info()["misses"] == 1
+    assert dates.cache_info()["hits"] == 1
+
+
+def test_weekday_policies_differ_only_where_the_collectors_did():
+    text = "今週の月曜 22時 開催"
+    assert dates.resolve(text, ANCHOR) is None
+    assert dates.resolve(text, ANCHOR, weekdays="next_occurrence").event_at == datetime(2026, 8, 17, 13, tzinfo=UTC)
+    assert dates.resolve(text, ANCHOR, weekdays=None) is None
+
+
+def test_post_parsers_share_the_single_normalization_pass():
+    created = datetime(2026, 8, 12, tzinfo=dates.JST)
+    assert dates.loose_datetime("8／20 22：00 集合", created) == datetime(2026, 8, 20, 22, tzinfo=dates.JST)
+    assert dates.post_datetime("1/5(月) 21:00 開催", created) == datetime(2027, 1, 5, 21, tzinfo=dates.JST)
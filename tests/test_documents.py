@@ -0,0 +1,45 @@
+from __future__ import annotations
+
+import json
+
+from cast_event_cal import documents
+from cast_event_cal.core import main
+
+DOCUMENT = {
+    "schema_version": "2.0",
+    "generated_at": "2026-08-16T00:00:00Z",
+    "count": 2,
+    "events": [
+        {"id": "a", "title": "キャスト募集", "tags": ["cast", "vrchat"], "meta": {"nested": [1, {"x": None}]}},
+        {"id": "b", "title": "Line\nbreak", "tags": [], "meta": {}},
+    ],
+    "trailing": {"after": True},
+}
+
+
+def test_indented_stream_matches_json_dumps(tmp_path):
+    path = tmp_path / "events.json"
+    assert documents.write_events_document(path, DOCUMENT, compact=False) == 2
+    assert path.read_text(encoding="utf-8") == json.dumps(DOCUMENT, ensure_ascii=False, indent=2) + "\n"
+
+    documents.write_events_document(path, {**DOCUMENT, "events": []}, compact=False)
+    assert path.read_text(encoding="utf-8") == json.dumps({**DOCUMENT, "events": []}, ensure_ascii=False, indent=2) + "\n"
+
+
+def test_compact_stream_accepts_generators_and_env_toggle(tmp_path, monkeypatch):
+    path = tmp_path / "events.json"
+    header = {key: value for key, value in DOCUMENT.items() if key != "events"}
+    monkeypatch.setenv(documents.JSON_STYLE_ENV, "compact")
+    documents.write_events_document(path, header, (row for row in DOCUMENT["events"]))
+    expected = {**header, "events": DOCUMENT["events"]}
+    assert path.read_text(encoding="utf-8") == json.dumps(expected, ensure_ascii=False, separators=(",", ":")) + "\n"
+    assert not path.with_suffix(".json.tmp").exists()
+
+
+def test_compact_json_command_shrinks_indented_feed(tmp_path, capsys):
+    path = tmp_path / "events.json"
+    path.write_text(json.dumps(DOCUMENT, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    assert main(["compact-json", str(path)]) == 0
+    assert json.loads(path.read_text(encoding="utf-8")) == DOCUMENT
+    assert "\n" not in path.read_text(encoding="utf-8").rstrip("\n")
+    assert "saved" in capsys.readouterr().out
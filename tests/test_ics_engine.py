@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from cast_event_cal.core import parse_ics
+from cast_event_cal.ics import iter_occurrences, iter_unfolded_lines
+
+WEEKLY = (
+    "BEGIN:VCALENDAR\r\n"
+    "BEGIN:VEVENT\r\nUID:weekly\r\nDTSTART;TZID=Asia/Tokyo:20260804T220000\r\nDTEND;TZID=Asia/Tokyo:20260804T230000\r\n"
+    "RRULE:FREQ=WEEKLY;COUNT=4\r\nEXDATE;TZID=Asia/Tokyo:20260811T220000\r\nSUMMARY:技術集会\r\nEND:VEVENT\r\n"
+    "BEGIN:VEVENT\r\nUID:weekly\r\nRECURRENCE-ID;TZID=Asia/Tokyo:20260818T220000\r\nDTSTART;TZID=Asia/Tokyo:20260818T230000\r\n"
+    "DTEND;TZID=Asia/Tokyo:20260819T000000\r\nSUMMARY:技術集会（時間変更）\r\nEND:VEVENT\r\n"
+    "END:VCALENDAR\r\n"
+)
+
+
+def test_unfold_is_incremental_across_chunk_and_utf8_boundaries():
+    payload = "SUMMARY:長い\r\n 説明\r\nLOCATION:VRChat\r\n".encode()
+    chunks = [payload[index : index + 3] for index in range(0, len(payload), 3)]
+    assert list(iter_unfolded_lines(chunks)) == ["SUMMARY:長い説明", "LOCATION:VRChat"]
+
+
+def test_occurrences_are_generated_lazily():
+    def chunks():
+        yield WEEKLY.encode()
+        raise AssertionError("engine read past the first occurrence")
+
+    first = next(iter_occurrences(chunks(), window_start=datetime(2026, 8, 1, tzinfo=UTC), window_end=datetime(2026, 9, 1, tzinfo=UTC)))
+    assert first.start == datetime(2026, 8, 4, 13, tzinfo=UTC)
+    assert first.recurring and not first.override
+
+
+def test_core_parse_ics_expands_rrule_with_exdate_and_recurrence_override():
+    events = parse_ics(WEEKLY.encode(), "hub", "2026-08-03T00:00:00Z")
+    assert [(event.starts_at, event.title) for event in events] == [
+        ("2026-08-04T13:00:00Z", "技術集会"),
+        ("2026-08-18T14:00:00Z", "技術集会（時間変更）"),
+        ("2026-08-25T13:00:00Z", "技術集会"),
+    ]
+    assert events[1].source_id == "weekly:2026-08-18T13:00:00Z"
+    assert events[1].ends_at == "2026-08-18T15:00:00Z"
+
+
+def weekly_new_york(rule: str) -> str:
+    return (
+        "BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nUID:ny\r\nDTSTART;TZID=America/New_York:20261025T200000\r\n"
+        f"DTEND;TZID=America/New_York:20261025T210000\r\nRRULE:{rule}\r\nSUMMARY:Meetup\r\nEND:VEVENT\r\nEND:VCALENDAR\r\n"
+    )
+
+
+def test_rrule_keeps_local_wall_clock_across_dst_end():
+    occurrences = list(iter_occurrences(weekly_new_york("FREQ=WEEKLY;COUNT=2")))
+    assert [occurrence.start for occurrence in occurrences] == [datetime(2026, 10, 26, 0, tzinfo=UTC), datetime(2026, 11, 2, 1, tzinfo=UTC)]
+    assert occurrences[1].end == datetime(2026, 11, 2, 2, tzinfo=UTC)
+
+
+def test_floating_until_with_zoned_dtstart_still_expands_the_series():
+    occurrences = list(iter_occurrences(weekly_new_york("FREQ=WEEKLY;UNTIL=20261108T200000")))
+    assert [occurrence.start for occurrence in occurrences] == [
+        datetime(2026, 10, 26, 0, tzinfo=UTC),
+        datetime(2026, 11, 2, 1, tzinfo=UTC),
+        datetime(2026, 11, 9, 1, tzinfo=UTC),
+    ]
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from cast_event_cal import pipeline
+from cast_event_cal.core import Event
+
+
+def fake_calendar(state, options):
+    event = Event(id="a", title="Cast night", starts_at="2026-08-02T12:00:00Z", source="manual").normalized()
+    state.document = {"schema_version": "2.0", "generated_at": "2026-08-01T00:00:00Z", "count": 1, "events": [event.as_dict()]}
+    state.health = {"status": "ok", "event_count": 1}
+    state.calendar = [event]
+
+
+def tag(name):
+    def stage(state, options):
+        state.document["events"] = [{**row, "stages": [*row.get("stages", []), name]} for row in state.document["events"]]
+
+    return stage
+
+
+@pytest.fixture
+def stages(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    registry = {"calendar": fake_calendar, "enrich": tag("enrich"), "dedup": tag("dedup"), "frontend": tag("frontend")}
+    monkeypatch.setattr(pipeline, "STAGES", registry)
+    return registry
+
+
+def read_events(tmp_path):
+    return json.loads((tmp_path / "public" / "events.json").read_text(encoding="utf-8"))
+
+
+def test_pipeline_passes_one_document_between_stages_and_writes_once(tmp_path, stages, monkeypatch):
+    writes = []
+    original = pipeline.write_state
+    monkeypatch.setattr(pipeline, "write_state", lambda state: writes.append(1) or original(state))
+    assert pipeline.run_pipeline(pipeline.PipelineOptions()) == 0
+    assert len(writes) == 1
+    assert read_events(tmp_path)["events"][0]["stages"] == ["enrich", "dedup", "frontend"]
+    assert "SUMMARY:Cast night" in (tmp_path / "public" / "calendar.ics").read_text(encoding="utf-8")
+    assert json.loads((tmp_path / "public" / "health.json").read_text(encoding="utf-8"))["status"] == "ok"
+
+
+def test_pipeline_checkpoints_and_resumes_from_named_stage(tmp_path, stages):
+    assert pipeline.run_pipeline(pipeline.PipelineOptions(), stop="enrich", checkpoints=["calendar"]) == 0
+    assert read_events(tmp_path)["events"][0]["stages"] == ["enrich"]
+    calendar = (tmp_path / "public" / "calendar.ics").read_bytes()
+
+    assert pipeline.run_pipeline(pipeline.PipelineOptions(), start="dedup") == 0
+    assert read_events(tmp_path)["events"][0]["stages"] == ["enrich", "dedup", "frontend"]
+    assert (tmp_path / "public" / "calendar.ics").read_bytes() == calendar
+
+
+def test_failed_stage_leaves_the_last_checkpoint_on_disk(tmp_path, stages, caplog):
+    def broken(state, options):
+        state.document["events"] = []
+        raise RuntimeError("boom")
+
+    stages["dedup"] = broken
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline(pipeline.PipelineOptions())
+    assert not (tmp_path / "public" / "events.json").exists()
+    assert "resume with --from calendar" in caplog.text
+
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline(pipeline.PipelineOptions(), checkpoints=["enrich"])
+    assert read_events(tmp_path)["events"][0]["stages"] == ["enrich"]
+    assert "resume with --from dedup" in caplog.text
+
+    def mutating(state, options):
+        state.document["events"][0]["title"] = "half-updated"
+        state.document["events"][0]["stages"].append("frontend")
+        raise RuntimeError("boom")
+
+    stages["dedup"] = stages["frontend"] = mutating
+    with pytest.raises(RuntimeError):
+        pipeline.run_pipeline(pipeline.PipelineOptions(), start="dedup")
+    assert read_events(tmp_path)["events"][0]["title"] == "Cast night"
+    assert read_events(tmp_path)["events"][0]["stages"] == ["enrich"]
+    with pytest.raises(ValueError, match="unknown pipeline stage"):
+        pipeline.select_stages("render")
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import json
+
+from cast_event_cal import profiling
+
+
+def busy() -> int:
+    return sum(index * index for index in range(20000))
+
+
+def test_disabled_profiling_records_nothing(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv(profiling.PROFILE_ENV, raising=False)
+    monkeypatch.setattr(profiling, "_enabled", None)
+    with profiling.profile_stage("dedup") as row:
+        busy()
+    assert row == {"stage": "dedup"}
+    assert not (tmp_path / "public").exists()
+
+
+def test_profiled_stage_writes_timings_and_rolling_history(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv(profiling.PROFILE_ENV, "1")
+    monkeypatch.setattr(profiling, "_enabled", None)
+    monkeypatch.setattr(profiling, "HISTORY_LIMIT", 3)
+    for _ in range(4):
+        with profiling.profile_stage("ontology") as row:
+            row["item_count"] = 12
+            busy()
+    assert profiling.run_profiled("frontend", busy) == busy()
+
+    timings = json.loads((tmp_path / "public" / "pipeline-timings.json").read_text(encoding="utf-8"))
+    assert set(timings["stages"]) == {"ontology", "frontend"}
+    stage = timings["stages"]["ontology"]
+    assert stage["item_count"] == 12
+    assert stage["wall_ms"] >= 0 and stage["cpu_ms"] >= 0 and stage["peak_rss_kb"] > 0
+    assert any("busy" in row["function"] for row in stage["top_functions"])
+
+    history = (tmp_path / "public" / "pipeline-timings-history.jsonl").read_text(encoding="utf-8").splitlines()
+    assert len(history) == 3
+    assert [json.loads(line)["stage"] for line in history] == ["ontology", "ontology", "frontend"]
+    assert all("top_functions" not in json.loads(line) for line in history)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cast_event_cal import sessions
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    peers: list[tuple[int, str]] = []
+
+    def do_GET(self):
+        self.peers.append((self.client_address[1], self.headers.get("User-Agent", "")))
+        body = b"ok"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_sessions_are_shared_per_policy_and_recreated_after_close(monkeypatch):
+    monkeypatch.delenv(sessions.HTTP2_ENV, raising=False)
+    sessions.close_sessions()
+    first = sessions.session(timeout=5)
+    assert sessions.session(timeout=5) is first
+    assert sessions.session(timeout=5, headers={"Cookie": "auth=x"}) is not first
+    assert first.headers["User-Agent"] == sessions.DEFAULT_USER_AGENT
+    assert sessions.http2_enabled() is False
+    sessions.close_sessions()
+    assert first.is_closed
+    assert sessions.session(timeout=5) is not first
+
+
+def test_repeated_requests_reuse_one_keep_alive_connection():
+    Handler.peers = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        client = sessions.session(timeout=5, user_agent="cast-event-cal-test")
+        for path in ("/a", "/b", "/c"):
+            assert client.get(f"http://127.0.0.1:{server.server_port}{path}").text == "ok"
+    finally:
+        sessions.close_sessions()
+        server.shutdown()
+        server.server_close()
+    assert len({port for port, _agent in Handler.peers}) == 1
+    assert {agent for _port, agent in Handler.peers} == {"cast-event-cal-test"}
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta, timezone
+
+from dateutil import parser as date_parser
+
+from cast_event_cal import timestamps
+
+
+def test_fast_path_matches_dateutil_for_canonical_and_offset_forms():
+    for value in ("2026-08-02T12:00:00Z", "2026-08-02T21:00:00+09:00", "2026-08-02T21:00:00.250000+09:00", "2026-08-02T21:00"):
+        expected = date_parser.isoparse(value)
+        if expected.tzinfo is None:
+            expected = expected.replace(tzinfo=timestamps.JST)
+        assert timestamps.parse_instant(value) == expected.astimezone(UTC)
+        assert timestamps.parse_instant(value).tzinfo is UTC
+
+
+def test_naive_values_use_requested_default_timezone():
+    assert timestamps.parse_instant("2026-08-02T21:00:00") == datetime(2026, 8, 2, 12, tzinfo=UTC)
+    assert timestamps.parse_instant("2026-08-02T21:00:00", default_timezone="UTC") == datetime(2026, 8, 2, 21, tzinfo=UTC)
+    assert timestamps.parse_instant(datetime(2026, 8, 2, 21, tzinfo=timezone(timedelta(hours=9)))) == datetime(2026, 8, 2, 12, tzinfo=UTC)
+
+
+def test_invalid_values_are_none_and_repeats_are_memoized():
+    assert timestamps.try_parse_instant("") is None
+    assert timestamps.try_parse_instant("not a date") is None
+    before = timestamps.cache_info()["hits"]
+    timestamps.parse_instant("2031-01-02T03:04:05Z")
+    timestamps.parse_instant("2031-01-02T03:04:05Z")
+    assert timestamps.cache_info()["hits"] == before + 1
+
+
+def test_jst_date_key_crosses_utc_midnight():
+    assert timestamps.jst_date_key("2026-08-02T15:30:00Z") == "2026-08-03"
+    assert timestamps.format_instant(timestamps.parse_instant("2026-08-03T00:30:00+09:00")) == "2026-08-02T15:30:00Z"
@@ -1,5 +1,9 @@
+import json
 from datetime import UTC, datetime
 
+import pytest
+
+from scripts import yahoo_parallel
 from scripts.collect_yahoo_corpus import configure_classifier
 from scripts.reclassify_yahoo_archive import reclassify
 
@@ -76,3 +80,31 @@ def test_missing_datetime_remains_rejected():
     )
     assert accepted == []
     assert rejected[0]["reason"] == "missing_datetime"
+
+
+def test_worker_processes_match_the_serial_pass_byte_for_byte(monkeypatch):
+    configure_classifier()
+    history = [
+        row(text, retweets=retweets, status_id=f"20800000000000000{index:02d}")
+        for index, (text, retweets) in enumerate(
+            [
+                ("2026/8/7 22:00 VRChatイベント開催。参加方法はGroup+へJOIN", 0),
+                ("2026/7/20 22:00 VRC交流イベント開催。参加方法はJOIN", 1),
+                ("2026/8/7 22:00 VRChat向け商品プレゼント。フォロー＆RPで抽選応募", 20),
+                ("VRChat交流イベント開催。参加方法はGroup+へJOIN", 5),
+                ("2026/8/7 22:00 VRChat集会開催。参加方法はJOIN", 5),
+            ]
+            * 3
+        )
+    ]
+    options = {"actual_now": datetime(2026, 8, 3, tzinfo=UTC), "x_ids": {"2080000000000000004"}}
+
+    serial = reclassify(history, **options)
+    parallel = reclassify(history, workers=2, **options)
+
+    assert json.dumps(parallel, ensure_ascii=False) == json.dumps(serial, ensure_ascii=False)
+
+    # Without fork a worker cannot inherit the patched classifier, so it must be told how to rebuild it.
+    monkeypatch.setattr(yahoo_parallel.multiprocessing, "get_all_start_methods", lambda: ["spawn"])
+    with pytest.raises(ValueError, match="installer"):
+        reclassify(history, workers=2, **options)
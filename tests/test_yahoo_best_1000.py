@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
 from scripts import collect_yahoo_corpus as corpus
 from scripts.run_yahoo_best_1000 import (
     ALLOWED_STRUCTURED_GROUPS,
+    Checkpoint,
     build_best_query_plan,
+    plan_fingerprint,
+    query_index,
+    query_metrics,
     select_exact_target,
 )
 
+NOW = datetime(2026, 8, 3, tzinfo=UTC)
+
 
 def test_best_plan_starts_with_ablation_winner_and_complements() -> None:
     config = corpus.read_json(corpus.CONFIG_PATH, {})
@@ -44,3 +54,85 @@ def test_exact_target_prefers_earlier_queries_then_retweets() -> None:
     ]
     selected = select_exact_target(rows, plan, 2)
     assert [row["status_id"] for row in selected] == ["1", "2"]
+
+
+def shard_plan(count: int) -> list[dict[str, str]]:
+    return [
+        {"key": f"q{index}", "group": "g", "term": f"t{index}", "query": f"VRChat {index}", "url": f"https://search.yahoo.co.jp/realtime/search?p=q{index}"}
+        for index in range(count)
+    ]
+
+
+def fake_fetch(calls):
+    def fetch(url):
+        index = int(url.rsplit("q", 1)[1])
+        calls.append(index)
+        ids = [2080000000000000000 + index, 2080000000000000000 + index + 1]
+        return ",".join(str(value) for value in ids), 200, url
+
+    return fetch
+
+
+def fake_extract(html):
+    return [{"status_id": value, "url": f"https://x.com/host/status/{value}", "text": f"post {value}", "retweet_count": 5} for value in html.split(",")]
+
+
+def fetch(plan, checkpoint=None):
+    observed, results, raw_total = corpus.fetch_candidates(
+        plan, set(), 100, True, 0.0, 2,
+        completed=checkpoint.completed if checkpoint else None,
+        on_result=checkpoint.record if checkpoint else None,
+    )
+    return observed, [{key: value for key, value in row.items() if key != "duration_ms"} for row in results], raw_total
+
+
+def test_interrupted_fetch_resumes_from_its_checkpoint_with_identical_output(tmp_path, monkeypatch):
+    calls: list[int] = []
+    monkeypatch.setattr(corpus.implementation, "fetch_page", fake_fetch(calls))
+    monkeypatch.setattr(corpus.implementation, "extract_candidates", fake_extract)
+    plan = shard_plan(5)
+    expected = fetch(plan)
+
+    path = tmp_path / "checkpoint.jsonl"
+    fingerprint = plan_fingerprint(plan, 100)
+    first = Checkpoint(path, fingerprint, NOW)
+    recorded = first.record
+
+    def interrupt(result, rows):
+        recorded(result, rows)
+        if result["key"] == "q2":
+            raise KeyboardInterrupt
+
+    first.record = interrupt
+    with pytest.raises(KeyboardInterrupt):
+        fetch(plan, first)
+    with path.open("a", encoding="utf-8") as handle:
+        handle.write('{"result": {"key": "q3"')
+
+    calls.clear()
+    resumed = Checkpoint(path, fingerprint, NOW + timedelta(hours=1))
+    assert resumed.started_at == NOW
+    assert sorted(resumed.completed) == ["q0", "q1", "q2"]
+    assert fetch(plan, resumed) == expected
+    assert sorted(calls) == [3, 4]
+    assert len(path.read_text(encoding="utf-8").splitlines()) == 6
+
+    assert Checkpoint(path, plan_fingerprint(plan[:4], 100), NOW).completed == {}
+    assert Checkpoint(path, fingerprint, NOW + timedelta(days=2)).completed == {}
+    resumed.clear()
+    assert not path.exists()
+
+
+def test_query_metrics_read_the_inverted_index_like_a_full_scan() -> None:
+    plan = shard_plan(3)
+    results = [{"key": query["key"], "status": "ok", "raw_candidates": 2} for query in plan[:2]]
+    evaluated = [
+        {"status_id": "1", "query_keys": ["q0", "q1", "q0"], "decision": "accepted"},
+        {"status_id": "2", "query_keys": ["q1"], "decision": "rejected"},
+        {"status_id": "3", "query_keys": ["q2"], "decision": "accepted"},
+        {"status_id": "4", "query_keys": [], "decision": "accepted"},
+    ]
+    assert query_index(evaluated) == {"q0": [0], "q1": [0, 1], "q2": [2]}
+    metrics = query_metrics(plan, results, evaluated, {"1"})
+    assert [(row["key"], row["target_candidates"], row["accepted"], row["new_to_ledger"]) for row in metrics] == [("q0", 1, 1, 0), ("q1", 2, 1, 1)]
+    assert metrics[1]["accepted_rate"] == 0.5
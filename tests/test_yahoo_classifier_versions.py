@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+import pytest
+
+from scripts import collect_yahoo_corpus as corpus
+from scripts import fetch_yahoo_realtime as implementation
+from scripts import shadow_yahoo_classifier as shadow
+from scripts import yahoo_classifier_versions as classifier_versions
+
+NOW = datetime(2026, 8, 3, tzinfo=UTC)
+
+
+def row(text: str, status_id: str, *, retweets: int = 5):
+    return {
+        "status_id": status_id,
+        "url": f"https://x.com/host/status/{status_id}",
+        "text": text,
+        "author": "host",
+        "retweet_count": retweets,
+        "first_seen_at": "2026-08-01T00:00:00Z",
+        "last_seen_at": "2026-08-02T00:00:00Z",
+    }
+
+
+def test_activation_installs_one_version_and_restores_the_previous_globals():
+    outer = classifier_versions.snapshot()
+    with classifier_versions.activated("1.4"):
+        before = classifier_versions.snapshot()
+        with classifier_versions.activated("1.9") as version:
+            assert version.pipeline == "reclassify"
+            assert implementation.PARSER_VERSION == "1.9"
+            assert implementation.classify == version.classify
+            assert corpus.refined_candidate_to_event == version.candidate_to_event
+            assert corpus.TERM_RULES == "1.8"
+        assert classifier_versions.snapshot() == before
+        assert implementation.PARSER_VERSION == "1.4"
+    assert classifier_versions.snapshot() == outer
+
+    with classifier_versions.activated("1.8"):
+        first = corpus.refined_candidate_to_event
+    with classifier_versions.activated("1.8"):
+        assert corpus.refined_candidate_to_event == first
+
+    with pytest.raises(ValueError, match="unknown Yahoo classifier version"):
+        classifier_versions.get("0.1")
+
+
+def test_versions_evaluate_one_row_side_by_side_without_installing_globals():
+    candidate = row("2026/8/7 22:00 VRChatイベント開催。参加方法はGroup+へJOIN", "2080000000000000001")
+    before = classifier_versions.snapshot()
+    context = classifier_versions.RowContext()
+    events = {
+        name: classifier_versions.get(name).candidate_to_event(candidate, now=NOW, min_retweets=3, x_ids=set(), context=context)[0]
+        for name in ("1.4", "1.8", "1.9")
+    }
+
+    assert classifier_versions.snapshot() == before
+    assert {event["starts_at"] for event in events.values()} == {"2026-08-07T13:00:00Z"}
+    assert events["1.8"]["date_resolution_method"] == "explicit_calendar_date"
+    assert "date_resolution_method" not in events["1.9"]
+    assert len(context.texts) == 1
+    assert {rules for rules, _text in context.terms} == {"1.8"}
+
+
+def test_shadow_reports_decision_transitions_against_production():
+    history = [
+        row("2026/8/7 22:00 VRChatイベント開催。参加方法はGroup+へJOIN", "2080000000000000001"),
+        row("2026/7/20 22:00 VRC交流イベント開催。参加方法はJOIN", "2080000000000000002"),
+        row("2026/8/7 22:00 VRChat向け商品プレゼント。フォロー＆RPで抽選応募", "2080000000000000003", retweets=20),
+    ]
+    before = classifier_versions.snapshot()
+    report = shadow.shadow(history, production="1.9", candidates=["1.8"], actual_now=NOW, x_ids=set())
+
+    assert classifier_versions.snapshot() == before
+    assert report["production_version"] == "1.9"
+    assert report["versions"]["1.9"]["accepted_count"] == 2
+    assert report["versions"]["1.8"]["rejection_reason_counts"] == {"giveaway_only": 1, "past_event": 1}
+    diff = report["diffs"]["1.8"]
+    assert diff["transition_counts"] == {"accepted -> rejected:past_event": 1}
+    assert diff["newly_rejected_count"] == 1
+    assert diff["examples"][0]["status_id"] == "2080000000000000002"
+    assert diff["examples"][0]["production"]["starts_at"] == "2026-07-20T13:00:00Z"
+
+
+def test_shadow_evaluates_each_row_under_every_version_with_one_context(monkeypatch):
+    contexts = []
+    original = shadow.PIPELINES["refine"]
+
+    def record(row, version, context, **options):
+        contexts.append(context)
+        return original(row, version, context, **options)
+
+    monkeypatch.setitem(shadow.PIPELINES, "refine", record)
+    monkeypatch.setitem(shadow.PIPELINES, "reclassify", record)
+    history = [row("2026/8/7 22:00 VRChatイベント開催。参加方法はJOIN", f"208000000000000000{index}") for index in (1, 2)]
+    shadow.shadow(history, production="1.9", candidates=["1.8"], actual_now=NOW, x_ids=set())
+
+    assert len(contexts) == 4
+    assert contexts[0] is contexts[1] and contexts[2] is contexts[3] and contexts[0] is not contexts[2]
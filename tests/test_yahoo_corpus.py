@@ -1,9 +1,15 @@
+import time
 from datetime import UTC, datetime
 
+from scripts import collect_yahoo_corpus as corpus
 from scripts.collect_yahoo_corpus import (
     NEXT_MONTH_CONFLICT_RE,
+    TermMatcher,
+    TokenBucket,
     build_query_plan,
+    classifier_term_groups,
     configure_classifier,
+    has_any,
     merge_provenance,
     read_json,
     refined_candidate_to_event,
@@ -152,3 +158,162 @@ def test_host_event_abbreviation_with_explicit_schedule_is_accepted():
     assert reason is None
     assert event is not None
     assert event["starts_at"] == "2026-08-15T13:00:00Z"
+
+
+def test_parallel_shard_fetch_keeps_sequential_rows_and_merge_order(monkeypatch):
+    plan = [
+        {"key": f"q{index}", "group": "core", "term": f"term{index}", "url": f"https://search.yahoo.co.jp/realtime/search?p={index}"}
+        for index in range(8)
+    ]
+
+    def fake_fetch(url):
+        index = int(url.rsplit("=", 1)[1])
+        time.sleep(0.05 if index % 2 else 0.01)
+        if index == 5:
+            raise RuntimeError("response too small: 10 bytes")
+        return str(index), 200, url
+
+    def fake_extract(html):
+        index = int(html)
+        return [{"status_id": str(1234567890123456780 + value), "text": f"{index}", "retweet_count": index} for value in (index, index + 1)]
+
+    monkeypatch.setattr(corpus.implementation, "fetch_page", fake_fetch)
+    monkeypatch.setattr(corpus.implementation, "extract_candidates", fake_extract)
+
+    def strip(results):
+        return [{key: value for key, value in row.items() if key != "duration_ms"} for row in results]
+
+    started = time.monotonic()
+    sequential = corpus.fetch_candidates(plan, set(), 100, False, 0.0, workers=1)
+    sequential_seconds = time.monotonic() - started
+    started = time.monotonic()
+    parallel = corpus.fetch_candidates(plan, set(), 100, False, 0.0, workers=8)
+    parallel_seconds = time.monotonic() - started
+
+    assert parallel[0] == sequential[0]
+    assert strip(parallel[1]) == strip(sequential[1])
+    assert parallel[2] == sequential[2] == 14
+    assert [row["key"] for row in parallel[1]] == [row["key"] for row in plan]
+    assert [row["unique_candidates_after_query"] for row in parallel[1]] == [2, 3, 4, 5, 6, 6, 8, 9]
+    assert list(parallel[1][0]) == ["key", "group", "term", "status", "http_status", "final_url", "html_bytes", "raw_candidates", "unique_candidates_after_query", "duration_ms"]
+    assert parallel[1][5]["status"] == "failed"
+    assert parallel_seconds < sequential_seconds
+
+    stopped = corpus.fetch_candidates(plan, set(), 4, True, 0.0, workers=4)
+    assert [row["key"] for row in stopped[1]] == ["q0", "q1", "q2"]
+
+
+def test_token_bucket_spaces_requests_at_configured_rate():
+    bucket = TokenBucket(20.0)
+    started = time.monotonic()
+    for _ in range(5):
+        bucket.acquire()
+    assert time.monotonic() - started >= 0.19
+    unlimited = TokenBucket(0.0)
+    started = time.monotonic()
+    for _ in range(100):
+        unlimited.acquire()
+    assert time.monotonic() - started < 0.05
+
+
+def test_compiled_term_matcher_reports_the_same_groups_as_linear_scans():
+    groups = classifier_term_groups()
+    matcher = TermMatcher.build(groups)
+    terms = sorted({term for values in groups.values() for term in values})
+    texts = [
+        "",
+        "【VRC俺確】8/7 22:00 VRChatイベント告知。JOINはGroup+から、お待ちしております",
+        "BOOTHで衣装を販売開始！フォロー＆RPでプレゼント #VRChat",
+        "誕生日インスタンスを開催 YouTube配信もあります",
+        *terms,
+        *(term.upper() for term in terms),
+        "".join(terms),
+    ]
+    for text in texts:
+        expected = frozenset(name for name, values in groups.items() if has_any(text, values))
+        assert matcher.matches(text) == expected, text
+    assert TermMatcher.build({}).matches("anything") == frozenset()
+
+
+def test_bandit_schedule_favours_productive_shards_and_keeps_quotas():
+    plan = build_query_plan(read_json(__import__("pathlib").Path("config/yahoo_query_terms.json"), {}))
+    base, production, audit = corpus.partition_plan(plan)
+    now = datetime(2026, 8, 3, tzinfo=UTC)
+    productive, barren = production[0]["key"], production[1]["key"]
+    runs = [
+        {"query_key": key, "observed_at": f"2026-07-{day:02d}T00:00:00Z", "raw_count": 20, "new_count": 8, "accepted_new_count": accepted}
+        for day in range(21, 31)
+        for key, accepted in ((productive, 4), (barren, 0))
+    ] + [
+        {"query_key": row["key"], "observed_at": "2026-07-20T00:00:00Z", "raw_count": 20, "new_count": 1, "accepted_new_count": 0}
+        for row in production[5:]
+    ]
+    selected, schedule = corpus.select_bandit_plan(plan, now, 18, runs=runs, precisions={productive: 0.1, barren: 0.1})
+
+    assert selected[: len(base)] == base
+    assert len(selected) == len(base) + 18
+    assert schedule["exploitation"][0]["key"] == productive
+    assert barren not in {row["key"] for row in schedule["exploitation"]}
+    assert sorted(schedule["exploration"]) == sorted(row["key"] for row in production[2:5])
+    assert [row["key"] for row in selected[-2:]] == schedule["audit"]
+    assert {row["group"] for row in selected[-2:]} <= corpus.AUDIT_GROUPS
+    assert corpus.select_bandit_plan(plan, now, 18, runs=runs, precisions={})[1]["exploration"] == schedule["exploration"]
+
+    rotated = corpus.select_daily_plan(plan, now, 18)
+    ordinal = corpus.jst_date(now).toordinal()
+    offset = (ordinal * 16) % len(production)
+    assert rotated == base + (production[offset:] + production[:offset])[:16] + corpus.rotate(audit, ordinal, 2)
+
+
+def test_shard_runs_credit_new_and_newly_accepted_rows_to_each_shard():
+    observed = [
+        {"status_id": "1", "query_keys": ["a", "b"]},
+        {"status_id": "2", "query_keys": ["a"]},
+        {"status_id": "3", "query_keys": ["b"]},
+    ]
+    evaluated = [{"status_id": "1", "last_decision": "accepted"}, {"status_id": "3", "last_decision": "accepted"}]
+    results = [
+        {"key": "a", "status": "ok", "raw_candidates": 5},
+        {"key": "b", "status": "ok", "raw_candidates": 4},
+        {"key": "c", "status": "failed", "raw_candidates": 0},
+    ]
+    runs = corpus.shard_runs(results, observed, evaluated, {"3"}, datetime(2026, 8, 3, tzinfo=UTC))
+    assert [(run["query_key"], run["raw_count"], run["new_count"], run["accepted_new_count"]) for run in runs] == [
+        ("a", 5, 2, 1),
+        ("b", 4, 1, 1),
+    ]
+
+
+def test_low_novelty_shards_back_off_and_record_their_skip():
+    plan = [
+        {"key": "base-000", "group": "base", "term": "VRChat", "query": "VRChat"},
+        {"key": "core-000", "group": "core", "term": "開催", "query": "開催"},
+        {"key": "core-001", "group": "core", "term": "告知", "query": "告知"},
+        {"key": "audit-000", "group": "temporal_audit", "term": "昨日", "query": "昨日"},
+    ]
+
+    def run(key: str, day: int, new: int) -> dict[str, object]:
+        return {"query_key": key, "observed_at": f"2026-08-{day:02d}T00:00:00Z", "raw_count": 40, "new_count": new, "accepted_new_count": 0}
+
+    runs = [run(key, day, 0) for key in ("base-000", "core-000", "audit-000") for day in (1, 2, 3)]
+    runs += [run("core-001", 1, 0), run("core-001", 2, 0), run("core-001", 3, 12)]
+    novelty = corpus.shard_novelty(runs)
+    assert novelty["core-000"]["novelty"] == 0.0
+    assert novelty["core-000"]["low_novelty_streak"] == 3
+    assert novelty["core-001"]["novelty"] == 0.1
+
+    kept, skipped = corpus.novelty_backoff(plan, runs, datetime(2026, 8, 5, tzinfo=UTC))
+    assert [query["key"] for query in kept] == ["base-000", "core-001", "audit-000"]
+    assert skipped == [{
+        "key": "core-000", "group": "core", "term": "開催", "status": "skipped", "reason": "low_novelty",
+        "raw_candidates": 0, "novelty": 0.0, "novelty_requests": 3, "backoff_days": 4, "retry_at": "2026-08-07T00:00:00Z",
+    }]
+    kept, skipped = corpus.novelty_backoff(plan, runs, datetime(2026, 8, 7, tzinfo=UTC))
+    assert skipped == []
+
+    # Low over the window but productive on its latest request: no streak, so no backoff.
+    recovered = [run("core-002", 1, 0), run("core-002", 2, 0), run("core-002", 3, 3)]
+    assert corpus.shard_novelty(recovered)["core-002"]["low_novelty_streak"] == 0
+    kept, skipped = corpus.novelty_backoff([{**plan[1], "key": "core-002"}], recovered, datetime(2026, 8, 3, 12, tzinfo=UTC))
+    assert [query["key"] for query in kept] == ["core-002"]
+    assert skipped == []
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime
+
+from cast_event_cal import date_resolution as dates
+from scripts import refine_yahoo_corpus as refinement
+from scripts import yahoo_classifier_versions as classifier_versions
+from scripts.reclassify_yahoo_archive import reclassify
+from scripts.yahoo_decision_cache import DecisionCache
+
+
+def row(text: str, status_id: str, *, retweets: int = 5):
+    return {
+        "status_id": status_id,
+        "url": f"https://x.com/host/status/{status_id}",
+        "text": text,
+        "author": "host",
+        "retweet_count": retweets,
+        "first_seen_at": "2026-08-01T00:00:00Z",
+        "last_seen_at": "2026-08-02T00:00:00Z",
+    }
+
+
+HISTORY = [
+    row("2026/8/7 22:00 VRChatイベント開催。参加方法はGroup+へJOIN", "2080000000000000001"),
+    row("2026/7/20 22:00 VRC交流イベント開催。参加方法はJOIN", "2080000000000000002", retweets=1),
+    row("2027/1/30 22:00 VRChatイベント開催。参加方法はJOIN", "2080000000000000003"),
+    row("VRChat交流イベント開催。参加方法はGroup+へJOIN", "2080000000000000004"),
+]
+
+
+def test_cached_reclassification_recomputes_only_the_actual_now_checks(tmp_path):
+    first_now, later_now = datetime(2026, 8, 3, tzinfo=UTC), datetime(2026, 8, 10, tzinfo=UTC)
+    with classifier_versions.activated("1.9"):
+        cache = DecisionCache(tmp_path / "reclassify.json")
+        first = reclassify(HISTORY, actual_now=first_now, x_ids=set(), cache=cache)
+        cache.save()
+        assert cache.stats() == {"hits": 0, "misses": 4, "entry_count": 4}
+        assert first == reclassify(HISTORY, actual_now=first_now, x_ids=set())
+        assert [item["reason"] for item in first[1]] == ["missing_datetime", "too_far_future_now"]
+
+        reloaded = DecisionCache(tmp_path / "reclassify.json")
+        later = reclassify(HISTORY, actual_now=later_now, x_ids=set(), cache=reloaded)
+        assert reloaded.stats() == {"hits": 4, "misses": 0, "entry_count": 4}
+        assert later == reclassify(HISTORY, actual_now=later_now, x_ids=set())
+        assert [event["temporal_status"] for event in later[0]] == ["past", "past", "upcoming"]
+        assert [item["reason"] for item in later[1]] == ["missing_datetime"]
+
+        edited = [*HISTORY[:-1], {**HISTORY[-1], "retweet_count": 9}]
+        reclassify(edited, actual_now=later_now, x_ids={"2080000000000000001"}, cache=reloaded)
+        assert reloaded.misses == 2
+
+
+def test_reclassification_batches_dates_only_for_rows_the_cache_misses(tmp_path, monkeypatch):
+    now = datetime(2026, 8, 3, tzinfo=UTC)
+    batches = []
+    original = dates.resolve_many
+
+    def record(texts, anchors, **options):
+        texts = list(texts)
+        batches.append(len(texts))
+        return original(texts, anchors, **options)
+
+    monkeypatch.setattr(dates, "resolve_many", record)
+    with classifier_versions.activated("1.9") as version:
+        cache = DecisionCache(tmp_path / "reclassify.json")
+        batched = reclassify(HISTORY, actual_now=now, x_ids=set(), cache=cache, version=version)
+        assert batched == reclassify(HISTORY, actual_now=now, x_ids=set())
+        reclassify(HISTORY, actual_now=now, x_ids=set(), cache=cache, version=version)
+    assert batches == [4, 0]
+    assert cache.stats()["misses"] == 4
+
+
+def test_cached_refinement_still_rejects_events_that_became_past(tmp_path):
+    with classifier_versions.activated("1.8"):
+        cache = DecisionCache(tmp_path / "refine.json")
+        upcoming = refinement.reevaluate_with_source_time(HISTORY[:1], actual_now=datetime(2026, 8, 3, tzinfo=UTC), min_retweets=3, x_ids=set(), cache=cache)
+        past = refinement.reevaluate_with_source_time(HISTORY[:1], actual_now=datetime(2026, 8, 10, tzinfo=UTC), min_retweets=3, x_ids=set(), cache=cache)
+    assert len(upcoming[0]) == 1
+    assert past[0] == []
+    assert past[1][0]["reason"] == "past_event_now"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entry_count": 1}
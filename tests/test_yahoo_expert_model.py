@@ -62,3 +62,23 @@ def test_negative_reasons_are_metrics_not_hard_exclusions() -> None:
     assert expert["eligible"] is True
     assert expert["top_rejection_reasons"]["product_only"] == 30
     assert "product_only" not in model.get("recommended_query_keys", [])
+
+
+def test_greedy_ensemble_adds_experts_by_marginal_coverage_until_target() -> None:
+    coverage = {
+        "wide": range(0, 6),
+        "tail": range(4, 8),
+        "redundant": (0, 1, 6),
+    }
+    rows = []
+    for key, ids in coverage.items():
+        rows.extend(row(f"s-{status_id}", "accepted", [key]) for status_id in ids)
+        rows.extend(row(f"{key}-r-{index}", "rejected", [key], "missing_datetime") for index in range(4))
+    model = build_model(rows, minimum_support=3, minimum_accepted=2, minimum_wilson_precision=0.0)
+
+    assert model["promoted_expert_count"] == 3
+    assert [(item["query_key"], item["marginal_accepted_count"]) for item in model["greedy_ensemble"]] == [("wide", 6), ("tail", 2)]
+    assert model["greedy_ensemble_coverage"] == 1.0
+    ablation = {item["removed_query_key"]: item for item in model["leave_one_expert_out_ablation"]}
+    assert ablation["wide"]["unique_accepted_count"] == 2
+    assert ablation["redundant"]["unique_accepted_count"] == 0
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import json
+from datetime import UTC, datetime
+
+from scripts import collect_yahoo_corpus as corpus
+from scripts import run_yahoo_realtime as ledger
+from scripts.yahoo_ledger_store import LedgerStore, changed_rows
+
+NOW = datetime(2026, 8, 3, tzinfo=UTC)
+
+
+def row(status_id: str, last_seen_at: str, *, retweets: int = 5, keys: list[str] | None = None):
+    return {
+        "status_id": status_id,
+        "url": f"https://x.com/host/status/{status_id}",
+        "text": "2026/8/7 22:00 VRChatイベント開催。参加方法はJOIN",
+        "author": "host",
+        "retweet_count": retweets,
+        "max_retweet_count": retweets,
+        "first_seen_at": "2026-08-01T00:00:00Z",
+        "last_seen_at": last_seen_at,
+        "query_keys": keys or ["core-001"],
+        "query_groups": ["core"],
+        "query_terms": ["開催"],
+        "observation_count": 1,
+    }
+
+
+EXISTING = [
+    row("2080000000000000003", "2026-08-02T00:00:00Z"),
+    row("2080000000000000002", "2026-08-01T00:00:00Z"),
+    row("2080000000000000001", "2025-01-01T00:00:00Z"),
+]
+
+
+def open_store(tmp_path, rows):
+    history = tmp_path / "history.json"
+    history.write_text(json.dumps({"schema_version": "2.0", "candidates": rows}), encoding="utf-8")
+    return LedgerStore(tmp_path / "ledger.sqlite3", history, tmp_path / "shard-runs.json")
+
+
+def test_store_is_the_source_of_truth_and_exports_only_changed_rows(tmp_path):
+    history = tmp_path / "history.json"
+    with open_store(tmp_path, EXISTING) as store:
+        assert store.payload() == {"schema_version": "2.0", "candidates": EXISTING}
+        original = history.read_bytes()
+        assert not store.export({"schema_version": "2.0", "generated_at": "2026-08-03T00:00:00Z"})
+        assert history.read_bytes() == original
+
+        evaluated = [EXISTING[0], {**EXISTING[1], "last_decision": "accepted"}, EXISTING[2]]
+        assert changed_rows(EXISTING, evaluated) == [evaluated[1]]
+        store.write(changed_rows(EXISTING, evaluated))
+        assert store.export({"schema_version": "2.0", "generated_at": "2026-08-03T00:00:00Z"})
+        assert store.stats() | {"row_count": 0} == {"imported": 3, "upserted": 0, "written": 1, "pruned": 0, "exported": 1, "row_count": 0}
+    assert json.loads(history.read_text(encoding="utf-8"))["candidates"] == evaluated
+
+    with LedgerStore(tmp_path / "ledger.sqlite3", history) as store:
+        assert store.stats()["imported"] == 0
+        assert store.rows() == evaluated
+        assert not store.export({"schema_version": "2.0", "generated_at": "2026-08-04T00:00:00Z"})
+
+    # A script writing the JSON directly changes its size, so the next open imports it again.
+    edited = {"schema_version": "2.1", "candidates": EXISTING[1:2]}
+    history.write_text(json.dumps(edited), encoding="utf-8")
+    with LedgerStore(tmp_path / "ledger.sqlite3", history) as store:
+        assert store.stats()["imported"] == 1
+        assert store.payload() == edited
+
+
+def test_observing_rewrites_only_observed_rows_and_matches_the_list_merge_for_them(tmp_path):
+    observed = [
+        {**row("2080000000000000002", "", retweets=9, keys=["access-001"]), "query_groups": ["access"], "query_terms": ["JOIN"]},
+        row("2080000000000000004", "", retweets=2),
+    ]
+    expected = corpus.merge_provenance(ledger.merge_history(EXISTING, observed, NOW), EXISTING, observed, NOW)
+    with open_store(tmp_path, EXISTING) as store:
+        rows = corpus.observe_in_store(store, observed, NOW)
+        stats = store.stats()
+    assert rows[:2] == expected[:2]
+    assert rows[2] == EXISTING[0]
+    assert [item["status_id"] for item in rows] == ["2080000000000000004", "2080000000000000002", "2080000000000000003"]
+    assert rows[1]["query_keys"] == ["access-001", "core-001"]
+    assert rows[1]["observation_count"] == 2
+    assert stats["upserted"] == 2
+    assert stats["pruned"] == 1
+    assert stats["row_count"] == 3
+
+    capped = tmp_path / "capped"
+    capped.mkdir()
+    with open_store(capped, EXISTING) as store:
+        assert corpus.observe_in_store(store, observed, NOW, maximum=2) == expected[:2]
+        assert store.count() == 2
+
+
+def test_seeding_only_adds_status_ids_the_ledger_never_held(tmp_path):
+    rejected = [{**row("2080000000000000003", "", retweets=1), "text": "excerpt"}, row("2080000000000000005", "")]
+    with open_store(tmp_path, EXISTING) as store:
+        assert corpus.seed_store(store, rejected, NOW) == 1
+        seeded = store.get(["2080000000000000003", "2080000000000000005"])
+    assert seeded["2080000000000000003"] == EXISTING[0]
+    assert seeded["2080000000000000005"]["last_seen_at"] == "2026-08-03T00:00:00Z"
+    assert seeded["2080000000000000005"]["observation_count"] == 0
+
+
+def test_shard_runs_are_kept_for_the_scheduler_window_only(tmp_path):
+    run = {"query_key": "core-000", "raw_count": 20, "new_count": 3, "accepted_new_count": 1}
+    with open_store(tmp_path, EXISTING) as store:
+        store.record_shard_runs([{**run, "observed_at": "2026-07-01T00:00:00Z"}], keep_after=datetime(2026, 6, 1, tzinfo=UTC))
+        store.record_shard_runs([{**run, "observed_at": "2026-08-01T00:00:00Z"}], keep_after=datetime(2026, 7, 15, tzinfo=UTC))
+        assert store.shard_runs(datetime(2026, 6, 1, tzinfo=UTC)) == [{**run, "observed_at": "2026-08-01T00:00:00Z"}]
+        assert store.shard_runs(datetime(2026, 8, 2, tzinfo=UTC)) == []
+    exported = json.loads((tmp_path / "shard-runs.json").read_text(encoding="utf-8"))
+    assert exported["runs"] == [{**run, "observed_at": "2026-08-01T00:00:00Z"}]
+
+    # A lost or evicted SQLite store starts again from the committed JSON rather than from the priors.
+    with LedgerStore(tmp_path / "fresh.sqlite3", tmp_path / "history.json", tmp_path / "shard-runs.json") as store:
+        assert store.shard_runs(datetime(2026, 6, 1, tzinfo=UTC)) == exported["runs"]
@@ -1,6 +1,16 @@
 from datetime import UTC, datetime
 
-from scripts.build_yahoo_llm_review_queue import build_queue, needs_review
+from scripts import build_yahoo_llm_review_queue as queue
+from scripts.build_yahoo_llm_review_queue import (
+    SEGMENT_COUNT,
+    build_queue,
+    load_queue,
+    needs_review,
+    pending_reviews,
+    segment_of,
+    update_segments,
+    write_json,
+)
 
 
 def test_needs_review_keeps_only_ambiguous_cases() -> None:
@@ -42,7 +52,6 @@ def test_build_queue_deduplicates_and_excludes_resolved() -> None:
         history,
         [],
         resolved_ids={"3"},
-        previous_items={},
         now=now,
     )
     assert [item["status_id"] for item in items] == ["1"]
@@ -66,10 +75,81 @@ def test_suspicious_accepted_enters_high_priority_queue() -> None:
         history,
         suspicious,
         resolved_ids=set(),
-        previous_items={},
         now=now,
     )
     assert len(items) == 1
     assert items[0]["machine_decision"] == "accepted"
     assert items[0]["review_kind"] == "possible_false_positive"
     assert items[0]["priority"] == "high"
+
+
+def test_incremental_build_rewrites_only_segments_with_changed_decisions(tmp_path, monkeypatch) -> None:
+    first_now = datetime(2026, 8, 9, 5, 0, tzinfo=UTC)
+    later_now = datetime(2026, 8, 10, 5, 0, tzinfo=UTC)
+    history = [
+        {
+            "status_id": str(status_id),
+            "url": f"https://x.com/example/status/{status_id}",
+            "text": "VRChat event maybe tonight",
+            "last_decision": "rejected",
+            "last_reason": "missing_datetime",
+            "retweet_count": status_id,
+        }
+        for status_id in range(3, 43)
+    ]
+    legacy = {"7": {"status_id": "7", "first_queued_at": "2026-08-01T00:00:00Z"}}
+    pending = pending_reviews(history, [], resolved_ids=set())
+    segments, index, changes = update_segments(pending, root=tmp_path, manifest={}, index=None, legacy_items=legacy, now=first_now)
+    manifest = {"segment_count": SEGMENT_COUNT, "segments": segments}
+    write_json(tmp_path / "manifest.json", manifest)
+    assert changes["added"] == 39
+    assert changes["updated"] == 1
+    expected = build_queue(history, [], resolved_ids=set(), now=first_now)
+    assert load_queue(tmp_path) == [{**item, "first_queued_at": "2026-08-01T00:00:00Z"} if item["status_id"] == "7" else item for item in expected]
+    assert sorted(index) == sorted(str(status_id) for status_id in range(3, 43))
+
+    original_read = queue.read_segment
+    history[0] = {**history[0], "last_reason": "missing_participation_method"}
+    history[5] = {**history[5], "last_seen_at": "2026-08-10T00:00:00Z"}
+    read: list[str] = []
+    monkeypatch.setattr(queue, "read_segment", lambda root, segment: read.append(segment) or original_read(root, segment))
+    pending = pending_reviews(history, [], resolved_ids={"42"})
+    segments, index, changes = update_segments(pending, root=tmp_path, manifest=manifest, index=index, legacy_items={}, now=later_now)
+    monkeypatch.undo()
+    write_json(tmp_path / "manifest.json", {"segment_count": SEGMENT_COUNT, "segments": segments})
+    touched = {segment_of("3"), segment_of("42")}
+    assert sorted(read) == sorted(touched)
+    assert changes == {"updated": 1, "removed": 1, "segments_written": len(touched)}
+    items = {item["status_id"]: item for item in load_queue(tmp_path)}
+    assert "42" not in items
+    assert items["3"]["priority"] == "high"
+    assert items["3"]["first_queued_at"] == "2026-08-09T05:00:00Z"
+    assert items["3"]["last_queued_at"] == "2026-08-10T05:00:00Z"
+    assert items["7"]["first_queued_at"] == "2026-08-01T00:00:00Z"
+    assert items["7"]["last_queued_at"] == "2026-08-09T05:00:00Z"
+    assert items["8"]["last_seen_at"] is None
+    assert list(items) == [item["status_id"] for item in build_queue(history, [], resolved_ids={"42"}, now=later_now)]
+
+
+def test_main_leaves_manifest_and_index_alone_when_nothing_changed(tmp_path, monkeypatch) -> None:
+    history = [
+        {"status_id": "5", "text": "VRChat event maybe", "last_decision": "rejected", "last_reason": "missing_datetime", "retweet_count": 4}
+    ]
+    write_json(tmp_path / "history.json", {"candidates": history})
+    monkeypatch.setattr(queue, "HISTORY_PATH", tmp_path / "history.json")
+    monkeypatch.setattr(queue, "CLASSIFIER_AUDIT_PATH", tmp_path / "classifier.json")
+    monkeypatch.setattr(queue, "RESOLUTIONS_PATH", tmp_path / "resolutions.json")
+    monkeypatch.setattr(queue, "LEGACY_QUEUE_PATH", tmp_path / "legacy.json")
+    monkeypatch.setattr(queue, "AUDIT_PATH", tmp_path / "audit.json")
+    monkeypatch.setattr(queue, "QUEUE_DIR", tmp_path / "queue")
+    assert queue.main() == 0
+    manifest = (tmp_path / "queue" / "manifest.json").read_text(encoding="utf-8")
+    assert "index" not in manifest and '"status_id"' not in manifest
+    assert queue.read_index(tmp_path / "queue") == {"5": "ambiguous_rejection|rejected|missing_datetime|normal"}
+
+    written: list[str] = []
+    original_write = queue.write_json
+    monkeypatch.setattr(queue, "write_json", lambda path, payload: written.append(path.name) or original_write(path, payload))
+    assert queue.main() == 0
+    assert written == ["audit.json"]
+    assert (tmp_path / "queue" / "manifest.json").read_text(encoding="utf-8") == manifest
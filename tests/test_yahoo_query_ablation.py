@@ -1,9 +1,12 @@
 from __future__ import annotations
 
 import json
+from datetime import UTC, datetime, timedelta
 from pathlib import Path
 
 from scripts import run_yahoo_query_ablation as ablation
+from scripts import yahoo_snapshots as snapshots
+from scripts.yahoo_bitsets import union_of_others
 
 
 def test_query_plan_contains_all_logical_and_lexical_ablations() -> None:
@@ -89,5 +92,71 @@ def test_enrich_calculates_block_effects_and_incremental_accepts() -> None:
 
 def test_ratio_and_jaccard_are_zero_safe() -> None:
     assert ablation.ratio(0, 0) == 0.0
-    assert ablation.jaccard(set(), set()) == 0.0
-    assert ablation.jaccard({"1", "2"}, {"2", "3"}) == 0.333333
+    assert ablation.bit_jaccard(0, 0) == 0.0
+    assert ablation.bit_jaccard(0b011, 0b110) == 0.333333
+
+
+def test_bitset_overlap_matches_set_arithmetic() -> None:
+    variants = {
+        "a": {"1", "2", "3", "4"},
+        "b": {"3", "4", "5"},
+        "c": {"6"},
+        "d": set(),
+    }
+    results = [{"candidate_status_ids": sorted(ids)} for ids in variants.values()]
+    index = ablation.status_index(results)
+    masks = [ablation.bitset(sorted(ids), index) for ids in variants.values()]
+    sets = list(variants.values())
+
+    matrices = ablation.overlap_matrices(list(variants), masks, masks)
+    for row, left in enumerate(sets):
+        for column, right in enumerate(sets):
+            assert matrices["candidate_overlap_count"][row][column] == len(left & right)
+            assert matrices["accepted_jaccard"][row][column] == ablation.ratio(len(left & right), len(left | right))
+            assert matrices["accepted_coverage"][row][column] == ablation.ratio(len(left & right), len(right))
+    for position, (ids, union) in enumerate(zip(sets, union_of_others(masks), strict=True)):
+        others = set().union(*(other for number, other in enumerate(sets) if number != position))
+        assert union.bit_count() == len(others)
+        assert (masks[position] & ~union).bit_count() == len(ids - others)
+
+
+def test_run_reuses_snapshots_within_the_ttl_without_network(tmp_path, monkeypatch) -> None:
+    config = json.loads(Path("config/yahoo_query_ablation.json").read_text(encoding="utf-8"))
+    config["request_delay_seconds"] = 0
+    config_path = tmp_path / "config.json"
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    plan = ablation.build_query_plan(config)
+    start = datetime.now(UTC) + timedelta(days=5)
+    page = f"{start.year}/{start.month}/{start.day} 22:00 VRChatイベント開催。参加方法はJOIN"
+    fetched: list[str] = []
+
+    def extract(html: str) -> list[dict[str, object]]:
+        return [
+            {"status_id": value, "url": f"https://x.com/host/status/{value}", "text": page, "author": "host", "retweet_count": 5}
+            for value in html.split(",")
+        ]
+
+    def fetch(url: str) -> tuple[str, int, str]:
+        fetched.append(url)
+        return "2080000000000000099", 200, url
+
+    snapshot_root = tmp_path / "snapshots"
+    for position, variant in enumerate(plan):
+        html = ",".join(str(2080000000000000000 + position + offset) for offset in range(3))
+        fetched_at = datetime.now(UTC) - timedelta(hours=30 if variant["key"] == "c_only" else 1)
+        snapshots.store(variant["key"], html, url=variant["url"], http_status=200, final_url=variant["url"], fetched_at=fetched_at, root=snapshot_root)
+    monkeypatch.setattr(ablation, "PUBLIC_PATH", tmp_path / "ablation.json")
+    monkeypatch.setattr(ablation, "RAW_PATH", tmp_path / "raw.json")
+    monkeypatch.setattr(ablation.ledger, "HISTORY_PATH", tmp_path / "history.json")
+    monkeypatch.setattr(ablation.yahoo, "extract_candidates", extract)
+    monkeypatch.setattr(ablation.yahoo, "fetch_page", fetch)
+
+    payload = ablation.run(config_path, snapshot_root=snapshot_root, snapshot_ttl_hours=24)
+
+    assert payload["status"] == "ok"
+    assert payload["reused_snapshot_count"] == len(plan) - 1
+    assert fetched == [next(variant["url"] for variant in plan if variant["key"] == "c_only")]
+    assert payload["variants"][0]["content_accepted_count"] == 3
+    assert payload["variants"][0]["candidate_jaccard_with_full"] == 1.0
+    assert payload["pairwise_overlap"]["keys"][0] == "abc_full"
+    assert payload["pairwise_overlap"]["candidate_overlap_count"][0][1] == 2
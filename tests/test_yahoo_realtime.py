@@ -183,3 +183,43 @@ def test_search_url_is_pinned_to_yahoo_realtime():
     validate_search_url("https://search.yahoo.co.jp/realtime/search?ei=UTF-8&p=VRChat")
     with pytest.raises(ValueError):
         validate_search_url("https://example.com/realtime/search?p=VRChat")
+
+
+def noisy_page(count: int) -> str:
+    posts = []
+    for index in range(count):
+        status = str(1234567890123456789 + index)
+        post = {
+            "id": status if index % 3 else int(status),
+            "DisplayText" if index % 4 == 0 else "displayText": f"START 2026/8/{index % 28 + 1} 22:00 VRChatイベント{index} END",
+            "ScreenName": f"host{index}",
+            "rtCount": f"{index:,}" if index % 5 else None,
+            "url": f"https:\\/\\/x.com\\/host{index}\\/status\\/{status}" if index % 2 else f"x.com/host{index}/status/{status}",
+            "user": {"id": 42, "name": "not a post", "profile": {"text": "bio"}},
+            "media": [{"url": "https://example.com/a.png", "alt": None}],
+        }
+        posts.append({"card": post, "meta": {"tweetId": status, "text": "short"}})
+    next_data = json.dumps({"props": {"pageProps": {"timeline": {"entries": posts}}}}, ensure_ascii=False)
+    state = json.dumps({"cache": [{"statusId": "9234567890123456789", "fullText": "VRChat集会 8/9 21:00", "retweetCount": 7}]})
+    return (
+        "<!DOCTYPE html><html><head><SCRIPT src=\"/app.js\" data-x='a>b'></SCRIPT>"
+        "<script>window.x = '<script type=\"application/json\">{}</' + 'script>'</script>"
+        '<script type="application/ld+json">{"broken": </script>'
+        '<script id="preload" type="application/json"/>'
+        + "<div class=\"row\">filler</div>" * 500
+        + f'<script id="__NEXT_DATA__" type="application/json" crossorigin="anonymous">{next_data}</script >'
+        + f"<script id=__INITIAL_STATE__>{state}</script></head><body></body></html>"
+    )
+
+
+def test_targeted_extractor_matches_html_parser_reference():
+    from scripts.fetch_yahoo_realtime import extract_candidates_reference
+
+    for count in (0, 1, 7, 60):
+        page = noisy_page(count)
+        assert extract_candidates(page) == extract_candidates_reference(page)
+    page = noisy_page(60)
+    candidates = extract_candidates(page)
+    assert len(candidates) == 61
+    assert candidates[0]["text"] == "2026/8/1 22:00 VRChatイベント0"
+    assert candidates[-1]["status_id"] == "9234567890123456789"
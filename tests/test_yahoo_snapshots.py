@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from scripts import collect_yahoo_corpus as corpus
+from scripts import replay_yahoo_history as replay
+from scripts import yahoo_snapshots as snapshots
+
+NOW = datetime(2026, 8, 10, 12, tzinfo=UTC)
+
+
+def page(*status_ids: int) -> str:
+    return ",".join(str(value) for value in status_ids)
+
+
+def fake_extract(html):
+    return [
+        {"status_id": value, "url": f"https://x.com/host/status/{value}", "text": f"post {value}", "retweet_count": 5}
+        for value in html.split(",")
+    ]
+
+
+def test_identical_pages_share_one_object_and_prune_by_age_and_count(tmp_path):
+    url = "https://search.yahoo.co.jp/realtime/search?p=vrchat"
+    for hours, key in ((0, "core"), (1, "core"), (2, "core"), (2, "venues")):
+        snapshots.store(key, page(1234567890123456789), url=url, http_status=200, final_url=url, fetched_at=NOW + timedelta(hours=hours), root=tmp_path)
+    snapshots.store("old", page(1234567890123456780), url=url, http_status=200, final_url=url, fetched_at=NOW - timedelta(days=40), root=tmp_path)
+
+    assert len(snapshots.entries(tmp_path)) == 5
+    assert len(list((tmp_path / "objects").glob("*/*.html.gz"))) == 2
+    latest = snapshots.latest(tmp_path)
+    assert latest["core"]["fetched_at"] == "2026-08-10T14:00:00Z"
+    assert snapshots.load_html(latest["venues"], tmp_path) == page(1234567890123456789)
+
+    summary = snapshots.prune(tmp_path, now=NOW + timedelta(hours=3), retention_days=30, keep_per_query=2)
+    assert summary == {"snapshot_count": 3, "removed_snapshot_count": 2, "removed_object_count": 1}
+    assert sorted(row["query_key"] for row in snapshots.entries(tmp_path)) == ["core", "core", "venues"]
+
+
+def test_offline_fetch_replays_archived_shards_without_network(tmp_path, monkeypatch):
+    plan = [
+        {"key": f"q{index}", "group": "core", "term": f"term{index}", "url": f"https://search.yahoo.co.jp/realtime/search?p={index}"}
+        for index in range(3)
+    ]
+    monkeypatch.setattr(corpus.implementation, "fetch_page", lambda url: (page(1234567890123456780 + int(url[-1])), 200, url))
+    monkeypatch.setattr(corpus.implementation, "extract_candidates", fake_extract)
+    online = corpus.fetch_candidates(plan, set(), 100, False, 0.0, workers=2, snapshot_root=tmp_path)
+
+    def offline_fetch(url):
+        raise AssertionError("network used")
+
+    monkeypatch.setattr(corpus.implementation, "fetch_page", offline_fetch)
+    offline = corpus.fetch_candidates(plan, set(), 100, False, 0.0, workers=2, snapshot_root=tmp_path, offline=True)
+
+    def strip(results):
+        return [{key: value for key, value in row.items() if key != "duration_ms"} for row in results]
+
+    assert offline[0] == online[0]
+    assert strip(offline[1]) == strip(online[1])
+    assert all(row["snapshot_sha256"] for row in offline[1])
+
+    missing = corpus.fetch_candidates([*plan, {**plan[0], "key": "q9"}], set(), 100, False, 0.0, snapshot_root=tmp_path, offline=True)
+    assert missing[1][-1] | {"duration_ms": 0} == {
+        "key": "q9", "group": "core", "term": "term0", "status": "failed", "reason": "no stored Yahoo snapshot",
+        "raw_candidates": 0, "unique_candidates_after_query": 3, "duration_ms": 0,
+    }
+
+
+def test_snapshot_replay_reextracts_without_moving_last_seen_backwards(tmp_path, monkeypatch):
+    monkeypatch.setattr(replay.implementation, "extract_candidates", fake_extract)
+    url = "https://search.yahoo.co.jp/realtime/search?p=vrchat"
+    snapshots.store("core", page(1234567890123456789, 1234567890123456790), url=url, http_status=200, final_url=url, fetched_at=NOW, root=tmp_path)
+    history = [
+        {
+            "status_id": "1234567890123456789", "url": "https://x.com/host/status/1234567890123456789", "text": "old extraction",
+            "retweet_count": 9, "first_seen_at": "2026-08-09T00:00:00Z", "last_seen_at": "2026-08-11T00:00:00Z",
+        }
+    ]
+    replayed = {row["status_id"]: row for row in replay.replay_snapshots(history, snapshots.entries(tmp_path), tmp_path)}
+
+    assert replayed["1234567890123456789"]["text"] == "post 1234567890123456789"
+    assert replayed["1234567890123456789"]["retweet_count"] == 9
+    assert replayed["1234567890123456789"]["first_seen_at"] == "2026-08-09T00:00:00Z"
+    assert replayed["1234567890123456789"]["last_seen_at"] == "2026-08-11T00:00:00Z"
+    assert replayed["1234567890123456790"]["first_seen_at"] == "2026-08-10T12:00:00Z"
+
+
+def test_missing_snapshot_object_is_reported(tmp_path):
+    with pytest.raises(RuntimeError, match="missing Yahoo snapshot object"):
+        snapshots.load_html({"sha256": "0" * 64}, tmp_path)